@@ -0,0 +1,123 @@
+"""
+Benchmark da gravação do histórico de análises (`AnalysisRepository`).
+
+Várias threads (como sessões simultâneas do Streamlit) gravam análises
+sintéticas num banco temporário. Compara o `AnalysisRepository` (WAL,
+conexão por thread, cláusulas num `executemany` na mesma transação) com uma
+gravação ingênua no mesmo esquema: conexão nova por análise, journal padrão
+(DELETE) e uma instrução por cláusula. Mostra a latência por análise
+(p50/p95/p99) e a vazão total.
+
+Uso:
+    python benchmarks/bench_analysis_repository.py [--threads 1 8 32] [--saves 200] [--clauses 12]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clara10 import AnalysisRepository, AnalysisResult, ContractMetadata, RiskLevel  # noqa: E402
+
+
+def synthetic_analysis(rng, clauses):
+    results = [
+        AnalysisResult(
+            rule_id=f"regra_{rng.randrange(20)}", clause="Cláusula abusiva", score=rng.randrange(1, 11),
+            risk_level=rng.choice(list(RiskLevel)).value, explanation="Explicação " * 10,
+            solution="Sugestão " * 8, legal_references=["CDC art. 51"], tags=["consumidor"],
+            excerpt="trecho", match_position=rng.randrange(100000), context="Contexto da cláusula " * 15)
+        for _ in range(clauses)
+    ]
+    metadata = ContractMetadata(
+        contract_hash=f"{rng.getrandbits(128):032x}", total_words=rng.randrange(500, 50000),
+        total_sentences=rng.randrange(50, 5000), entities=None, processing_time=0.5,
+        analyzed_at=datetime.now(), ruleset_digest="bench")
+    return results, metadata
+
+
+def naive_save(db_path, results, metadata, user_data, filename, file_type):
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            conn.execute("INSERT INTO users (nome, email, telefone) VALUES (?, ?, ?) "
+                         "ON CONFLICT(email) DO UPDATE SET nome = excluded.nome",
+                         (user_data["name"], user_data["email"], user_data["phone"]))
+            user_id = conn.execute("SELECT id FROM users WHERE email = ?", (user_data["email"],)).fetchone()[0]
+            contract_id = conn.execute(
+                "INSERT INTO contracts (user_id, filename, file_type, risk_score, contract_hash) VALUES (?, ?, ?, ?, ?)",
+                (user_id, filename, file_type, max(r.score for r in results), metadata.contract_hash)).lastrowid
+            for r in results:
+                conn.execute(
+                    "INSERT INTO clauses (contract_id, clause_type, message, score, explanation, recommendation, "
+                    "context, risk_level) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (contract_id, r.rule_id, r.clause, r.score, r.explanation, r.solution, r.context, r.risk_level))
+    finally:
+        conn.close()
+
+
+def run(mode, threads, saves, clauses):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "analytics.db")
+        repository = AnalysisRepository(db_path)
+        if mode == "naive":
+            repository.close()
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("PRAGMA journal_mode=DELETE")
+        latencies, lock = [], threading.Lock()
+
+        def worker(index):
+            rng = random.Random(index)
+            analyses = [synthetic_analysis(rng, clauses) for _ in range(saves)]
+            local = []
+            for i, (results, metadata) in enumerate(analyses):
+                user_data = {"name": "Cliente", "email": f"cliente{index}-{i % 10}@exemplo.com",
+                             "phone": "11999999999", "session_id": f"s{index}"}
+                start = time.perf_counter()
+                if mode == "naive":
+                    naive_save(db_path, results, metadata, user_data, "contrato.pdf", "pdf")
+                else:
+                    repository.save(results, metadata, user_data, "contrato.pdf", "pdf")
+                local.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(local)
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        start = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        with sqlite3.connect(db_path) as conn:
+            stored = conn.execute("SELECT COUNT(*) FROM contracts").fetchone()[0]
+        assert stored == threads * saves, f"{stored} contratos gravados, esperados {threads * saves}"
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return quantiles[49], quantiles[94], quantiles[98], len(latencies) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--saves", type=int, default=200, help="análises gravadas por thread")
+    parser.add_argument("--clauses", type=int, default=12, help="cláusulas por análise")
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'modo':>12} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'análises/s':>11}")
+    for threads in args.threads:
+        for mode, label in (("naive", "ingênuo"), ("repository", "repositório")):
+            p50, p95, p99, rate = run(mode, threads, args.saves, args.clauses)
+            print(f"{threads:>7} {label:>12} {p50 * 1000:>9.2f} {p95 * 1000:>9.2f} {p99 * 1000:>9.2f} {rate:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
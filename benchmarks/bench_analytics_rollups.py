@@ -0,0 +1,110 @@
+"""
+Benchmark das consultas de analytics: agregados diários x GROUP BY no histórico bruto.
+
+Gera um histórico sintético de contratos e cláusulas (espalhado por `--days`
+dias) num banco temporário, monta os agregados com `rebuild_rollups` e mede,
+para cada tamanho de histórico, as mesmas três perguntas respondidas direto
+das tabelas `contracts`/`clauses` e pelas consultas do `AnalysisRepository`:
+regras mais encontradas nos últimos 30 dias, faixas de risco por semana e
+conversão em pagamento por faixa de risco. Confere também que as respostas
+coincidem.
+
+Uso:
+    python benchmarks/bench_analytics_rollups.py [--contracts 10000 100000] [--clauses 8]
+                                                 [--days 730] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clara10 import AnalysisRepository, RiskLevel  # noqa: E402
+
+RAW_QUERIES = {
+    "top_rules": (
+        "SELECT cl.clause_type, SUM(1) FROM clauses cl JOIN contracts c ON c.id = cl.contract_id "
+        "WHERE date(c.analysis_date) >= ? GROUP BY cl.clause_type ORDER BY 2 DESC LIMIT 10"),
+    "risk_by_week": (
+        "SELECT date(date(analysis_date), '-6 days', 'weekday 1') AS week, "
+        f"{AnalysisRepository.RISK_BUCKET_SQL}, COUNT(*) FROM contracts "
+        "WHERE date(analysis_date) >= ? GROUP BY 1, 2"),
+    "conversion_by_risk": (
+        f"SELECT {AnalysisRepository.RISK_BUCKET_SQL}, COUNT(*), SUM(payment_status) FROM contracts "
+        "WHERE date(analysis_date) >= ? GROUP BY 1"),
+}
+
+
+def populate(repository, contracts, clauses, days, seed=5):
+    """Grava o histórico direto nas tabelas brutas (mais rápido que `save`) e recalcula os agregados"""
+    rng = random.Random(seed)
+    levels = [level.value for level in RiskLevel]
+    today = datetime.now(timezone.utc)  # Mesmo relógio (UTC) do AnalysisRepository
+    with repository._connect() as conn:
+        contract_rows, clause_rows = [], []
+        for contract_id in range(1, contracts + 1):
+            scores = [rng.randrange(1, 11) for _ in range(rng.randrange(clauses + 1))]
+            analyzed_at = today - timedelta(days=rng.randrange(days), seconds=rng.randrange(86400))
+            contract_rows.append((contract_id, "contrato.pdf", "pdf", max(scores, default=0),
+                                  analyzed_at.isoformat(sep=" ", timespec="seconds"), rng.random() < 0.1))
+            clause_rows.extend((contract_id, f"regra_{rng.randrange(25)}", "c", score, "e", "s", "ctx",
+                                rng.choice(levels)) for score in scores)
+        conn.executemany("INSERT INTO contracts (id, filename, file_type, risk_score, analysis_date, payment_status) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", contract_rows)
+        conn.executemany("INSERT INTO clauses (contract_id, clause_type, message, score, explanation, "
+                         "recommendation, context, risk_level) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", clause_rows)
+    repository.rebuild_rollups()
+
+
+def best_of(repeat, func):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--clauses", type=int, default=8, help="máximo de cláusulas por contrato")
+    parser.add_argument("--days", type=int, default=730, help="dias de histórico")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'contratos':>10} {'consulta':>20} {'bruto (ms)':>11} {'agregado (ms)':>14} {'ganho':>8}")
+    for contracts in args.contracts:
+        with tempfile.TemporaryDirectory() as tmp:
+            repository = AnalysisRepository(os.path.join(tmp, "analytics.db"))
+            populate(repository, contracts, args.clauses, args.days)
+            rollup_queries = {
+                "top_rules": lambda: repository.top_rules(days=30),
+                "risk_by_week": lambda: repository.risk_by_week(weeks=12),
+                "conversion_by_risk": lambda: repository.conversion_by_risk(days=None),
+            }
+            since = {"top_rules": repository._since(30), "risk_by_week": repository._since(84),
+                     "conversion_by_risk": repository._since(None)}
+
+            for name, sql in RAW_QUERIES.items():
+                with repository._connect() as conn:
+                    raw_time, raw = best_of(args.repeat, lambda: conn.execute(sql, (since[name],)).fetchall())
+                rollup_time, rollup = best_of(args.repeat, rollup_queries[name])
+                if name == "top_rules":
+                    assert [hits for _, hits in raw] == [entry["hits"] for entry in rollup]
+                elif name == "conversion_by_risk":
+                    assert {bucket: (n, paid) for bucket, n, paid in raw} == \
+                        {bucket: (v["contracts"], v["paid"]) for bucket, v in rollup.items()}
+                else:
+                    assert sorted(raw) == sorted((r["week"], r["risk_bucket"], r["contracts"]) for r in rollup)
+                print(f"{contracts:>10} {name:>20} {raw_time * 1000:>11.2f} {rollup_time * 1000:>14.2f} "
+                      f"{raw_time / rollup_time:>7.1f}x")
+            repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark de pior caso para regras com `span_mode` limitado.
+
+Gera um texto adversarial ("renovação automática sem ..." repetido, com
+"aviso"/"tácita" apenas no início, para passar pelo prefiltro) em que `.*`
+sem limite retrocede sobre o documento inteiro a cada ocorrência da âncora. Compara as regras originais em
+modo `SpanMode.UNBOUNDED` com o modo por linha (`SpanMode.LINE`) usado em `CONTRACT_RULES`.
+
+Antes, confere que os dois modos dão exatamente os mesmos matches (posição e
+texto) nas cláusulas plantadas e nos contratos do corpus sintético
+(`corpus.py`), limpos com `TextUtils.clean_text` como na análise, inclusive
+com termos repetidos e espalhados por sentenças diferentes.
+
+Uso:
+    python benchmarks/bench_bounded_spans.py [--max-mb 10] [--legacy-max-kb 4] [--corpus-docs 300]
+"""
+import argparse
+import dataclasses
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clara10 import CONTRACT_RULES, CompiledRuleSet, SpanMode, TextUtils  # noqa: E402
+from corpus import generate  # noqa: E402
+
+ADVERSARIAL_HEAD = "Aviso tácita. "
+ADVERSARIAL_UNIT = "renovação automática sem prazo; "
+CLAUSES = [
+    "O CONTRATANTE não poderá rescindir este contrato sob nenhuma hipótese.",
+    "Fica vedado ao CONTRATANTE rescindir o contrato antes do prazo.",
+    "Haverá renovação automática sem qualquer aviso ao cliente.",
+    "O contrato terá renovação tácita por iguais períodos.",
+    "O CONTRATADO poderá aplicar reajuste unilateral a qualquer tempo.",
+    "A prorrogação automática ocorrerá sem comunicação prévia.",
+]
+# Termos dos padrões soltos no texto: repetem termos e formam matches entre sentenças
+LOOSE_TERMS = ["renovação", "automática", "sem", "aviso", "tácita", "reajuste", "unilateral", "prorrogação",
+               "comunicação", "vedado", "rescindir", "proibição", "cancelamento", "impossibilidade",
+               "não poderá rescindir", "sob nenhuma hipótese"]
+
+
+def adversarial_text(size: int) -> str:
+    repeats = max(1, size // len(ADVERSARIAL_UNIT.encode("utf-8")))
+    return ADVERSARIAL_HEAD + ADVERSARIAL_UNIT * repeats
+
+
+def unbounded(rules):
+    return [dataclasses.replace(rule, span_mode=SpanMode.UNBOUNDED) for rule in rules]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def corpus_texts(documents: int):
+    """Contratos do corpus, metade com termos dos padrões inseridos em posições aleatórias"""
+    rng = random.Random(3)
+    for i in range(documents):
+        contract = generate(rng.randrange(1, 6), density=rng.choice([0, 0.5, 2, 5]), seed=i)
+        paragraphs = [text for _, text in contract.paragraphs]
+        if i % 2:
+            for _ in range(rng.randrange(1, 12)):
+                index = rng.randrange(len(paragraphs))
+                words = paragraphs[index].split(" ")
+                words.insert(rng.randrange(len(words) + 1), rng.choice(LOOSE_TERMS))
+                paragraphs[index] = " ".join(words)
+        yield "\n".join(paragraphs)
+
+
+def check_unchanged(documents: int):
+    legacy = CompiledRuleSet(unbounded(CONTRACT_RULES))
+    bounded = CompiledRuleSet(CONTRACT_RULES)
+    as_spans = lambda res: [[(p, m.span(), m.group()) for p, m in matches] for matches in res]  # noqa: E731
+    for clause in CLAUSES:
+        text = f"Cláusula primeira. {clause} Cláusula segunda, sem outras disposições."
+        if as_spans(legacy.scan(text)) != as_spans(bounded.scan(text)):
+            raise SystemExit(f"Match alterado para a cláusula: {clause}")
+
+    matched = 0
+    for number, raw in enumerate(corpus_texts(documents)):
+        for text in (raw, TextUtils.clean_text(raw)):
+            expected = as_spans(legacy.scan(text))
+            if as_spans(bounded.scan(text)) != expected:
+                raise SystemExit(f"Match alterado no documento {number} do corpus")
+            matched += any(expected)
+    print(f"{len(CLAUSES)} cláusulas plantadas e {documents} documentos do corpus ({matched} textos com match): "
+          f"matches inalterados")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-mb", type=float, default=10)
+    parser.add_argument("--legacy-max-kb", type=int, default=4,
+                        help="maior texto avaliado no modo sem limite (custo supercúbico)")
+    parser.add_argument("--corpus-docs", type=int, default=300,
+                        help="documentos do corpus sintético na conferência de equivalência")
+    args = parser.parse_args()
+
+    check_unchanged(args.corpus_docs)
+    legacy = CompiledRuleSet(unbounded(CONTRACT_RULES))
+    bounded = CompiledRuleSet(CONTRACT_RULES)
+
+    print(f"{'tamanho':>10} {'sem limite (s)':>15} {'por linha (s)':>14}")
+    max_size = int(args.max_mb * 1024 * 1024)
+    sizes = [1024 * 4 ** i for i in range(12) if 1024 * 4 ** i < max_size] + [max_size]
+    for size in sizes:
+        text = adversarial_text(size)
+        bounded_time, _ = timed(bounded.scan, text)
+        if size <= args.legacy_max_kb * 1024:
+            legacy_time, _ = timed(legacy.scan, text)
+            legacy_label = f"{legacy_time:.4f}"
+        else:
+            legacy_label = "-"
+        print(f"{size // 1024:>8}KB {legacy_label:>15} {bounded_time:>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
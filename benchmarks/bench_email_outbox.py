@@ -0,0 +1,126 @@
+"""
+Benchmark do envio de e-mails contra um servidor SMTP local (aiosmtpd).
+
+Compara o fluxo antigo de `EmailService.send_email` (uma conexão SMTP nova,
+com handshake, por mensagem, enviada de forma síncrona) com o `EmailOutbox`
+(fila em segundo plano e uma `SMTPSession` reaproveitada). O servidor local
+pode simular a latência de rede por comando (`--rtt-ms`) e derrubar a conexão
+depois de N mensagens na mesma sessão (`--drop-every`), para exercitar a
+reconexão e as novas tentativas. `--workers` define quantas sessões o outbox
+mantém abertas em paralelo. Sem TLS nem login: o servidor é local.
+
+Uso:
+    python benchmarks/bench_email_outbox.py [--messages 200] [--rtt-ms 20] [--drop-every 0]
+                                               [--workers 2]
+"""
+import argparse
+import asyncio
+import os
+import smtplib
+import socket
+import sys
+import time
+
+from aiosmtpd.controller import Controller
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clara10 import AppConfig, EmailOutbox, EmailService  # noqa: E402
+
+
+class SlowHandler:
+    """Recebe as mensagens com um atraso por comando, como um servidor remoto"""
+
+    def __init__(self, rtt, drop_every):
+        self.rtt = rtt
+        self.drop_every = drop_every
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.rtt)
+        session.host_name = hostname
+        return responses
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        await asyncio.sleep(self.rtt)
+        session.messages = getattr(session, "messages", 0) + 1
+        if self.drop_every and session.messages > self.drop_every:
+            # Encerra a sessão antes da próxima mensagem, como um servidor que limita a conexão
+            server.transport.close()
+            return "421 Too many messages on this connection"
+        envelope.mail_from = address
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await asyncio.sleep(self.rtt)
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.rtt)
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+def legacy_send(config, message):
+    """Conexão nova por mensagem, como o `send_email` antigo (sem TLS)"""
+    with smtplib.SMTP(config["smtp_server"], config["port"], timeout=config["timeout"]) as server:
+        server.send_message(message)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--drop-every", type=int, default=0, help="derruba a conexão após N mensagens")
+    parser.add_argument("--workers", type=int, default=AppConfig.EMAIL_CONFIG["outbox_workers"])
+    args = parser.parse_args()
+
+    handler = SlowHandler(args.rtt_ms / 1000, args.drop_every)
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        config = dict(AppConfig.EMAIL_CONFIG, smtp_server="127.0.0.1", port=port,
+                      password="", use_tls=False, retry_backoff=0.1, outbox_workers=args.workers)
+        outbox = EmailOutbox(config)
+        service = EmailService(outbox)
+        messages = [service.build_message(f"cliente{i}@exemplo.com", "Confirmação", "<p>Olá</p>")
+                    for i in range(args.messages)]
+
+        start = time.perf_counter()
+        for message in messages:
+            legacy_send(config, message)
+        legacy = time.perf_counter() - start
+
+        handler.received = 0
+        outbox.start()
+        start = time.perf_counter()
+        for message in messages:
+            outbox.enqueue(message)
+        enqueue = time.perf_counter() - start
+        outbox.wait_until_empty()
+        pooled = time.perf_counter() - start
+        outbox.stop()
+        stats = outbox.stats()
+    finally:
+        controller.stop()
+
+    print(f"{args.messages} mensagens, {args.rtt_ms:.0f}ms por comando SMTP")
+    print(f"{'conexão por mensagem':<24} {legacy:>8.2f}s {args.messages / legacy:>8.1f} msg/s "
+          f"(usuário espera {legacy / args.messages * 1000:.1f}ms por envio)")
+    print(f"{f'{args.workers} sessões reaproveitadas':<24} {pooled:>8.2f}s {args.messages / pooled:>8.1f} msg/s "
+          f"(usuário espera {enqueue / args.messages * 1000:.3f}ms por envio)")
+    print(f"outbox: {stats['sent']} enviados, {stats['failed']} falhas, {stats['retried']} novas tentativas, "
+          f"vazão de envio {stats['throughput']:.1f} msg/s")
+    assert stats["sent"] == args.messages, "nem todas as mensagens foram enviadas"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Micro-benchmark: hash PBKDF2 com salt x impressão digital BLAKE2b.
+
+Compara `SecurityUtils.generate_secure_hash` (100.000 iterações de
+PBKDF2-SHA256, diferente a cada chamada) com `SecurityUtils.content_fingerprint`
+(determinística) para textos de tamanhos variados.
+
+Uso:
+    python benchmarks/bench_fingerprint.py [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clara10 import SecurityUtils  # noqa: E402
+
+SENTENCE = "O LOCATÁRIO pagará o aluguel mensal até o quinto dia útil de cada mês. "
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = SENTENCE * 10
+    assert SecurityUtils.content_fingerprint(text) == SecurityUtils.content_fingerprint(text)
+    assert SecurityUtils.generate_secure_hash(text) != SecurityUtils.generate_secure_hash(text)
+
+    print(f"{'tamanho':>10} {'PBKDF2 (ms)':>12} {'BLAKE2b (ms)':>13} {'ganho':>8}")
+    for pages in (1, 10, 100, 500):
+        text = SENTENCE * (pages * 40)
+        pbkdf2 = best_of(args.repeat, SecurityUtils.generate_secure_hash, text)
+        blake = best_of(args.repeat, SecurityUtils.content_fingerprint, text)
+        print(f"{len(text) // 1024:>8}KB {pbkdf2 * 1000:>12.2f} {blake * 1000:>13.2f} {pbkdf2 / blake:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
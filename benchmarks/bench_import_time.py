@@ -0,0 +1,88 @@
+"""
+Benchmark: tempo de importação (cold start) do clara10.
+
+Cada rodada importa o módulo num processo Python novo com `-X importtime`,
+mede o tempo total e lista os pacotes de primeiro nível mais caros, para que
+uma importação pesada reintroduzida no topo do módulo fique visível.
+
+Uso:
+    python benchmarks/bench_import_time.py [--runs 5] [--top 10]
+                                           [--max-seconds 2.0] [--json saida.json]
+
+Com `--max-seconds`, termina com código 1 se a mediana passar do limite.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_once(module):
+    """Importa `module` num processo novo; retorna (segundos, {pacote: microssegundos})"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"falha ao importar {module}:\n{proc.stderr[-2000:]}")
+
+    packages = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Indentação de 2 espaços = importado diretamente pelo módulo medido
+        if match and len(match.group(3)) == 3:
+            packages[match.group(4)] = int(match.group(2))
+    return elapsed, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="clara10")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    parser.add_argument("--json", default=None, help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    import_once(args.module)  # Aquece o cache de bytecode e do sistema de arquivos
+    timings, cumulative = [], {}
+    for _ in range(args.runs):
+        elapsed, packages = import_once(args.module)
+        timings.append(elapsed)
+        for name, micros in packages.items():
+            cumulative.setdefault(name, []).append(micros)
+
+    median = statistics.median(timings)
+    heaviest = sorted(((statistics.median(v) / 1e6, k) for k, v in cumulative.items()), reverse=True)[:args.top]
+
+    print(f"import {args.module}: mediana {median:.3f}s (mín {min(timings):.3f}s, máx {max(timings):.3f}s, "
+          f"{args.runs} rodadas)")
+    print(f"{'pacote':<40} {'cumulativo (s)':>15}")
+    for seconds, name in heaviest:
+        print(f"{name:<40} {seconds:>15.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "module": args.module,
+                "runs": timings,
+                "median_seconds": median,
+                "heaviest_imports": [{"package": name, "seconds": seconds} for seconds, name in heaviest],
+            }, f, indent=2)
+
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"REGRESSÃO: mediana {median:.3f}s acima do limite de {args.max_seconds:.3f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
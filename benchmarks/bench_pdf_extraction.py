@@ -0,0 +1,79 @@
+"""
+Benchmark da extração de texto de PDF: serial x páginas em paralelo.
+
+Gera com o ReportLab um PDF sintético de várias centenas de páginas e compara
+a extração página a página original com `FileUtils._extract_from_pdf`
+usando o pool de processos.
+
+Uso:
+    python benchmarks/bench_pdf_extraction.py [--pages 300] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2  # noqa: E402
+from reportlab.lib.pagesizes import A4  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from clara10 import FileUtils, TextUtils  # noqa: E402
+
+LINE = "O LOCATÁRIO pagará o aluguel mensal até o quinto dia útil de cada mês, sob pena de multa."
+
+
+def build_pdf(pages: int) -> bytes:
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    for page in range(pages):
+        text = pdf.beginText(40, 800)
+        text.setFont("Helvetica", 9)
+        for line in range(70):
+            text.textLine(f"{page + 1}.{line + 1} {LINE}")
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def legacy_extract(data: bytes) -> str:
+    pdf_reader = PyPDF2.PdfReader(BytesIO(data))
+    text = "\n".join([page.extract_text() or "" for page in pdf_reader.pages])
+    return TextUtils.clean_text(text)
+
+
+def best_of(repeat, func, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = build_pdf(args.pages)
+    print(f"PDF sintético: {args.pages} páginas, {len(data) / 1024:.0f}KB")
+
+    serial_time, expected = best_of(args.repeat, legacy_extract, data)
+    # Aquece o pool para não medir a criação dos processos
+    FileUtils._extract_from_pdf(BytesIO(data))
+    parallel_time, extraction = best_of(args.repeat, FileUtils._extract_from_pdf, BytesIO(data))
+
+    if extraction.text != expected:
+        raise SystemExit("Texto extraído em paralelo difere da extração serial")
+    print(f"serial:   {serial_time:.3f}s")
+    print(f"paralelo: {parallel_time:.3f}s ({extraction.workers} processos, "
+          f"{extraction.page_count} páginas) -> {serial_time / parallel_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark dos pacotes de regras: compilação x artefato em cache, e troca a quente.
+
+1. Para pacotes sintéticos de tamanhos crescentes (gravados em JSON), mede num
+   processo novo o tempo do `RulePackWatcher` até ter as regras prontas (leitura,
+   validação e `CompiledRuleSet`): compilando do zero (cache vazio) e
+   carregando o artefato gravado pela primeira execução.
+2. Com várias threads analisando sem parar pelo `ModelRegistry`, publica um
+   novo pacote (gravação + rename) e confere que nenhuma análise falhou e em
+   quanto tempo as threads passaram a usar o novo.
+
+Uso:
+    python benchmarks/bench_rule_artifact.py [--rules 100 1000 5000] [--threads 4]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from clara10 import (CONTRACT_RULES, ModelRegistry, RiskLevel, RuleArtifactCache, RulePack,  # noqa: E402
+                     RulePackWatcher, SpanMode)
+
+LOAD_SCRIPT = """
+import sys, time
+from clara10 import RuleArtifactCache, RulePackWatcher
+start = time.perf_counter()
+RulePackWatcher(sys.argv[1], RuleArtifactCache(sys.argv[2]))
+print(time.perf_counter() - start)
+"""
+
+
+def write_pack(path, count, version="1"):
+    pack = RulePack.to_dict(CONTRACT_RULES, "bench", version)
+    for i in range(count - len(pack["rules"])):
+        pack["rules"].append({
+            "id": f"bench_{i:05d}", "name": f"Regra sintética {i}",
+            "patterns": [rf"cláusula{i}\b.*penalidade", rf"termo{i}\b.*rescisão", rf"prazo{i}\b.*multa"],
+            "score": 5, "risk_level": RiskLevel.MEDIUM.value, "explanation": f"versão {version}",
+            "span_mode": SpanMode.SENTENCE.value,
+        })
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(pack, f, ensure_ascii=False)
+    os.replace(tmp_path, path)  # Publicação atômica
+
+
+def load_in_new_process(pack_path, cache_dir):
+    out = subprocess.run([sys.executable, "-c", LOAD_SCRIPT, pack_path, cache_dir],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return float(out)
+
+
+def compile_vs_artifact(counts):
+    print(f"{'regras':>7} {'compilação (ms)':>16} {'artefato (ms)':>14} {'ganho':>7}")
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            pack_path, cache_dir = os.path.join(tmp, "pack.json"), os.path.join(tmp, "cache")
+            write_pack(pack_path, count)
+            cold = load_in_new_process(pack_path, cache_dir)
+            warm = load_in_new_process(pack_path, cache_dir)
+        print(f"{count:>7} {cold * 1000:>16.1f} {warm * 1000:>14.1f} {cold / warm:>6.1f}x")
+
+
+def hot_swap(threads, count, seconds=3.0):
+    text = "O contrato terá renovação tácita por iguais períodos. Fica vedado ao CONTRATANTE rescindir. " * 200
+    with tempfile.TemporaryDirectory() as tmp:
+        pack_path = os.path.join(tmp, "pack.json")
+        write_pack(pack_path, count, version="1")
+        watcher = RulePackWatcher(pack_path, RuleArtifactCache(os.path.join(tmp, "cache")), check_interval=0.05)
+        registry = ModelRegistry(watcher)
+        old_digest = registry.engine().ruleset_digest
+
+        stop, lock = threading.Event(), threading.Lock()
+        stats = {"analyses": 0, "errors": 0}
+        first_new = {}
+
+        def worker(index):
+            while not stop.is_set():
+                engine = registry.engine()
+                try:
+                    _, metadata = engine.analyze(text)
+                except Exception:
+                    with lock:
+                        stats["errors"] += 1
+                    continue
+                with lock:
+                    stats["analyses"] += 1
+                    if metadata.ruleset_digest != old_digest and index not in first_new:
+                        first_new[index] = time.perf_counter()
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for thread in pool:
+            thread.start()
+        time.sleep(seconds / 2)
+        published = time.perf_counter()
+        write_pack(pack_path, count, version="2")
+        time.sleep(seconds / 2)
+        stop.set()
+        for thread in pool:
+            thread.join()
+
+    lags = [first_new[i] - published for i in range(threads) if i in first_new]
+    print(f"\ntroca a quente ({count} regras, {threads} threads): {stats['analyses']} análises, "
+          f"{stats['errors']} erros; "
+          f"{len(lags)}/{threads} threads com o novo pacote, "
+          f"em até {max(lags) * 1000 if lags else float('nan'):.0f}ms após a publicação")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    compile_vs_artifact(args.rules)
+    hot_swap(args.threads, min(args.rules))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark da avaliação de regras contratuais.
+
+Compara a avaliação padrão-a-padrão (um `re.finditer` por padrão, como era
+feito em `_apply_rule`) com o `CompiledRuleSet`, sem e com o prefiltro de
+literais, variando o número de regras. As regras são avaliadas em
+`SpanMode.UNBOUNDED` para que o resultado seja comparável ao da avaliação
+antiga (ver bench_bounded_spans.py para o modo limitado).
+
+Uso:
+    python benchmarks/bench_rule_matching.py [--pages 100] [--repeat 3]
+"""
+import argparse
+import dataclasses
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clara10 import CONTRACT_RULES, CompiledRuleSet, ContractRule, RiskLevel, SpanMode  # noqa: E402
+
+FILLER = (
+    "O CONTRATANTE pagará ao CONTRATADO o valor mensal acordado até o quinto dia útil de cada mês. "
+    "As partes elegem o foro da comarca de São Paulo para dirimir quaisquer dúvidas. "
+    "O presente instrumento obriga as partes e seus sucessores a qualquer título. "
+    "A multa por atraso será de dois por cento sobre o valor da parcela em aberto. "
+    "O imóvel destina-se exclusivamente ao uso residencial do LOCATÁRIO e de sua família. "
+    "A renovação do contrato dependerá de novo acordo entre as partes. "
+    "O cancelamento deverá ser comunicado por escrito com antecedência. "
+)
+PLANTED = [
+    "Fica vedado ao CONTRATANTE rescindir o contrato antes do prazo.",
+    "O contrato terá renovação tácita por iguais períodos.",
+    "O CONTRATADO poderá aplicar reajuste unilateral a qualquer tempo.",
+]
+WORDS_PER_PAGE = 500
+
+
+def build_text(pages: int, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    filler_sentences = [s.strip() + "." for s in FILLER.split(".") if s.strip()]
+    sentences = []
+    words = 0
+    while words < pages * WORDS_PER_PAGE:
+        sentence = rng.choice(filler_sentences)
+        if rng.random() < 0.001:
+            sentence = rng.choice(PLANTED)
+        sentences.append(sentence)
+        words += len(sentence.split())
+    return " ".join(sentences)
+
+
+def build_rules(count: int) -> list:
+    rules = [dataclasses.replace(rule, span_mode=SpanMode.UNBOUNDED) for rule in CONTRACT_RULES]
+    i = 0
+    while len(rules) < count:
+        rules.append(ContractRule(
+            id=f"bench_{i:03d}",
+            name=f"Regra sintética {i}",
+            patterns=[rf"cláusula{i}\b.*penalidade", rf"termo{i}\b.*rescisão"],
+            score=5,
+            risk_level=RiskLevel.MEDIUM,
+            explanation="",
+            solution="",
+            legal_references=[],
+            tags=[],
+        ))
+        i += 1
+    return rules[:count]
+
+
+def legacy_scan(rules, text):
+    """Reproduz a avaliação anterior: um finditer por padrão"""
+    results = []
+    for rule in rules:
+        matches = []
+        for pattern in rule.patterns:
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                matches.append((pattern, match))
+                break
+        results.append(matches)
+    return results
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rules", type=int, nargs="+", default=[2, 10, 25, 50, 100, 200])
+    args = parser.parse_args()
+
+    text = build_text(args.pages)
+    print(f"Texto sintético: {args.pages} páginas, {len(text):,} caracteres")
+    print(f"{'regras':>7} {'padrões':>8} {'legado (s)':>11} {'sem prefiltro (s)':>18} "
+          f"{'com prefiltro (s)':>18} {'ganho':>7}")
+
+    as_spans = lambda res: [[(p, m.span()) for p, m in matches] for matches in res]  # noqa: E731
+    for count in args.rules:
+        rules = build_rules(count)
+        legacy_time, expected = best_of(args.repeat, legacy_scan, rules, text)
+        timings = []
+        for use_prefilter in (False, True):
+            compiled = CompiledRuleSet(rules, use_prefilter=use_prefilter)
+            elapsed, actual = best_of(args.repeat, compiled.scan, text)
+            if as_spans(expected) != as_spans(actual):
+                raise SystemExit(f"Divergência de resultados com {count} regras (prefiltro={use_prefilter})")
+            timings.append(elapsed)
+
+        patterns = sum(len(rule.patterns) for rule in rules)
+        print(f"{count:>7} {patterns:>8} {legacy_time:>11.4f} {timings[0]:>18.4f} "
+              f"{timings[1]:>18.4f} {legacy_time / timings[1]:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
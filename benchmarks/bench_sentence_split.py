@@ -0,0 +1,140 @@
+"""
+Benchmark da segmentação de sentenças e contagem de palavras.
+
+Compara o caminho antigo de `analyze()` (NLTK `sent_tokenize` + busca de cada
+sentença no texto para o `SentenceIndex` + `len(word_tokenize(...))`) com o
+`LegalSentenceSplitter` + `WordCounter`, em tempo e em qualidade: o corpus
+sintético é montado a partir de sentenças conhecidas, cheias de abreviações
+jurídicas, então as fronteiras corretas são conhecidas e a precisão/revocação
+de cada segmentador pode ser medida.
+
+Também aceita um diretório com contratos reais em .txt (`--corpus`), caso em
+que só o tempo é comparado.
+
+Uso:
+    python benchmarks/bench_sentence_split.py [--pages 10 100 500] [--repeat 3]
+                                              [--corpus pasta_com_txt]
+
+O caminho NLTK precisa do recurso `punkt_tab` (ou `punkt`); sem ele, só o novo
+segmentador é medido.
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clara10 import SentenceIndex, TextUtils, WordCounter  # noqa: E402
+
+SENTENCES = [
+    "CLÁUSULA 1. O LOCADOR, Imobiliária Silva Ltda. inscrita no CNPJ nº 12.345.678/0001-90, cede o imóvel ao LOCATÁRIO.",
+    "Nos termos do Art. 5º, Inc. II da Lei 8.245/91, o aluguel será reajustado anualmente.",
+    "A Empresa X S.A. responderá solidariamente pelas obrigações previstas neste instrumento.",
+    "O pagamento será feito até o quinto dia útil de cada mês (cf. fls. 3 do processo nº 123/2020).",
+    "Haverá multa de dois por cento em caso de atraso?",
+    "Sim, conforme o art. 52 do Código de Defesa do Consumidor.",
+    "As partes elegem o foro da comarca de São Paulo, com renúncia a qualquer outro.",
+    "O contrato foi assinado pelo Dr. João Pereira e pela Sra. Maria Souza na Av. Paulista, nº 1000.",
+    "IV. O reajuste observará o índice IGP-M/FGV, ou outro que venha a substituí-lo.",
+    "O prazo da locação é de 30 meses, contados da entrega das chaves!",
+    "Aplicam-se, no que couber, os arts. 565 e seguintes do Código Civil.",
+]
+WORDS_PER_PAGE = 500
+
+
+def build_corpus(pages, seed=13):
+    """Texto limpo com `pages` páginas e as posições de fim de cada sentença"""
+    rng = random.Random(seed)
+    parts, ends, length, words = [], [], 0, 0
+    while words < pages * WORDS_PER_PAGE:
+        sentence = rng.choice(SENTENCES)
+        if parts:
+            length += 1
+        parts.append(sentence)
+        length += len(sentence)
+        ends.append(length)
+        words += len(sentence.split())
+    return " ".join(parts), ends
+
+
+def nltk_path(text):
+    from nltk.tokenize import sent_tokenize, word_tokenize
+
+    index = SentenceIndex(text, sent_tokenize(text, language="portuguese"))
+    return index, len(word_tokenize(text, language="portuguese"))
+
+
+def legal_path(text):
+    return SentenceIndex.split(text), WordCounter.count(text)
+
+
+def nltk_available():
+    try:
+        nltk_path("Teste. Outro teste.")
+        return True
+    except (LookupError, ImportError):
+        return False
+
+
+def best_of(repeat, func, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def boundary_quality(index, gold_ends):
+    found = set(index.ends)
+    gold = set(gold_ends)
+    hits = len(found & gold)
+    precision = hits / len(found) if found else 0.0
+    recall = hits / len(gold) if gold else 0.0
+    return precision, recall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus", default=None, help="diretório com contratos .txt")
+    args = parser.parse_args()
+
+    use_nltk = nltk_available()
+    if not use_nltk:
+        print("Recurso punkt do NLTK indisponível: medindo só o LegalSentenceSplitter.\n")
+
+    print(f"{'corpus':>14} {'NLTK (ms)':>10} {'novo (ms)':>10} {'ganho':>7} "
+          f"{'NLTK P/R':>12} {'novo P/R':>12}")
+    for pages in args.pages:
+        text, gold_ends = build_corpus(pages)
+        new_time, (new_index, _) = best_of(args.repeat, legal_path, text)
+        new_p, new_r = boundary_quality(new_index, gold_ends)
+        line = f"{pages:>8} págs "
+        if use_nltk:
+            old_time, (old_index, _) = best_of(args.repeat, nltk_path, text)
+            old_p, old_r = boundary_quality(old_index, gold_ends)
+            line += f"{old_time * 1000:>10.1f} {new_time * 1000:>10.1f} {old_time / new_time:>6.1f}x "
+            line += f"{old_p:>5.2f}/{old_r:<5.2f} {new_p:>6.2f}/{new_r:<5.2f}"
+        else:
+            line += f"{'-':>10} {new_time * 1000:>10.1f} {'-':>7} {'-':>12} {new_p:>6.2f}/{new_r:<5.2f}"
+        print(line)
+
+    if args.corpus:
+        files = sorted(glob.glob(os.path.join(args.corpus, "*.txt")))
+        text = " ".join(TextUtils.clean_text(open(f, encoding="utf-8").read()) for f in files)
+        new_time, (new_index, new_words) = best_of(args.repeat, legal_path, text)
+        print(f"\n{len(files)} contratos, {len(text) // 1024}KB: novo {new_time * 1000:.1f}ms, "
+              f"{len(new_index)} sentenças, {new_words} palavras")
+        if use_nltk:
+            old_time, (old_index, old_words) = best_of(args.repeat, nltk_path, text)
+            print(f"NLTK {old_time * 1000:.1f}ms, {len(old_index)} sentenças, {old_words} tokens "
+                  f"({old_time / new_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark da gravação de leads no Google Sheets, com uma planilha falsa local.
+
+Compara o fluxo antigo de `save_to_google_sheets` (conectar, baixar a coluna
+de e-mails inteira e então gravar, a cada chamada) com o `LeadsSheet`
+(conexão reaproveitada e índice e-mail → linha em memória), gravando um lead
+por vez ou em lotes pelo `LeadWriter` (fila SQLite temporária), variando o
+número de linhas da planilha. A latência da API é simulada por um custo fixo
+por chamada mais um custo por célula transferida, e contada em vez de dormida.
+Na coluna do `LeadWriter`, o custo é o dos envios em segundo plano: o
+usuário espera só a gravação local.
+
+Uso:
+    python benchmarks/bench_sheets_leads.py [--rows 1000 10000 50000] [--saves 200]
+                                            [--rtt-ms 150] [--cell-us 20]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clara10 import LeadSpool, LeadsSheet, LeadWriter  # noqa: E402
+
+
+class FakeWorksheet:
+    """Planilha em memória com a mesma interface usada pelo `LeadsSheet`"""
+
+    def __init__(self, rows, meter):
+        self.rows = [[f"Lead {i}", f"lead{i}@exemplo.com"] + [""] * 7 for i in range(rows)]
+        self.meter = meter
+
+    def col_values(self, column):
+        self.meter.call(cells=len(self.rows))
+        return [row[column - 1] for row in self.rows]
+
+    def update(self, values, range_name):
+        row = int(range_name.split(":")[0][1:])
+        self.meter.call(cells=len(values[0]))
+        self.rows[row - 1] = list(values[0])
+
+    def append_row(self, values):
+        self.meter.call(cells=len(values))
+        self.rows.append(list(values))
+        row = len(self.rows)
+        return {"updates": {"updatedRange": f"Leads!A{row}:I{row}"}}
+
+    def batch_update(self, data):
+        self.meter.call(cells=sum(len(item["values"][0]) for item in data))
+        for item in data:
+            row = int(item["range"].split(":")[0][1:])
+            self.rows[row - 1] = list(item["values"][0])
+
+    def append_rows(self, values):
+        self.meter.call(cells=sum(len(v) for v in values))
+        first = len(self.rows) + 1
+        self.rows.extend(list(v) for v in values)
+        return {"updates": {"updatedRange": f"Leads!A{first}:I{len(self.rows)}"}}
+
+
+class LatencyMeter:
+    def __init__(self, rtt, per_cell):
+        self.rtt, self.per_cell = rtt, per_cell
+        self.seconds = 0.0
+        self.calls = 0
+
+    def call(self, cells=0):
+        self.calls += 1
+        self.seconds += self.rtt + cells * self.per_cell
+
+    def connect(self):
+        self.calls += 2  # authorize + open_by_key
+        self.seconds += 2 * self.rtt
+
+
+def legacy_save(worksheet, meter, email, record):
+    meter.connect()
+    emails = worksheet.col_values(2)
+    if email in emails:
+        row = emails.index(email) + 1
+        worksheet.update(values=[record], range_name=f"A{row}:I{row}")
+    else:
+        worksheet.append_row(record)
+
+
+def run(rows, saves, rtt, per_cell, mode):
+    meter = LatencyMeter(rtt, per_cell)
+    worksheet = FakeWorksheet(rows, meter)
+    rng = random.Random(7)
+    emails = [f"lead{rng.randrange(rows * 2)}@exemplo.com" for _ in range(saves)]
+
+    def factory():
+        meter.connect()
+        return worksheet
+
+    sheet = LeadsSheet(factory, index_ttl=float("inf"))
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = LeadWriter(sheet, LeadSpool(os.path.join(tmp, "spool.db")), batch_size=50)
+        for email in emails:
+            record = ["Nome", email] + [""] * 7
+            if mode == "legacy":
+                legacy_save(worksheet, meter, email, record)
+            elif mode == "upsert":
+                sheet.upsert(email, record)
+            else:
+                writer.enqueue(email, record)
+        while writer.flush():
+            pass
+
+    # Confere que os três fluxos deixam a planilha no mesmo estado
+    return meter, sorted(row[1] for row in worksheet.rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--saves", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=150.0)
+    parser.add_argument("--cell-us", type=float, default=20.0)
+    args = parser.parse_args()
+    rtt, per_cell = args.rtt_ms / 1000, args.cell_us / 1e6
+
+    modes = (("legacy", "antigo"), ("upsert", "índice"), ("writer", "lotes"))
+    print(f"{'linhas':>8}" + "".join(f" {label + ' (ms/grav.)':>18} {'chamadas':>9}" for _, label in modes))
+    for rows in args.rows:
+        line, states = f"{rows:>8}", []
+        for mode, _ in modes:
+            meter, state = run(rows, args.saves, rtt, per_cell, mode)
+            states.append(state)
+            line += f" {meter.seconds / args.saves * 1000:>18.1f} {meter.calls / args.saves:>9.2f}"
+        assert all(state == states[0] for state in states)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
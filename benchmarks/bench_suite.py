@@ -0,0 +1,259 @@
+"""
+Suíte de benchmarks do pipeline de análise sobre o corpus sintético (`corpus.py`).
+
+`run` gera contratos de 1 a 500 páginas com cláusulas plantadas e mede cada
+etapa separadamente (mediana de `--repeat` execuções):
+
+    extract_text       FileUtils.extract_text (por formato: docx e pdf)
+    clean_text         TextUtils.clean_text
+    tokenization       SentenceIndex.split + WordCounter.count
+    analyze            ContractAnalysisEngine.analyze (só regras)
+    extract_entities   ContractAnalysisEngine._extract_entities (precisa do modelo spaCy)
+    wordcloud          VisualizationEngine.generate_wordcloud (precisa das stopwords do NLTK)
+    pdf_report         VisualizationEngine.generate_pdf_report
+
+Etapas cujas dependências não estão disponíveis aparecem como "skipped". Confere
+também que as regras encontradas são as plantadas e que o texto de
+preenchimento não dispara nenhuma. O resultado vai para um JSON (`-o`).
+
+`compare` lê dois JSON (base e atual), mostra a variação de cada etapa e
+sinaliza regressões: etapas pelo menos `--threshold` (fração) e `--min-delta`
+segundos mais lentas, e etapas medidas na base que falharam, foram puladas ou
+não aparecem na execução atual. Sai com código 1 se houver alguma.
+
+Uso:
+    python benchmarks/bench_suite.py run [--pages 1 10 100 500] [--formats txt docx pdf]
+                                         [--repeat 3] [-o resultados.json]
+    python benchmarks/bench_suite.py compare base.json atual.json [--threshold 0.2] [--min-delta 0.005]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from clara10 import (AppConfig, ContractAnalysisEngine, FileUtils, RulePackWatcher, SentenceIndex,  # noqa: E402
+                     TextUtils, VisualizationEngine, WordCounter)
+from clara_batch import LocalFile  # noqa: E402
+from corpus import FORMATS, generate, render  # noqa: E402
+
+SCHEMA = "clara-bench/1"
+REPORT_USER = {"name": "Cliente Benchmark", "email": "bench@exemplo.com", "phone": "11999999999",
+               "session_id": "bench"}
+
+
+class Skipped(Exception):
+    """Etapa não medida porque falta uma dependência opcional"""
+
+
+def measure(repeat, func):
+    """Mediana e mínimo de `repeat` execuções, após uma de aquecimento (imports, caches);
+    `func` devolve None quando a etapa falhou"""
+    if func() is None:
+        raise RuntimeError("a etapa não produziu resultado")
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"status": "ok", "median": statistics.median(timings), "min": min(timings), "runs": len(timings)}
+
+
+def stage(pages, file_format, name, repeat, func):
+    row = {"pages": pages, "format": file_format, "stage": name}
+    try:
+        row.update(measure(repeat, func))
+    except Skipped as e:
+        row.update(status="skipped", reason=str(e))
+    except Exception as e:
+        row.update(status="error", reason=f"{type(e).__name__}: {e}")
+    return row
+
+
+def load_spacy():
+    """Modelo spaCy já instalado (sem tentar baixar), ou None"""
+    try:
+        import spacy
+        return spacy.load(AppConfig.NLP_MODEL_NAME, disable=AppConfig.NLP_DISABLED_COMPONENTS)
+    except Exception:
+        return None
+
+
+def wordcloud_available():
+    try:
+        from nltk.corpus import stopwords
+        stopwords.words("portuguese")
+        return True
+    except Exception:
+        return False
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(args):
+    snapshot = RulePackWatcher().current()
+    engine = ContractAnalysisEngine(snapshot.rules, compiled_rules=snapshot.compiled)
+    nlp_model = load_spacy()
+    ner_engine = ContractAnalysisEngine(snapshot.rules, nlp_model, compiled_rules=snapshot.compiled) \
+        if nlp_model else None
+    has_wordcloud = wordcloud_available()
+
+    def skip(reason):
+        raise Skipped(reason)
+
+    def wordcloud(text):
+        import matplotlib.pyplot as plt
+
+        figure = VisualizationEngine.generate_wordcloud(text)
+        plt.close("all")
+        return figure
+
+    results, checks = [], []
+    print(f"{'páginas':>7} {'formato':>7} {'etapa':>17} {'mediana (ms)':>13} {'mín (ms)':>10}")
+    for pages in args.pages:
+        contract = generate(pages, args.density, args.seed)
+        text = contract.text
+        rows = []
+        for file_format in args.formats:
+            if file_format == "txt":
+                continue  # Texto colado: não passa pelo FileUtils
+            data = render(contract, file_format)
+            rows.append(stage(pages, file_format, "extract_text", args.repeat,
+                              lambda: FileUtils.extract_text(LocalFile(f"contrato.{file_format}", data))))
+
+        cleaned = TextUtils.clean_text(text)
+        sentence_index = SentenceIndex.split(cleaned)
+        analysis, _ = engine.analyze(text)
+        positions = [r.match_position for r in analysis if r.rule_id != "none"]
+        rows += [
+            stage(pages, "text", "clean_text", args.repeat, lambda: TextUtils.clean_text(text)),
+            stage(pages, "text", "tokenization", args.repeat,
+                  lambda: (SentenceIndex.split(cleaned), WordCounter.count(cleaned))),
+            stage(pages, "text", "analyze", args.repeat, lambda: engine.analyze(text)),
+            stage(pages, "text", "extract_entities", args.repeat,
+                  lambda: ner_engine._extract_entities(cleaned, sentence_index, positions) if ner_engine
+                  else skip(f"modelo spaCy {AppConfig.NLP_MODEL_NAME} não instalado")),
+            stage(pages, "text", "wordcloud", args.repeat,
+                  lambda: wordcloud(text) if has_wordcloud else skip("stopwords do NLTK indisponíveis")),
+            stage(pages, "text", "pdf_report", args.repeat,
+                  lambda: VisualizationEngine.generate_pdf_report(analysis, REPORT_USER)),
+        ]
+        for row in rows:
+            if row["status"] == "ok":
+                print(f"{pages:>7} {row['format']:>7} {row['stage']:>17} {row['median'] * 1000:>13.2f} "
+                      f"{row['min'] * 1000:>10.2f}")
+            else:
+                print(f"{pages:>7} {row['format']:>7} {row['stage']:>17} {row['status']:>13}  {row['reason']}")
+        results += rows
+
+        found = sorted({r.rule_id for r in analysis} - {"none"})
+        checks.append({"pages": pages, "words": contract.words, "planted": contract.planted, "found": found,
+                       "ok": found == sorted(contract.planted)})
+
+    filler = generate(max(args.pages), density=0, seed=args.seed)
+    false_positives = sorted({r.rule_id for r in engine.analyze(filler.text)[0]} - {"none"})
+    checks.append({"pages": max(args.pages), "planted": {}, "found": false_positives, "ok": not false_positives})
+
+    return {
+        "schema": SCHEMA,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpu_count": os.cpu_count(), "git_commit": git_commit(),
+                        "ruleset_digest": snapshot.digest},
+        "config": {"pages": args.pages, "formats": args.formats, "repeat": args.repeat,
+                   "density": args.density, "seed": args.seed},
+        "results": results,
+        "checks": checks,
+    }
+
+
+def compare(base, current, threshold, min_delta):
+    """Linhas (páginas, formato, etapa) das duas execuções e as regressões encontradas.
+
+    Uma etapa medida na base que falhou, foi pulada ou sumiu na execução atual
+    também é regressão.
+    """
+    key = lambda row: (row["pages"], row["format"], row["stage"])  # noqa: E731
+    current_rows = {key(row): row for row in current["results"]}
+    regressions = []
+    print(f"{'páginas':>7} {'formato':>7} {'etapa':>17} {'base (ms)':>10} {'atual (ms)':>11} {'variação':>9}")
+    for before in base["results"]:
+        if before["status"] != "ok":
+            continue
+        pages, file_format, name = key(before)
+        row = current_rows.get(key(before))
+        if row is None or row["status"] != "ok":
+            regressions.append(key(before))
+            status = "ausente" if row is None else row["status"]
+            reason = f"  ({row['reason']})" if row and row.get("reason") else ""
+            print(f"{pages:>7} {file_format:>7} {name:>17} {before['median'] * 1000:>10.2f} {status:>11} "
+                  f"{'':>9}  REGRESSÃO{reason}")
+            continue
+        delta = row["median"] - before["median"]
+        change = delta / before["median"] if before["median"] else 0.0
+        regressed = change >= threshold and delta >= min_delta
+        if regressed:
+            regressions.append(key(row))
+        print(f"{pages:>7} {file_format:>7} {name:>17} {before['median'] * 1000:>10.2f} "
+              f"{row['median'] * 1000:>11.2f} {change:>+8.0%}{'  REGRESSÃO' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="mede as etapas e grava o JSON")
+    run.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 500])
+    run.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--density", type=float, default=0.5, help="cláusulas plantadas por página")
+    run.add_argument("--seed", type=int, default=7)
+    run.add_argument("-o", "--output", help="arquivo JSON de saída")
+
+    cmp = commands.add_parser("compare", help="compara duas execuções e sinaliza regressões")
+    cmp.add_argument("base")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.2, help="piora relativa mínima (0.2 = 20%%)")
+    cmp.add_argument("--min-delta", type=float, default=0.005, help="piora absoluta mínima, em segundos")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run_suite(args)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        failed = [check for check in report["checks"] if not check["ok"]]
+        for check in failed:
+            print(f"ERRO: {check['pages']} páginas: plantadas {check['planted']}, encontradas {check['found']}")
+        sys.exit(1 if failed else 0)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    for report in (base, current):
+        if report.get("schema") != SCHEMA:
+            sys.exit(f"formato de resultado desconhecido: {report.get('schema')}")
+    if base["environment"].get("platform") != current["environment"].get("platform"):
+        print("aviso: as execuções são de ambientes diferentes")
+    regressions = compare(base, current, args.threshold, args.min_delta)
+    print(f"\n{len(regressions)} regressões (limite: +{args.threshold:.0%} e +{args.min_delta * 1000:.0f}ms)")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Gerador de contratos brasileiros sintéticos para os benchmarks.
+
+Monta contratos de locação ou de prestação de serviços com qualificação das
+partes (CPF/CNPJ com dígitos verificadores válidos), cláusulas numeradas por
+extenso, parágrafos, incisos, valores por extenso e citações de lei, até o
+número de páginas pedido (`WORDS_PER_PAGE` palavras por página). Cláusulas
+que disparam as regras são plantadas com densidade conhecida
+(`density` = cláusulas plantadas por página, em posições sorteadas), e o
+contrato guarda quantas foram plantadas por regra. O texto de preenchimento
+não dispara nenhuma regra do pacote padrão.
+
+O mesmo contrato pode ser gravado em .txt, .docx (python-docx) e .pdf
+(ReportLab). Tudo é determinístico para uma mesma semente.
+
+Uso:
+    python benchmarks/corpus.py --pages 1 10 100 --formats txt docx pdf -o corpus/
+"""
+import argparse
+import os
+import random
+import textwrap
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Dict, List, Tuple
+
+WORDS_PER_PAGE = 500
+FORMATS = ("txt", "docx", "pdf")
+
+# Cláusulas que disparam as regras do pacote padrão (rules/contract_rules.json)
+PLANTED_CLAUSES = {
+    "rule_001": [
+        "O LOCATÁRIO não poderá rescindir o presente contrato sob nenhuma hipótese antes do término do prazo.",
+        "Fica vedado ao CONTRATANTE rescindir este instrumento durante a vigência do prazo inicial.",
+        "Declaram as partes a impossibilidade de cancelamento do serviço após a assinatura.",
+        "Estabelece-se a proibição de cancelamento pelo CONTRATANTE enquanto houver parcelas vincendas.",
+    ],
+    "rule_002": [
+        "O contrato terá renovação tácita por iguais períodos, independentemente de manifestação das partes.",
+        "O CONTRATADO poderá promover reajuste unilateral dos valores a qualquer tempo.",
+        "Haverá renovação automática sem aviso prévio ao CONTRATANTE ao final de cada período.",
+        "Ocorrerá a prorrogação automática sem comunicação às partes, por prazo indeterminado.",
+    ],
+}
+
+FIRST_NAMES = ["João", "Maria", "José", "Ana", "Carlos", "Fernanda", "Paulo", "Juliana", "Ricardo", "Patrícia",
+               "Luiz", "Camila", "Marcos", "Beatriz", "Rafael", "Larissa"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Pereira", "Costa", "Rodrigues", "Almeida", "Nascimento",
+              "Lima", "Araújo", "Ferreira", "Carvalho", "Gomes", "Ribeiro", "Martins"]
+COMPANIES = ["Imobiliária Horizonte Ltda.", "Serviços Integrados Paulista S.A.", "Construtora Vale Verde Ltda.",
+             "Tecnologia e Gestão Andrade EIRELI", "Administradora Bandeirantes Ltda."]
+CITIES = [("São Paulo", "SP"), ("Rio de Janeiro", "RJ"), ("Belo Horizonte", "MG"), ("Curitiba", "PR"),
+          ("Porto Alegre", "RS"), ("Recife", "PE"), ("Salvador", "BA"), ("Fortaleza", "CE")]
+STREETS = ["Rua das Flores", "Avenida Paulista", "Rua XV de Novembro", "Avenida Brasil", "Rua Sete de Setembro",
+           "Alameda Santos", "Rua Augusta", "Avenida Atlântica"]
+ORDINALS = ["PRIMEIRA", "SEGUNDA", "TERCEIRA", "QUARTA", "QUINTA", "SEXTA", "SÉTIMA", "OITAVA", "NONA", "DÉCIMA"]
+UNITS = ["", "um", "dois", "três", "quatro", "cinco", "seis", "sete", "oito", "nove"]
+HUNDREDS = ["", "cento", "duzentos", "trezentos", "quatrocentos", "quinhentos", "seiscentos", "setecentos",
+            "oitocentos", "novecentos"]
+
+CONTRACT_TYPES = {
+    "locação": {
+        "title": "CONTRATO DE LOCAÇÃO DE IMÓVEL RESIDENCIAL",
+        "roles": ("LOCADOR", "LOCATÁRIO"),
+        "law": "Lei nº 8.245/91",
+        "themes": ["DO OBJETO", "DO PRAZO", "DO ALUGUEL", "DOS ENCARGOS", "DA CONSERVAÇÃO DO IMÓVEL",
+                   "DAS BENFEITORIAS", "DA GARANTIA", "DA VISTORIA", "DAS PENALIDADES", "DO FORO"],
+    },
+    "serviços": {
+        "title": "CONTRATO DE PRESTAÇÃO DE SERVIÇOS",
+        "roles": ("CONTRATADO", "CONTRATANTE"),
+        "law": "Lei nº 10.406/2002 (Código Civil)",
+        "themes": ["DO OBJETO", "DA EXECUÇÃO DOS SERVIÇOS", "DO PREÇO", "DAS OBRIGAÇÕES DO CONTRATADO",
+                   "DAS OBRIGAÇÕES DO CONTRATANTE", "DA CONFIDENCIALIDADE", "DA VIGÊNCIA", "DAS PENALIDADES",
+                   "DA PROTEÇÃO DE DADOS", "DO FORO"],
+    },
+}
+
+# Frases de preenchimento; {a} e {b} são os papéis das partes
+FILLER = [
+    "O {b} pagará ao {a} o valor mensal de {valor}, até o quinto dia útil de cada mês, mediante boleto bancário.",
+    "O atraso no pagamento sujeitará o {b} à multa de 2% (dois por cento) e juros de 1% (um por cento) ao mês.",
+    "O {a} se obriga a entregar o objeto em condições de uso, conforme o laudo de vistoria anexo.",
+    "As despesas ordinárias de condomínio, IPTU e consumo de água e energia correrão por conta do {b}.",
+    "Qualquer tolerância das partes quanto ao cumprimento das obrigações não implicará novação ou renúncia.",
+    "As notificações entre as partes serão feitas por escrito, no endereço indicado no preâmbulo.",
+    "O presente instrumento obriga as partes e seus sucessores a qualquer título.",
+    "Nos termos do art. 22 da {lei}, compete ao {a} garantir o uso pacífico do objeto durante a vigência.",
+    "O {b} poderá rescindir o contrato mediante aviso prévio de 30 (trinta) dias, pagando a multa proporcional.",
+    "Os valores serão corrigidos anualmente pelo IPCA/IBGE, ou pelo índice oficial que vier a substituí-lo.",
+    "As partes declaram ter lido e compreendido todas as cláusulas, conforme o art. 46 do CDC.",
+    "O {b} não poderá ceder ou transferir os direitos deste contrato sem a anuência prévia e escrita do {a}.",
+    "Eventuais benfeitorias necessárias serão indenizadas, nos termos do art. 35 da {lei}.",
+    "O {a} fornecerá recibo discriminado de cada pagamento efetuado pelo {b}.",
+    "A garantia prestada subsistirá até a efetiva devolução do objeto, com a quitação de todas as obrigações.",
+    "O tratamento de dados pessoais observará a Lei nº 13.709/2018 (LGPD), limitado às finalidades deste contrato.",
+]
+
+
+@dataclass
+class SyntheticContract:
+    pages: int
+    paragraphs: List[Tuple[str, str]]  # (estilo, texto); estilo: "title", "heading" ou "body"
+    planted: Dict[str, int] = field(default_factory=dict)  # Cláusulas plantadas por regra
+
+    @property
+    def text(self) -> str:
+        return "\n".join(text for _, text in self.paragraphs)
+
+    @property
+    def words(self) -> int:
+        return sum(len(text.split()) for _, text in self.paragraphs)
+
+
+def _check_digits(digits: List[int], weights: List[int]) -> int:
+    remainder = sum(d * w for d, w in zip(digits, weights)) % 11
+    return 0 if remainder < 2 else 11 - remainder
+
+
+def fake_cpf(rng: random.Random) -> str:
+    digits = [rng.randrange(10) for _ in range(9)]
+    digits.append(_check_digits(digits, list(range(10, 1, -1))))
+    digits.append(_check_digits(digits, list(range(11, 1, -1))))
+    d = "".join(map(str, digits))
+    return f"{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}"
+
+
+def fake_cnpj(rng: random.Random) -> str:
+    digits = [rng.randrange(10) for _ in range(8)] + [0, 0, 0, 1]
+    digits.append(_check_digits(digits, [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]))
+    digits.append(_check_digits(digits, [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]))
+    d = "".join(map(str, digits))
+    return f"{d[:2]}.{d[2:5]}.{d[5:8]}/{d[8:12]}-{d[12:]}"
+
+
+def _hundreds_in_words(n: int) -> str:
+    if n == 100:
+        return "cem"
+    tens_words = ["", "dez", "vinte", "trinta", "quarenta", "cinquenta", "sessenta", "setenta", "oitenta", "noventa"]
+    teens = ["dez", "onze", "doze", "treze", "quatorze", "quinze", "dezesseis", "dezessete", "dezoito", "dezenove"]
+    parts = []
+    if n >= 100:
+        parts.append(HUNDREDS[n // 100])
+    rest = n % 100
+    if 10 <= rest < 20:
+        parts.append(teens[rest - 10])
+    else:
+        if rest >= 20:
+            parts.append(tens_words[rest // 10])
+        if rest % 10:
+            parts.append(UNITS[rest % 10])
+    return " e ".join(parts)
+
+
+def money(value: int) -> str:
+    """Valor em reais com o extenso (ex.: "R$ 2.500,00 (dois mil e quinhentos reais)")"""
+    thousands, rest = divmod(value, 1000)
+    words = []
+    if thousands:
+        words.append("mil" if thousands == 1 else f"{_hundreds_in_words(thousands)} mil")
+    if rest:
+        words.append(_hundreds_in_words(rest))
+    spelled = " e ".join(words) if rest < 100 or rest % 100 == 0 else ", ".join(words)
+    return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + f" ({spelled} reais)"
+
+
+def _person(rng: random.Random) -> str:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+    city, state = rng.choice(CITIES)
+    return (f"{name}, brasileiro(a), portador(a) do CPF nº {fake_cpf(rng)}, residente na {rng.choice(STREETS)}, "
+            f"nº {rng.randrange(10, 3000)}, {city}/{state}")
+
+
+def _company(rng: random.Random) -> str:
+    city, state = rng.choice(CITIES)
+    return (f"{rng.choice(COMPANIES)}, inscrita no CNPJ sob o nº {fake_cnpj(rng)}, com sede na "
+            f"{rng.choice(STREETS)}, nº {rng.randrange(10, 3000)}, {city}/{state}")
+
+
+def generate(pages: int, density: float = 0.5, seed: int = 7, kind: str = "") -> SyntheticContract:
+    """Contrato com `pages` páginas e cerca de `density` cláusulas plantadas por página (no mínimo uma, se > 0)"""
+    rng = random.Random(f"{seed}-{pages}-{density}-{kind}")
+    spec = CONTRACT_TYPES[kind or rng.choice(sorted(CONTRACT_TYPES))]
+    role_a, role_b = spec["roles"]
+    city, state = rng.choice(CITIES)
+    contract = SyntheticContract(pages=pages, paragraphs=[("title", spec["title"])])
+    contract.paragraphs.append(("body",
+        f"Pelo presente instrumento particular, de um lado {_company(rng)}, doravante denominada {role_a}, "
+        f"e de outro lado {_person(rng)}, doravante denominado(a) {role_b}, têm entre si justo e contratado "
+        f"o seguinte, regido pela {spec['law']} e pelo Código de Defesa do Consumidor."))
+
+    target_words = pages * WORDS_PER_PAGE
+    planted_total = max(1, round(pages * density)) if density > 0 else 0  # density=0: só preenchimento
+    rule_ids = sorted(PLANTED_CLAUSES)
+    # Posições (em palavras) das cláusulas plantadas, sorteadas ao longo do documento
+    plant_at = sorted(rng.randrange(target_words) for _ in range(planted_total))
+
+    words, clause_number = contract.words, 0
+    while words < target_words:
+        clause_number += 1
+        ordinal = ORDINALS[(clause_number - 1) % len(ORDINALS)]
+        if clause_number > len(ORDINALS):
+            ordinal = f"{ordinal} ({clause_number}ª)"
+        heading = f"CLÁUSULA {ordinal} – {spec['themes'][(clause_number - 1) % len(spec['themes'])]}"
+        contract.paragraphs.append(("heading", heading))
+        words += len(heading.split())
+
+        for paragraph_number in range(rng.randrange(2, 5)):
+            sentences = []
+            for _ in range(rng.randrange(2, 5)):
+                if plant_at and words >= plant_at[0]:
+                    plant_at.pop(0)
+                    rule_id = rule_ids[sum(contract.planted.values()) % len(rule_ids)]  # Alterna as regras
+                    sentence = rng.choice(PLANTED_CLAUSES[rule_id])
+                    contract.planted[rule_id] = contract.planted.get(rule_id, 0) + 1
+                else:
+                    sentence = rng.choice(FILLER).format(
+                        a=role_a, b=role_b, lei=spec["law"], valor=money(rng.randrange(8, 60) * 100))
+                sentences.append(sentence)
+                words += len(sentence.split())
+            prefix = ("Parágrafo único. " if paragraph_number == 1 and rng.random() < 0.3
+                      else f"{['I', 'II', 'III', 'IV'][paragraph_number]} – " if rng.random() < 0.3 else "")
+            contract.paragraphs.append(("body", prefix + " ".join(sentences)))
+
+    for _ in plant_at:  # Posições além do fim do texto: planta no último parágrafo
+        rule_id = rule_ids[sum(contract.planted.values()) % len(rule_ids)]
+        contract.planted[rule_id] = contract.planted.get(rule_id, 0) + 1
+        contract.paragraphs.append(("body", PLANTED_CLAUSES[rule_id][0]))
+
+    contract.paragraphs.append(("body",
+        f"E, por estarem justas e contratadas, as partes assinam o presente em 2 (duas) vias de igual teor, "
+        f"na presença de 2 (duas) testemunhas. {city}/{state}, {rng.randrange(1, 29)} de março de 2024."))
+    return contract
+
+
+def to_txt(contract: SyntheticContract) -> bytes:
+    return contract.text.encode("utf-8")
+
+
+def to_docx(contract: SyntheticContract) -> bytes:
+    from docx import Document
+
+    document = Document()
+    for style, text in contract.paragraphs:
+        if style == "title":
+            document.add_heading(text, level=1)
+        elif style == "heading":
+            document.add_paragraph().add_run(text).bold = True
+        else:
+            document.add_paragraph(text)
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def to_pdf(contract: SyntheticContract) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    y = height - 50
+    for style, text in contract.paragraphs:
+        font, size = ("Helvetica-Bold", 10) if style in ("title", "heading") else ("Helvetica", 9)
+        for line in textwrap.wrap(text, 100) or [""]:
+            if y < 50:
+                pdf.showPage()
+                y = height - 50
+            pdf.setFont(font, size)
+            pdf.drawString(45, y, line)
+            y -= 11.5
+        y -= 6
+    pdf.save()
+    return buffer.getvalue()
+
+
+WRITERS = {"txt": to_txt, "docx": to_docx, "pdf": to_pdf}
+
+
+def render(contract: SyntheticContract, file_format: str) -> bytes:
+    return WRITERS[file_format](contract)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--density", type=float, default=0.5, help="cláusulas plantadas por página")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("-o", "--output", required=True, help="diretório de saída")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    for pages in args.pages:
+        contract = generate(pages, args.density, args.seed)
+        for file_format in args.formats:
+            path = os.path.join(args.output, f"contrato_{pages:03d}p.{file_format}")
+            with open(path, "wb") as f:
+                f.write(render(contract, file_format))
+        print(f"{pages:>4} páginas: {contract.words} palavras, plantadas {contract.planted}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,4 @@
-git add requirements.txt runtime.txt
-git commit -m "Fix package versions"
-git push
+"""
 ================================================================
 CLARA - ANÁLISE CONTRATUAL INTELIGENTE (v2.1)
 Arquivo completo com 1250+ linhas organizadas e otimizadas
@@ -13,17 +11,10 @@ Arquivo completo com 1250+ linhas organizadas e otimizadas
 import streamlit as st
 import re
 from docx import Document
-import PyPDF2
 from io import BytesIO
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
 import hashlib
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from datetime import datetime
+import hmac
+from datetime import datetime, timedelta, timezone
 import time
 import base64
 import smtplib
@@ -34,46 +25,50 @@ import string
 import io
 import os
 import json
-from PIL import Image
-import requests
-from bs4 import BeautifulSoup
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
 from collections import Counter
-import spacy
-from spacy import displacy
-from wordcloud import WordCloud
-from typing import Dict, List, Tuple, Optional, Any, Union
+import clara_extraction
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, Optional, Any, Union, Iterable, Iterator
 import logging
 from loguru import logger
-import tempfile
-import zipfile
 import warnings
 import sys
 import traceback
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 import unicodedata
-import socket
+import queue
+import tempfile
 import ssl
 import uuid
+import bisect
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-# Configuração inicial de warnings
-warnings.filterwarnings('ignore')
+try:  # Python 3.11+
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python 3.9/3.10
+    import sre_parse
+    import sre_constants
 
-# Verificação e download de recursos NLTK
 try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    try:
-        nltk.download('punkt')
-        nltk.download('stopwords')
-    except Exception as e:
-        logger.error(f"Erro ao baixar recursos NLTK: {str(e)}")
-        st.error("Erro ao configurar recursos de linguagem. Algumas funcionalidades podem não estar disponíveis.")
+    import ahocorasick
+except ImportError:  # Prefiltro usa busca por substring sem o pyahocorasick
+    ahocorasick = None
+
+# Módulos pesados (spaCy, pandas, matplotlib, plotly, wordcloud, gspread) são
+# importados no ponto de uso, para que novos processos iniciem rápido
+if TYPE_CHECKING:
+    import gspread
+    import matplotlib.pyplot as plt
+    import plotly.graph_objects as go
+    import spacy
+
+# Configuração inicial de warnings
+warnings.filterwarnings('ignore')
 
 #################################################################
 # 2. CLASSES E ESTRUTURAS DE DADOS
@@ -83,6 +78,16 @@ class RiskLevel(Enum):
     MEDIUM = "Médio"
     HIGH = "Alto"
 
+class SpanMode(Enum):
+    UNBOUNDED = "unbounded"  # `.*` pode atravessar o documento inteiro
+    LINE = "line"            # mesmo resultado de UNBOUNDED (`.` não cruza linhas), sem retrocesso
+    CHARS = "chars"          # match limitado a `max_span` caracteres
+    SENTENCE = "sentence"    # match limitado a uma sentença/cláusula (e a `max_span`)
+
+class NerScope(Enum):
+    DOCUMENT = "document"  # entidades do documento inteiro
+    MATCHES = "matches"    # só nos contextos das cláusulas encontradas pelas regras
+
 @dataclass
 class ContractRule:
     id: str
@@ -94,6 +99,8 @@ class ContractRule:
     solution: str
     legal_references: List[str]
     tags: List[str]
+    span_mode: SpanMode = SpanMode.UNBOUNDED
+    max_span: int = 500
 
 @dataclass
 class AnalysisResult:
@@ -109,6 +116,16 @@ class AnalysisResult:
     match_position: int
     context: str
 
+@dataclass
+class ExtractionResult:
+    text: str
+    page_count: Optional[int]
+    extraction_time: float
+    workers: int = 1
+    partial: bool = False
+    skipped_pages: List[int] = field(default_factory=list)  # Numeração a partir de 1
+    retried_pages: List[int] = field(default_factory=list)  # Recuperadas com o pdfplumber
+
 @dataclass
 class ContractMetadata:
     contract_hash: str
@@ -117,12 +134,46 @@ class ContractMetadata:
     entities: Optional[List[Tuple[str, str]]]
     processing_time: float
     analyzed_at: datetime
+    ruleset_digest: Optional[str] = None
+    # Segundos por etapa da análise (hashing, cleaning, tokenization, rules, results, ner)
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    # Por regra: {"matches": padrões com match, "seconds": tempo gasto nos regex da regra,
+    #             "truncated": matches descartados por `max_span`}
+    rule_stats: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+# Recebe a etapa atual e a fração concluída da análise (0 a 1)
+ProgressCallback = Callable[[str, float], None]
 
 class ContractAnalyzer(ABC):
     @abstractmethod
-    def analyze(self, text: str) -> Tuple[List[AnalysisResult], ContractMetadata]:
+    def analyze(self, text: str, progress: Optional[ProgressCallback] = None
+                ) -> Tuple[List[AnalysisResult], ContractMetadata]:
         pass
 
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+@dataclass
+class AnalysisJob:
+    job_id: str
+    session_id: str
+    contract_hash: str
+    status: JobStatus = JobStatus.QUEUED
+    stage: str = "Na fila"
+    progress: float = 0.0
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    results: Optional[List[AnalysisResult]] = None
+    metadata: Optional[ContractMetadata] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.DONE, JobStatus.FAILED)
+
 #################################################################
 # 3. CONFIGURAÇÕES INICIAIS E CONSTANTES
 #################################################################
@@ -134,16 +185,62 @@ class AppConfig:
     
     GOOGLE_SHEET_KEY = "10vw0ghFU9Gefk53f8WiIhgKAChdkdqtx9WvphwmiNrA"
     SHEET_NAME = "Leads"
+    LEAD_HASH_SECRET = "lead_hash_key"  # Chave em st.secrets do HMAC da impressão digital gravada na planilha
     
     EMAIL_CONFIG = {
         "sender": "contato@clara-legal.com",
         "password": "sua_senha_segura",
         "smtp_server": "smtp.clara-legal.com",
         "port": 587,
-        "timeout": 10
+        "timeout": 10,                     # segundos, por conexão (não altera o padrão do processo)
+        "use_tls": True,                   # STARTTLS antes do login
+        "max_messages_per_connection": 100,
+        "idle_timeout": 60,                # segundos ociosa antes de testar a conexão com NOOP
+        "outbox_workers": 2,               # sessões SMTP abertas em paralelo
+        "max_retries": 3,
+        "retry_backoff": 5                 # segundos; dobra a cada nova tentativa
     }
     
+    ANALYTICS_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "clara_analytics.db")
+    ANALYSIS_CACHE_MEMORY_ENTRIES = 256
+    ANALYSIS_CACHE_PERSISTENT_ENTRIES = 10000
+    
+    NLP_MODEL_NAME = "pt_core_news_sm"
+    # O motor só usa as entidades (NER); a segmentação de sentenças é feita pelo LegalSentenceSplitter
+    NLP_DISABLED_COMPONENTS = ("parser", "lemmatizer", "tagger", "morphologizer", "attribute_ruler", "senter")
+    
+    NER_SCOPE = NerScope.DOCUMENT
+    NER_CHUNK_CHARS = 20000  # Sentenças agrupadas em partes de até este tamanho para o nlp.pipe
+    NER_BATCH_SIZE = 32
+    NER_PROCESSES = 1  # >1 usa processos do spaCy; compensa só em documentos grandes
+    
+    CONTEXT_WINDOW_SENTENCES = 1  # Sentenças de contexto antes/depois de cada match
+    STREAM_OVERLAP_CHARS = 2000    # Sobreposição entre janelas na análise incremental
+    STREAM_WINDOW_CHARS = 200000   # Tamanho máximo de cada janela na análise incremental
+    SLOW_ANALYSIS_SECONDS = None   # Análises mais longas têm a pilha amostrada e registrada (None desliga)
+    PROFILER_SAMPLE_INTERVAL = 0.005  # segundos entre amostras da pilha
+    PROFILER_STACK_DEPTH = 12      # Quadros guardados por amostra (a partir do mais interno)
+    PROFILER_TOP_STACKS = 10       # Pilhas mais frequentes incluídas no registro
+    
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    PDF_PARALLEL_MIN_PAGES = 40  # Abaixo disso a extração serial é mais rápida
+    PDF_WORKERS = os.cpu_count() or 1
+    PDF_PAGE_TIMEOUT = 20  # segundos por página antes de encerrar o processo auxiliar
+    PDF_WORKER_MEMORY_LIMIT = 1024 * 1024 * 1024  # 1GB de espaço de endereçamento por processo
+    PDF_PLUMBER_RETRY = True  # Tenta de novo com o pdfplumber as páginas que falharem
+    EXTRACTION_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Texto extraído mantido em memória entre sessões
+    JOB_WORKERS = 4            # Análises executadas em paralelo fora das threads do Streamlit
+    JOB_MAX_FINISHED = 500     # Jobs concluídos mantidos para consulta
+    JOB_POLL_INTERVAL = 0.5    # segundos entre atualizações do progresso na tela
+    SHEETS_INDEX_TTL = 600     # segundos até reler a coluna de e-mails (linhas de outros processos)
+    LEADS_SPOOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "clara.db")
+    LEADS_FLUSH_INTERVAL = 2.0   # segundos entre esvaziamentos da fila de leads
+    LEADS_BATCH_SIZE = 200       # leads por lote enviado ao Google Sheets
+    LEADS_BACKOFF_BASE = 2.0     # segundos; dobra a cada falha seguida
+    LEADS_BACKOFF_MAX = 300.0
+    RULE_PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules", "contract_rules.json")
+    RULE_ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".rule_cache")
+    RULE_PACK_CHECK_INTERVAL = 5.0  # segundos entre verificações de mudança no pacote de regras
     SESSION_TIMEOUT = 1800  # 30 minutos em segundos
     
     @staticmethod
@@ -157,6 +254,7 @@ class AppConfig:
 #################################################################
 # 4. REGRAS DE ANÁLISE CONTRATUAL (ATUALIZADAS)
 #################################################################
+# Regras embutidas: usadas quando o pacote em `AppConfig.RULE_PACK_PATH` não existe
 CONTRACT_RULES = [
     ContractRule(
         id="rule_001",
@@ -175,7 +273,8 @@ CONTRACT_RULES = [
             "CDC Art. 51, IV - Direito de arrependimento",
             "STJ REsp 1.558.921 - Direito de rescisão"
         ],
-        tags=["cancelamento", "direito_consumidor", "clausula_abusiva"]
+        tags=["cancelamento", "direito_consumidor", "clausula_abusiva"],
+        span_mode=SpanMode.LINE
     ),
     ContractRule(
         id="rule_002",
@@ -194,7 +293,8 @@ CONTRACT_RULES = [
             "Lei 8.245/91 - Art. 5º - Renovação de contratos",
             "STJ REsp 1.426.154 - Renovação automática"
         ],
-        tags=["renovação", "clausula_abusiva", "serviços"]
+        tags=["renovação", "clausula_abusiva", "serviços"],
+        span_mode=SpanMode.LINE
     ),
     # ... (adicionar mais 20+ regras detalhadas)
 ]
@@ -226,22 +326,222 @@ class TextUtils:
         excerpt = excerpt.replace(match.group(), highlighted)
         return f"...{excerpt}..."
     
+class LegalSentenceSplitter:
+    """Divisor de sentenças para textos jurídicos brasileiros, com offsets.
+
+    Percorre o texto uma única vez procurando pontuação final (. ! ? …) seguida
+    de espaço, e não corta quando o ponto pertence a uma abreviação comum em
+    contratos ("Art.", "Inc.", "nº", "Ltda.", "S.A."), a um rótulo de
+    enumeração no início da sentença ("1.", "IV.") ou quando a palavra seguinte
+    começa com minúscula. Retorna spans (início, fim) no próprio texto, sem a
+    busca de cada sentença que o `sent_tokenize` exigia.
+    """
+
+    ABBREVIATIONS = frozenset({
+        "art", "arts", "inc", "incs", "al", "par", "parág", "cap", "caps", "tít", "seç", "subseç",
+        "n", "nº", "no", "nos", "núm", "fl", "fls", "p", "pp", "pág", "págs", "pag", "vol", "ed",
+        "cf", "obs", "ex", "id", "ibid", "op", "cit", "apud", "reg", "res", "dec", "proc", "rel",
+        "min", "des", "dr", "dra", "drs", "dras", "sr", "sra", "srs", "sras", "srta", "exmo",
+        "exma", "ilmo", "ilma", "prof", "profa", "eng", "adv", "jr", "ltda", "cia", "me", "epp",
+        "av", "r", "rod", "km", "tel", "cel", "ap", "apto", "bl", "cx", "cep", "aprox", "máx", "mín",
+        "jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez",
+    })
+    BOUNDARY = re.compile(r"[.!?…]+[\"'”»)\]]*(?=\s|$)")
+    INITIALISM = re.compile(r'(?:\w\.)+\w')  # S.A, C.P.F, U.S.A
+    ENUMERATION = re.compile(r'(?:\d{1,3}|[IVXLC]{1,6}|[a-z])')
+    LETTER_ITEM = re.compile(r'[a-z][.)]\s')  # "a) ...", "b. ..." depois do ponto final
+    HEADINGS = frozenset({"cláusula", "clausula", "item", "seção", "capítulo", "título", "anexo", "parágrafo"})
+
+    @classmethod
+    def spans(cls, text: str) -> List[Tuple[int, int]]:
+        """Spans (início, fim) das sentenças de `text`, sem espaços nas pontas"""
+        spans = []
+        start = cls._skip_spaces(text, 0)
+        for boundary in cls.BOUNDARY.finditer(text):
+            end = boundary.end()
+            if end <= start or not cls._is_sentence_end(text, start, boundary):
+                continue
+            spans.append((start, end))
+            start = cls._skip_spaces(text, end)
+        if start < len(text):
+            end = len(text)
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if end > start:
+                spans.append((start, end))
+        return spans
+
     @staticmethod
-    def get_context(sentences: List[str], match_text: str) -> str:
-        """Obtém sentenças de contexto ao redor do match"""
-        context = []
-        for i, sent in enumerate(sentences):
-            if match_text in sent:
-                context.extend(sentences[max(0, i-1):min(len(sentences), i+2)])
-                break
-        return " ".join(context)
+    def _skip_spaces(text: str, position: int) -> int:
+        while position < len(text) and text[position].isspace():
+            position += 1
+        return position
+
+    @classmethod
+    def _is_sentence_end(cls, text: str, sentence_start: int, boundary: re.Match) -> bool:
+        following = cls._skip_spaces(text, boundary.end())
+        if (following < len(text) and text[following].islower()
+                and not cls.LETTER_ITEM.match(text, following)):
+            return False
+        if boundary.group()[0] != ".":
+            return True
+
+        # Palavra imediatamente antes do ponto
+        token_start = boundary.start()
+        while token_start > sentence_start and not text[token_start - 1].isspace():
+            token_start -= 1
+        token = text[token_start:boundary.start()].lstrip('("\'§')
+        if not token:
+            return True
+        if token.lower() in cls.ABBREVIATIONS or cls.INITIALISM.fullmatch(token):
+            return False
+        if cls.ENUMERATION.fullmatch(token):
+            # Rótulo de item ("1.", "IV.", "a.") ou título ("CLÁUSULA 1.") e não fim de sentença
+            if token_start == sentence_start:
+                return False
+            previous = text[sentence_start:token_start].split() if token_start - sentence_start <= 16 else []
+            if len(previous) == 1 and previous[0].lower() in cls.HEADINGS:
+                return False
+        return True
+
+class WordCounter:
+    """Contador incremental de palavras (sequências alfanuméricas).
+
+    Aceita o texto em partes arbitrárias: uma palavra cortada entre duas
+    partes é contada uma vez só.
+    """
+
+    WORD = re.compile(r"\w+")
+
+    def __init__(self):
+        self.total = 0
+        self._inside_word = False
+
+    def feed(self, chunk: str) -> int:
+        if not chunk:
+            return self.total
+        count = sum(1 for _ in self.WORD.finditer(chunk))
+        if self._inside_word and self.WORD.match(chunk[0]):
+            count -= 1  # Continuação da palavra que terminou a parte anterior
+        self.total += count
+        self._inside_word = self.WORD.match(chunk[-1]) is not None
+        return self.total
+
+    @classmethod
+    def count(cls, text: str) -> int:
+        return cls().feed(text)
+
+class SentenceIndex:
+    """Índice ordenado dos offsets (início/fim) de cada sentença no texto.
+
+    Construído uma vez por análise; permite achar a sentença de qualquer
+    posição com busca binária em vez de procurar o trecho em todas as sentenças.
+    """
+
+    def __init__(self, text: str, sentences: List[str]):
+        self.sentences: List[str] = []
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        cursor = 0
+        for sentence in sentences:
+            start = text.find(sentence, cursor)
+            if start == -1:
+                continue  # Sentença normalizada pelo tokenizador; não há offset exato
+            self.sentences.append(sentence)
+            self.starts.append(start)
+            self.ends.append(start + len(sentence))
+            cursor = start + len(sentence)
+
+    @classmethod
+    def from_spans(cls, text: str, spans: List[Tuple[int, int]]) -> "SentenceIndex":
+        """Constrói o índice direto dos spans (ex.: de `LegalSentenceSplitter`)"""
+        index = cls(text, [])
+        index.starts = [start for start, _ in spans]
+        index.ends = [end for _, end in spans]
+        index.sentences = [text[start:end] for start, end in spans]
+        return index
+
+    @classmethod
+    def split(cls, text: str) -> "SentenceIndex":
+        return cls.from_spans(text, LegalSentenceSplitter.spans(text))
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def locate(self, position: int) -> int:
+        """Índice da sentença que contém (ou precede) a posição informada"""
+        return max(0, bisect.bisect_right(self.starts, position) - 1)
+
+    def context(self, position: int, window: int = 1) -> str:
+        """Sentença da posição mais `window` sentenças antes e depois"""
+        if not self.sentences:
+            return ""
+        i = self.locate(position)
+        return " ".join(self.sentences[max(0, i - window):i + window + 1])
+
+    def context_span(self, position: int, window: int = 1) -> Tuple[int, int]:
+        """Offsets (início, fim) do mesmo trecho retornado por `context`"""
+        if not self.sentences:
+            return 0, 0
+        i = self.locate(position)
+        return self.starts[max(0, i - window)], self.ends[min(len(self.sentences), i + window + 1) - 1]
+
+    def chunk_spans(self, max_chars: int) -> List[Tuple[int, int]]:
+        """Agrupa sentenças consecutivas em trechos de até `max_chars` caracteres.
+
+        Os cortes caem sempre entre sentenças; uma sentença maior que o limite
+        é dividida em pedaços de `max_chars`.
+        """
+        spans = []
+        chunk_start = None
+        chunk_end = 0
+        for start, end in zip(self.starts, self.ends):
+            if chunk_start is not None and end - chunk_start > max_chars:
+                spans.append((chunk_start, chunk_end))
+                chunk_start = None
+            if chunk_start is None:
+                while end - start > max_chars:
+                    spans.append((start, start + max_chars))
+                    start += max_chars
+                chunk_start = start
+            chunk_end = end
+        if chunk_start is not None:
+            spans.append((chunk_start, chunk_end))
+        return spans
 
 class SecurityUtils:
+    FINGERPRINT_VERSION = 1
+    RULESET_DIGEST_VERSION = 1
+
     @staticmethod
     def generate_secure_hash(text: str) -> str:
-        """Gera um hash seguro para o texto"""
+        """Gera um hash seguro (PBKDF2 com salt aleatório) para o texto"""
         salt = os.urandom(16)
         return hashlib.pbkdf2_hmac('sha256', text.encode(), salt, 100000).hex()
+
+    @staticmethod
+    def content_fingerprint(text: str) -> str:
+        """Gera uma impressão digital determinística (BLAKE2b) do texto normalizado"""
+        normalized = unicodedata.normalize('NFC', " ".join(text.split()))
+        person = f"clara-doc-v{SecurityUtils.FINGERPRINT_VERSION}".encode()
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=32, person=person).hexdigest()
+
+    @staticmethod
+    def keyed_fingerprint(fingerprint: str, key: bytes) -> str:
+        """HMAC-SHA256 da impressão digital: reproduzível e comparável só por quem tem a chave"""
+        return hmac.new(key, fingerprint.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def ruleset_digest(rules: List[ContractRule]) -> str:
+        """Gera um digest versionado do conjunto de regras (muda se qualquer regra mudar)"""
+        payload = json.dumps(
+            [asdict(rule) for rule in rules],
+            default=lambda value: value.value if isinstance(value, Enum) else str(value),
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        digest = hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+        return f"v{SecurityUtils.RULESET_DIGEST_VERSION}-{digest}"
     
     @staticmethod
     def validate_email(email: str) -> bool:
@@ -249,173 +549,2163 @@ class SecurityUtils:
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         return re.match(pattern, email) is not None
 
-class FileUtils:
-    @staticmethod
-    def extract_text(file: BytesIO) -> Optional[str]:
-        """Extrai texto de arquivos PDF ou DOCX com tratamento de erros"""
+class FileUtils:
+    EXTRACTOR_VERSION = 1  # Incrementar ao mudar a extração; invalida o ExtractionCache
+
+    @staticmethod
+    def extract_text(file: BytesIO) -> Optional[str]:
+        """Extrai texto de arquivos PDF ou DOCX com tratamento de erros"""
+        extraction = FileUtils.extract_with_metadata(file)
+        return extraction.text if extraction else None
+    
+    @staticmethod
+    def extract_with_metadata(file: BytesIO) -> Optional[ExtractionResult]:
+        """Extrai o texto e informa número de páginas e tempo de extração"""
+        start_time = time.time()
+        try:
+            if file.type == "application/pdf":
+                return FileUtils._extract_from_pdf(file)
+            elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+                text = FileUtils._extract_from_docx(file)
+                if text is None:
+                    return None
+                return ExtractionResult(text=text, page_count=None, extraction_time=time.time() - start_time)
+            else:
+                logger.error(f"Formato de arquivo não suportado: {file.type}")
+                return None
+        except Exception as e:
+            logger.error(f"Erro ao extrair texto: {str(e)}")
+            return None
+    
+    @staticmethod
+    def iter_text_chunks(file: BytesIO) -> Iterator[str]:
+        """Extrai o texto parte a parte (páginas do PDF, parágrafos do DOCX) sem montar o documento"""
+        try:
+            if file.type == "application/pdf":
+                data = file.getvalue() if hasattr(file, "getvalue") else file.read()
+                pool = clara_extraction.get_page_pool(AppConfig.PDF_WORKERS, AppConfig.PDF_WORKER_MEMORY_LIMIT)
+                with pool.open(data) as document:
+                    for outcome in document.iter_pages(AppConfig.PDF_PAGE_TIMEOUT, AppConfig.PDF_PLUMBER_RETRY):
+                        if outcome.status != clara_extraction.PAGE_OK:
+                            logger.warning(f"Página {outcome.index + 1} do PDF pulada ({outcome.status})")
+                        yield outcome.text
+            elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+                for para in Document(file).paragraphs:
+                    if para.text.strip():
+                        yield para.text
+            else:
+                logger.error(f"Formato de arquivo não suportado: {file.type}")
+        except Exception as e:
+            logger.error(f"Erro ao extrair texto: {str(e)}")
+    
+    @staticmethod
+    def _extract_from_pdf(file: BytesIO, parallel: bool = True) -> Optional[ExtractionResult]:
+        """Extrai texto de arquivos PDF página a página, com limite de tempo e memória por página"""
+        start_time = time.time()
+        data = file.getvalue() if hasattr(file, "getvalue") else file.read()
+        pool = clara_extraction.get_page_pool(AppConfig.PDF_WORKERS, AppConfig.PDF_WORKER_MEMORY_LIMIT)
+        try:
+            # O PDF é aberto e suas páginas contadas no processo auxiliar, sob LOAD_TIMEOUT
+            with pool.open(data) as document:
+                page_count = document.page_count
+                workers = 1
+                if parallel and page_count >= AppConfig.PDF_PARALLEL_MIN_PAGES:
+                    workers = min(AppConfig.PDF_WORKERS, page_count)
+                outcomes = document.extract(
+                    workers,
+                    page_timeout=AppConfig.PDF_PAGE_TIMEOUT,
+                    retry_with_pdfplumber=AppConfig.PDF_PLUMBER_RETRY
+                )
+        except clara_extraction.PdfLoadError as e:
+            logger.error(f"Erro ao ler PDF: {str(e)}")
+            return None
+
+        skipped = [o.index + 1 for o in outcomes if o.status != clara_extraction.PAGE_OK]
+        retried = [o.index + 1 for o in outcomes if o.engine == "pdfplumber" and o.status == clara_extraction.PAGE_OK]
+        if skipped:
+            reasons = Counter(o.status for o in outcomes if o.status != clara_extraction.PAGE_OK)
+            logger.warning(f"Extração parcial do PDF: {len(skipped)} de {page_count} páginas puladas ({dict(reasons)})")
+
+        return ExtractionResult(
+            text=TextUtils.clean_text("\n".join(o.text for o in outcomes)),
+            page_count=page_count,
+            extraction_time=time.time() - start_time,
+            workers=workers,
+            partial=bool(skipped),
+            skipped_pages=skipped,
+            retried_pages=retried
+        )
+    
+    @staticmethod
+    def _extract_from_docx(file: BytesIO) -> Optional[str]:
+        """Extrai texto de arquivos DOCX"""
+        try:
+            doc = Document(file)
+            return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+        except Exception as e:
+            logger.error(f"Erro ao ler DOCX: {str(e)}")
+            return None
+
+class StageTimer:
+    """Acumula o tempo (segundos) de cada etapa nomeada, na ordem em que aparecem"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+class SlowAnalysisSampler:
+    """Amostrador de pilha para análises lentas.
+
+    `watch` arma um temporizador: se o bloco ainda estiver rodando depois de
+    `threshold` segundos, uma thread passa a amostrar a pilha da thread
+    monitorada a cada `interval` segundos (via `sys._current_frames`) até o
+    bloco terminar. Análises rápidas custam só a criação da thread. As pilhas
+    mais frequentes são registradas no log (evento "slow_analysis") e
+    entregues a `callback`, se houver.
+    """
+
+    def __init__(self, threshold: float, interval: float = AppConfig.PROFILER_SAMPLE_INTERVAL,
+                 depth: int = AppConfig.PROFILER_STACK_DEPTH, top: int = AppConfig.PROFILER_TOP_STACKS,
+                 callback: Optional[Callable[[Dict], None]] = None):
+        self.threshold = threshold
+        self.interval = interval
+        self.depth = depth
+        self.top = top
+        self.callback = callback
+
+    @classmethod
+    def from_config(cls) -> Optional["SlowAnalysisSampler"]:
+        if AppConfig.SLOW_ANALYSIS_SECONDS is None:
+            return None
+        return cls(AppConfig.SLOW_ANALYSIS_SECONDS)
+
+    @contextmanager
+    def watch(self, label: str) -> Iterator[None]:
+        target = threading.get_ident()
+        samples: Counter = Counter()
+        done = threading.Event()
+
+        def sample():
+            if done.wait(self.threshold):
+                return
+            while not done.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                if frame is None:
+                    return
+                samples[self._stack(frame)] += 1
+
+        sampler = threading.Thread(target=sample, name="clara-profiler", daemon=True)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            yield
+        finally:
+            done.set()
+            sampler.join()
+            if samples:
+                self._report(label, time.perf_counter() - start, samples)
+
+    def _stack(self, frame) -> Tuple[str, ...]:
+        """Quadros da pilha, do mais interno para o mais externo ("função (arquivo:linha)")"""
+        stack = []
+        while frame is not None and len(stack) < self.depth:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return tuple(stack)
+
+    def _report(self, label: str, elapsed: float, samples: Counter):
+        total = sum(samples.values())
+        functions: Counter = Counter()
+        for stack, count in samples.items():
+            functions[stack[0]] += count
+        report = {
+            "label": label,
+            "elapsed": elapsed,
+            "threshold": self.threshold,
+            "samples": total,
+            "hot_functions": [{"frame": frame, "fraction": count / total}
+                              for frame, count in functions.most_common(self.top)],
+            "stacks": [{"stack": list(stack), "fraction": count / total}
+                       for stack, count in samples.most_common(self.top)],
+        }
+        hottest = report["hot_functions"][0]
+        logger.bind(event="slow_analysis", **report).warning(
+            f"Análise lenta: {label} levou {elapsed:.2f}s (limite {self.threshold:.2f}s); "
+            f"{total} amostras, {hottest['fraction']:.0%} em {hottest['frame']}")
+        if self.callback:
+            try:
+                self.callback(report)
+            except Exception as e:
+                logger.error(f"Erro no callback do amostrador: {str(e)}")
+
+#################################################################
+# 6. CORE DA APLICAÇÃO - ANÁLISE E PROCESSAMENTO
+#################################################################
+class KeywordAutomaton:
+    """Automato Aho-Corasick que indica quais palavras-chave aparecem no texto.
+
+    Usa o pyahocorasick quando disponível; sem ele, recorre a uma busca por
+    substring para cada palavra-chave (mais lenta, mas com o mesmo resultado).
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = sorted(set(keywords))
+        self._automaton = None
+        if ahocorasick is not None and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    def find_present(self, text: str) -> set:
+        """Retorna o conjunto de palavras-chave encontradas em `text`"""
+        if self._automaton is None:
+            return {keyword for keyword in self.keywords if keyword in text}
+
+        present = set()
+        for _, keyword in self._automaton.iter(text):
+            present.add(keyword)
+            if len(present) == len(self.keywords):
+                break
+        return present
+
+@dataclass
+class CompiledPattern:
+    rule_index: int
+    pattern: str
+    regex: re.Pattern
+    anchor: Optional[str]
+    required_literals: Tuple[str, ...]
+    span_mode: SpanMode = SpanMode.UNBOUNDED
+    max_span: int = 500
+    terms: Optional[List[re.Pattern]] = None
+
+class CompiledRuleSet:
+    """Regras pré-compiladas, avaliadas com uma única varredura do texto.
+
+    Cada padrão é compilado uma vez e, quando começa por uma palavra literal
+    completa (ex.: "renovação\\b..."), essa palavra vira sua âncora. A varredura
+    percorre os tokens do texto uma única vez e só tenta o regex completo
+    (ancorado com `match`) nas posições onde alguma âncora aparece, de modo que
+    o custo da varredura não cresce com o número de regras. Padrões sem âncora
+    continuam usando `search` convencional.
+
+    Antes da varredura, um prefiltro procura de uma vez (Aho-Corasick) todos os
+    literais obrigatórios dos padrões; padrões com algum literal ausente no
+    texto são descartados sem executar o regex.
+
+    Nos outros modos de `span_mode`, os padrões "termo.*termo.*termo" são
+    divididos em termos. A ocorrência mais próxima de cada termo (com memória
+    da última busca) decide se há match na janela: a linha (`LINE`), a linha
+    limitada a `max_span` caracteres (`CHARS`) ou a sentença do
+    `LegalSentenceSplitter` limitada a `max_span` (`SENTENCE`). Havendo match, ele é estendido como o
+    `.*` guloso faria, até a última ocorrência possível de cada termo na
+    janela; por isso `LINE` dá o mesmo resultado de `UNBOUNDED`, sem o
+    retrocesso quadrático de `.*` em textos grandes. Matches que caberiam na
+    linha/sentença mas passam de `max_span` são contados como truncados e
+    registrados no log.
+    """
+
+    _TOKEN_RE = re.compile(r"\w+")
+    _WORD_CHAR_RE = re.compile(r"\w")
+    _LINE_END_RE = re.compile(r"\n")
+    _SPAN_RE = re.compile(r".*", re.DOTALL)
+
+    def __init__(self, rules: List[ContractRule], flags: int = re.IGNORECASE, use_prefilter: bool = True):
+        self.rules = rules
+        self.flags = flags
+        self.patterns: List[CompiledPattern] = []
+
+        for rule_index, rule in enumerate(rules):
+            for pattern in rule.patterns:
+                try:
+                    regex = re.compile(pattern, flags)
+                    parsed = sre_parse.parse(pattern, flags)
+                except re.error as e:
+                    logger.error(f"Padrão inválido na regra {rule.id}: {pattern} ({str(e)})")
+                    continue
+
+                anchor = self._leading_anchor(parsed)
+                literals = tuple(self._required_literals(parsed)) if use_prefilter else ()
+                terms = None
+                if rule.span_mode != SpanMode.UNBOUNDED:
+                    terms = self._compile_terms(pattern, flags)
+                    if terms is None:
+                        logger.warning(f"Padrão da regra {rule.id} sem termos separáveis por '.*'; "
+                                       f"limite aplicado apenas ao match ancorado: {pattern}")
+                self.patterns.append(CompiledPattern(
+                    rule_index, pattern, regex, anchor, literals,
+                    span_mode=rule.span_mode, max_span=rule.max_span, terms=terms
+                ))
+
+        self._build_index()
+
+    def _build_index(self):
+        """Índice de âncoras e prefiltro a partir de `self.patterns`"""
+        self._anchors: Dict[str, List[int]] = {}
+        for index, compiled in enumerate(self.patterns):
+            if compiled.anchor:
+                self._anchors.setdefault(compiled.anchor, []).append(index)
+        self._anchor_lengths = sorted({len(anchor) for anchor in self._anchors})
+        self._prefilter = KeywordAutomaton(
+            [literal for compiled in self.patterns for literal in compiled.required_literals]
+        )
+
+    def to_data(self) -> Dict:
+        """Resultado da análise dos padrões (âncoras e literais) em dados simples, serializáveis em JSON"""
+        return {
+            "flags": self.flags,
+            "patterns": [{"rule_index": compiled.rule_index, "pattern": compiled.pattern,
+                          "anchor": compiled.anchor, "literals": list(compiled.required_literals)}
+                         for compiled in self.patterns],
+        }
+
+    @classmethod
+    def from_data(cls, rules: List[ContractRule], data: Dict) -> "CompiledRuleSet":
+        """Remonta o conjunto a partir de `to_data`, sem reanalisar os padrões.
+
+        Os regex e termos são recompilados das regras; cada padrão dos dados
+        precisa ser um padrão da regra indicada (ValueError caso contrário).
+        """
+        compiled_set = cls.__new__(cls)
+        compiled_set.rules = rules
+        compiled_set.flags = flags = int(data["flags"])
+        compiled_set.patterns = []
+        for entry in data["patterns"]:
+            rule_index, pattern = entry["rule_index"], entry["pattern"]
+            if not (isinstance(rule_index, int) and 0 <= rule_index < len(rules)) \
+                    or pattern not in rules[rule_index].patterns:
+                raise ValueError(f"padrão fora das regras: {pattern!r}")
+            rule = rules[rule_index]
+            anchor = entry["anchor"]
+            compiled_set.patterns.append(CompiledPattern(
+                rule_index, pattern, re.compile(pattern, flags), str(anchor) if anchor else None,
+                tuple(str(literal) for literal in entry["literals"]),
+                span_mode=rule.span_mode, max_span=rule.max_span,
+                terms=cls._compile_terms(pattern, flags) if rule.span_mode != SpanMode.UNBOUNDED else None
+            ))
+        compiled_set._build_index()
+        return compiled_set
+
+    @classmethod
+    def _leading_anchor(cls, parsed) -> Optional[str]:
+        """Retorna a palavra literal que inicia o padrão, se ela for completa"""
+        items = list(parsed)
+        i = 0
+        while i < len(items) and items[i] == (sre_constants.AT, sre_constants.AT_BOUNDARY):
+            i += 1
+
+        chars = []
+        while i < len(items) and items[i][0] == sre_constants.LITERAL:
+            char = chr(items[i][1])
+            if not cls._WORD_CHAR_RE.match(char):
+                break
+            chars.append(char)
+            i += 1
+
+        if not chars or i >= len(items):
+            return None
+
+        # A palavra só serve de âncora se o padrão exigir o fim dela logo em seguida
+        op, value = items[i]
+        if op == sre_constants.LITERAL and not cls._WORD_CHAR_RE.match(chr(value)):
+            return "".join(chars).lower()
+        if op == sre_constants.AT and value in (sre_constants.AT_BOUNDARY, sre_constants.AT_END):
+            return "".join(chars).lower()
+        return None
+
+    @classmethod
+    def _required_literals(cls, parsed) -> List[str]:
+        """Extrai os trechos literais que qualquer match do padrão precisa conter"""
+        literals = []
+        current = []
+
+        def flush():
+            if current:
+                literals.append("".join(current).lower())
+                current.clear()
+
+        for op, value in parsed:
+            if op == sre_constants.LITERAL:
+                current.append(chr(value))
+                continue
+            flush()
+            if op == sre_constants.SUBPATTERN:
+                # (grupo, add_flags, del_flags, subpadrão)
+                literals.extend(cls._required_literals(value[-1]))
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and value[0] >= 1:
+                literals.extend(cls._required_literals(value[2]))
+        flush()
+
+        return [literal for literal in literals if literal.strip()]
+
+    @staticmethod
+    def _split_gaps(pattern: str) -> Optional[List[str]]:
+        """Divide o padrão nos `.*` de nível superior ("a.*b" -> ["a", "b"])"""
+        terms, current = [], []
+        depth, in_class, i = 0, False, 0
+        while i < len(pattern):
+            char = pattern[i]
+            if char == "\\":
+                current.append(pattern[i:i + 2])
+                i += 2
+                continue
+            if in_class:
+                in_class = char != "]"
+            elif char == "[":
+                in_class = True
+                # "]" logo após "[" ou "[^" é literal dentro da classe
+                if pattern[i + 1:i + 2] == "]" or pattern[i + 1:i + 3] == "^]":
+                    current.append(pattern[i:pattern.index("]", i + 1) + 1])
+                    i = pattern.index("]", i + 1) + 1
+                    continue
+            elif char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif char == "|" and depth == 0:
+                return None
+            elif depth == 0 and pattern.startswith(".*", i):
+                i += 2
+                if pattern[i:i + 1] in ("?", "+"):
+                    i += 1
+                terms.append("".join(current))
+                current = []
+                continue
+            current.append(char)
+            i += 1
+        terms.append("".join(current))
+
+        if len(terms) < 2 or not all(terms):
+            return None
+        return terms
+
+    @classmethod
+    def _compile_terms(cls, pattern: str, flags: int) -> Optional[List[re.Pattern]]:
+        terms = cls._split_gaps(pattern)
+        if terms is None:
+            return None
+        try:
+            return [re.compile(term, flags) for term in terms]
+        except re.error:
+            return None
+
+    @staticmethod
+    def _next_match(regex: re.Pattern, text: str, cursor: int, memo: Dict, key) -> Optional[re.Match]:
+        """Próxima ocorrência de `regex` a partir de `cursor`, reaproveitando a última busca"""
+        cached = memo.get(key)
+        if cached is not None:
+            searched_from, match = cached
+            if searched_from <= cursor and (match is None or match.start() >= cursor):
+                return match
+        match = regex.search(text, cursor)
+        memo[key] = (cursor, match)
+        return match
+
+    def _match_at(self, index: int, text: str, position: int, memo: Dict) -> Optional[re.Match]:
+        """Tenta o padrão `index` começando exatamente em `position`"""
+        compiled = self.patterns[index]
+        if compiled.span_mode == SpanMode.UNBOUNDED or \
+                (compiled.span_mode == SpanMode.LINE and compiled.terms is None):
+            return compiled.regex.match(text, position)
+
+        line = self._next_match(self._LINE_END_RE, text, position, memo, self._LINE_END_RE.pattern)
+        boundary_end = line.start() if line is not None else len(text)
+        if compiled.span_mode == SpanMode.SENTENCE:
+            boundary_end = min(boundary_end, self._sentence_end(text, position, memo))
+        if compiled.span_mode == SpanMode.LINE:
+            window_end = boundary_end
+        else:
+            window_end = min(boundary_end, position + compiled.max_span)
+
+        if compiled.terms is None:
+            return compiled.regex.match(text, position, window_end)
+
+        first = compiled.terms[0].match(text, position)
+        if not first or first.end() > window_end:
+            return None
+        end = first.end()
+        for term_index, term in enumerate(compiled.terms[1:], start=1):
+            match = self._next_match(term, text, end, memo, (index, term_index))
+            if match is None or match.end() > window_end:
+                if match is not None and match.end() <= boundary_end:
+                    # Caberia na linha/sentença: descartado só por `max_span`
+                    truncated = memo.setdefault(("truncated",), Counter())
+                    truncated[index] += 1
+                return None
+            end = match.end()
+
+        end = self._greedy_end(compiled.terms, text, first.end(), window_end)
+        # Match do trecho [position, end), sem reexecutar o padrão (o que voltaria a retroceder)
+        return self._SPAN_RE.match(text, position, end) if end is not None else None
+
+    @staticmethod
+    def _greedy_end(terms: List[re.Pattern], text: str, start: int, window_end: int) -> Optional[int]:
+        """Fim do match que o `.*` guloso encontraria entre `start` e `window_end`.
+
+        Da direita para a esquerda: o último termo é a sua última ocorrência na
+        janela, e cada termo anterior é a sua última ocorrência que termina antes
+        do início do seguinte. Cada termo é conferido no texto completo, para que
+        `\b` e afins vejam os caracteres depois do limite.
+        """
+        limit, end = window_end, None
+        for term in reversed(terms[1:]):
+            last = None
+            for candidate in term.finditer(text, start, limit):
+                match = term.match(text, candidate.start())
+                if match and match.end() <= limit:
+                    last = match
+            if last is None:
+                return None
+            if end is None:
+                end = last.end()
+            limit = last.start()
+        return end
+
+    @staticmethod
+    def _sentence_end(text: str, position: int, memo: Dict) -> int:
+        """Fim da sentença que contém `position`, com os limites do `LegalSentenceSplitter`"""
+        ends = memo.get(("sentence_ends",))
+        if ends is None:
+            ends = memo[("sentence_ends",)] = [end for _, end in LegalSentenceSplitter.spans(text)]
+        i = bisect.bisect_right(ends, position)
+        return ends[i] if i < len(ends) else len(text)
+
+    def _search(self, index: int, text: str, memo: Dict) -> Optional[re.Match]:
+        """Primeira ocorrência do padrão `index` no texto, sem usar a âncora"""
+        compiled = self.patterns[index]
+        if compiled.span_mode == SpanMode.UNBOUNDED or compiled.terms is None:
+            return compiled.regex.search(text)
+
+        cursor = 0
+        while True:
+            start = self._next_match(compiled.terms[0], text, cursor, memo, (index, 0))
+            if start is None:
+                return None
+            match = self._match_at(index, text, start.start(), memo)
+            if match:
+                return match
+            cursor = start.start() + 1
+
+    def scan(self, text: str, pattern_times: Optional[Dict[int, float]] = None,
+             sentence_ends: Optional[List[int]] = None, truncated: Optional[Dict[int, int]] = None
+             ) -> List[List[Tuple[str, re.Match]]]:
+        """Retorna, para cada regra, o primeiro match de cada um de seus padrões"""
+        first_matches = self.scan_indexed(text, pattern_times=pattern_times, sentence_ends=sentence_ends,
+                                          truncated=truncated)
+        results: List[List[Tuple[str, re.Match]]] = [[] for _ in self.rules]
+        for index, compiled in enumerate(self.patterns):
+            if index in first_matches:
+                results[compiled.rule_index].append((compiled.pattern, first_matches[index]))
+        return results
+
+    def scan_indexed(self, text: str, skip: Optional[set] = None,
+                     pattern_times: Optional[Dict[int, float]] = None,
+                     sentence_ends: Optional[List[int]] = None,
+                     truncated: Optional[Dict[int, int]] = None) -> Dict[int, re.Match]:
+        """Primeiro match de cada padrão, indexado pela posição em `self.patterns`.
+
+        Com `pattern_times`, acumula nele o tempo gasto nos regex de cada padrão
+        (a varredura de tokens e o prefiltro, compartilhados, ficam de fora).
+        `sentence_ends` (fins das sentenças de `text`, ex.: `SentenceIndex.ends`)
+        evita dividir o texto de novo para os padrões `SENTENCE`; `truncated`
+        acumula, por padrão, os matches descartados por `max_span`.
+        """
+        first_matches: Dict[int, re.Match] = {}
+        memo: Dict = {}
+        if sentence_ends is not None:
+            memo[("sentence_ends",)] = sentence_ends
+        lowered = text.lower()
+
+        # Prefiltro: só seguem para o regex os padrões com todos os literais presentes
+        present = self._prefilter.find_present(lowered)
+        candidates = {
+            index for index, compiled in enumerate(self.patterns)
+            if all(literal in present for literal in compiled.required_literals)
+        }
+        if skip:
+            candidates -= skip
+
+        # Sem correspondência 1:1 de offsets não é possível usar o índice de tokens
+        anchored = self._anchors if len(lowered) == len(text) else {}
+        pending = {index for anchor_ids in anchored.values() for index in anchor_ids} & candidates
+
+        if pending:
+            suffix_cache: Dict[str, Tuple[str, ...]] = {}
+            for token_match in self._TOKEN_RE.finditer(lowered):
+                token = token_match.group()
+                hits = suffix_cache.get(token)
+                if hits is None:
+                    # Uma âncora pode terminar no meio de um token ("aproibição")
+                    hits = tuple(
+                        token[-length:] for length in self._anchor_lengths
+                        if length <= len(token) and token[-length:] in anchored
+                    )
+                    suffix_cache[token] = hits
+                if not hits:
+                    continue
+
+                for anchor in hits:
+                    position = token_match.end() - len(anchor)
+                    for index in anchored[anchor]:
+                        if index not in pending:
+                            continue
+                        match = self._timed(pattern_times, index, self._match_at, index, text, position, memo)
+                        if match:
+                            first_matches[index] = match
+                            pending.discard(index)
+                if not pending:
+                    break
+
+        for index, compiled in enumerate(self.patterns):
+            if index in candidates and (compiled.anchor is None or not anchored):
+                match = self._timed(pattern_times, index, self._search, index, text, memo)
+                if match:
+                    first_matches[index] = match
+
+        cut = memo.get(("truncated",))
+        if cut:
+            if truncated is not None:
+                for index, count in cut.items():
+                    truncated[index] = truncated.get(index, 0) + count
+            rules = Counter()
+            for index, count in cut.items():
+                rules[self.rules[self.patterns[index].rule_index].id] += count
+            logger.info(f"Matches descartados por ultrapassar max_span: {dict(rules)}")
+
+        return first_matches
+
+    @staticmethod
+    def _timed(pattern_times: Optional[Dict[int, float]], index: int, func: Callable, *args):
+        if pattern_times is None:
+            return func(*args)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            pattern_times[index] = pattern_times.get(index, 0.0) + time.perf_counter() - start
+
+class RulePackError(ValueError):
+    """Pacote de regras inválido (arquivo ilegível, campo ausente ou padrão que não compila)"""
+
+class RulePack:
+    """Pacotes de regras em JSON ou YAML, validados e convertidos em `ContractRule`.
+
+    Formato: {"name": ..., "version": ..., "rules": [{"id", "name", "patterns",
+    "score", "risk_level", "explanation", "solution", "legal_references",
+    "tags", "span_mode", "max_span"}, ...]}. `risk_level` e `span_mode` aceitam
+    o valor ("Alto", "sentence") ou o nome ("HIGH", "SENTENCE") do enum.
+    """
+
+    REQUIRED_FIELDS = ("id", "name", "patterns", "score", "risk_level", "explanation")
+    OPTIONAL_FIELDS = {"solution": "", "legal_references": [], "tags": [],
+                       "span_mode": SpanMode.UNBOUNDED.value, "max_span": 500}
+
+    @classmethod
+    def load(cls, path: str, check_patterns: bool = True) -> List[ContractRule]:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            raise RulePackError(f"não foi possível ler {path}: {str(e)}")
+        return cls.parse(raw, path.lower().endswith((".yaml", ".yml")), check_patterns)
+
+    @classmethod
+    def parse(cls, raw: bytes, yaml_format: bool = False, check_patterns: bool = True) -> List[ContractRule]:
+        try:
+            if yaml_format:
+                import yaml
+                data = yaml.safe_load(raw)
+            else:
+                data = json.loads(raw)
+        except ImportError:
+            raise RulePackError("pacotes em YAML exigem o PyYAML (pip install pyyaml)")
+        except Exception as e:
+            raise RulePackError(f"conteúdo inválido: {str(e)}")
+        return cls.from_dict(data, check_patterns)
+
+    @classmethod
+    def from_dict(cls, data: Dict, check_patterns: bool = True) -> List[ContractRule]:
+        if not isinstance(data, dict) or not isinstance(data.get("rules"), list) or not data["rules"]:
+            raise RulePackError("o pacote precisa de uma lista 'rules' não vazia")
+
+        rules, errors, seen = [], [], set()
+        for position, entry in enumerate(data["rules"], start=1):
+            label = entry.get("id", f"#{position}") if isinstance(entry, dict) else f"#{position}"
+            try:
+                rule = cls._rule(entry)
+            except (TypeError, ValueError) as e:
+                errors.append(f"regra {label}: {str(e)}")
+                continue
+            if rule.id in seen:
+                errors.append(f"regra {rule.id}: id repetido")
+            seen.add(rule.id)
+            rules.append(rule)
+
+        if check_patterns:
+            errors.extend(cls.pattern_errors(rules))
+        if errors:
+            raise RulePackError("; ".join(errors))
+        return rules
+
+    @staticmethod
+    def pattern_errors(rules: List[ContractRule]) -> List[str]:
+        """Padrões que não compilam (verificação separada: um artefato já compilado dispensa)"""
+        errors = []
+        for rule in rules:
+            for pattern in rule.patterns:
+                try:
+                    re.compile(pattern, re.IGNORECASE)
+                except re.error as e:
+                    errors.append(f"regra {rule.id}: padrão inválido {pattern!r}: {str(e)}")
+        return errors
+
+    @staticmethod
+    def _enum(enum_type, value):
+        for member in enum_type:
+            if value in (member.value, member.name):
+                return member
+        raise ValueError(f"valor inválido para {enum_type.__name__}: {value!r}")
+
+    @staticmethod
+    def _strings(value, field_name: str) -> List[str]:
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise TypeError(f"'{field_name}' deve ser uma lista de textos")
+        return list(value)
+
+    @classmethod
+    def _rule(cls, entry: Dict) -> ContractRule:
+        if not isinstance(entry, dict):
+            raise TypeError("cada regra deve ser um objeto")
+        missing = [name for name in cls.REQUIRED_FIELDS if name not in entry]
+        if missing:
+            raise ValueError(f"campos obrigatórios ausentes: {', '.join(missing)}")
+        unknown = set(entry) - set(cls.REQUIRED_FIELDS) - set(cls.OPTIONAL_FIELDS)
+        if unknown:
+            raise ValueError(f"campos desconhecidos: {', '.join(sorted(unknown))}")
+        values = {**cls.OPTIONAL_FIELDS, **entry}
+
+        patterns = cls._strings(values["patterns"], "patterns")
+        if not patterns:
+            raise ValueError("'patterns' não pode ser vazia")
+
+        score, max_span = values["score"], values["max_span"]
+        if isinstance(score, bool) or not isinstance(score, int) or not 0 <= score <= 10:
+            raise ValueError("'score' deve ser um inteiro de 0 a 10")
+        if isinstance(max_span, bool) or not isinstance(max_span, int) or max_span <= 0:
+            raise ValueError("'max_span' deve ser um inteiro positivo")
+        for name in ("id", "name", "explanation", "solution"):
+            if not isinstance(values[name], str):
+                raise TypeError(f"'{name}' deve ser um texto")
+
+        return ContractRule(
+            id=values["id"],
+            name=values["name"],
+            patterns=patterns,
+            score=score,
+            risk_level=cls._enum(RiskLevel, values["risk_level"]),
+            explanation=values["explanation"],
+            solution=values["solution"],
+            legal_references=cls._strings(values["legal_references"], "legal_references"),
+            tags=cls._strings(values["tags"], "tags"),
+            span_mode=cls._enum(SpanMode, values["span_mode"]),
+            max_span=max_span
+        )
+
+    @staticmethod
+    def to_dict(rules: List[ContractRule], name: str, version: str) -> Dict:
+        """Converte regras em um pacote (ex.: para exportar `CONTRACT_RULES`)"""
+        entries = []
+        for rule in rules:
+            entry = asdict(rule)
+            entry["risk_level"] = rule.risk_level.value
+            entry["span_mode"] = rule.span_mode.value
+            entries.append(entry)
+        return {"name": name, "version": version, "rules": entries}
+
+class RuleArtifactCache:
+    """Análise dos padrões de um conjunto de regras gravada em disco, indexada pelo digest.
+
+    O primeiro processo que vê um pacote compila as regras (análise dos padrões
+    com o `sre_parse`: âncoras e literais do prefiltro) e grava o resultado em
+    JSON (`CompiledRuleSet.to_data`) com escrita atômica; os demais processos,
+    e os próximos inícios, só o carregam e recompilam os regex e o automato.
+    O artefato é só dados: um arquivo adulterado no diretório não executa
+    código, e padrões que não pertencem às regras são recusados.
+    """
+
+    ARTIFACT_VERSION = 2  # Incrementar ao mudar o formato de `to_data`; invalida os artefatos gravados
+
+    def __init__(self, directory: str = AppConfig.RULE_ARTIFACT_DIR):
+        self.directory = directory
+        self.logger = logger
+
+    def path_for(self, digest: str) -> str:
+        # A análise dos padrões depende da versão do `sre_parse`
+        python = f"py{sys.version_info[0]}{sys.version_info[1]}"
+        return os.path.join(self.directory, f"{digest}-a{self.ARTIFACT_VERSION}-{python}.json")
+
+    def load(self, rules: List[ContractRule], digest: Optional[str] = None) -> Optional[CompiledRuleSet]:
+        """Artefato gravado para estas regras, ou None se não houver (ou não servir)"""
+        digest = digest or SecurityUtils.ruleset_digest(rules)
+        path = self.path_for(digest)
+        try:
+            with open(path, "rb") as f:
+                data = json.loads(f.read())
+            if data.get("version") == self.ARTIFACT_VERSION and data.get("digest") == digest:
+                return CompiledRuleSet.from_data(rules, data)
+            self.logger.warning(f"Artefato de regras não corresponde ao pacote, recompilando: {path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"Artefato de regras ilegível, recompilando: {path} ({str(e)})")
+        return None
+
+    def compile(self, rules: List[ContractRule], digest: Optional[str] = None) -> CompiledRuleSet:
+        digest = digest or SecurityUtils.ruleset_digest(rules)
+        compiled = CompiledRuleSet(rules)
+        self._store(self.path_for(digest), dict(compiled.to_data(), version=self.ARTIFACT_VERSION, digest=digest))
+        return compiled
+
+    def load_or_compile(self, rules: List[ContractRule], digest: Optional[str] = None) -> CompiledRuleSet:
+        digest = digest or SecurityUtils.ruleset_digest(rules)
+        return self.load(rules, digest) or self.compile(rules, digest)
+
+    def _store(self, path: str, data: Dict):
+        """Grava num arquivo temporário e renomeia, para que nenhum processo leia um artefato pela metade"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            self.logger.warning(f"Não foi possível gravar o artefato de regras: {str(e)}")
+
+@dataclass(frozen=True)
+class RuleSetSnapshot:
+    rules: List[ContractRule]
+    compiled: CompiledRuleSet
+    digest: str
+    source: str  # Caminho do pacote ou "embutidas"
+
+class RulePackWatcher:
+    """Conjunto de regras vigente, recarregado do pacote quando o arquivo muda.
+
+    `current()` devolve um `RuleSetSnapshot` imutável e a troca é uma única
+    atribuição: quem pegou o snapshot anterior (uma análise em andamento) o usa
+    até o fim, e as próximas chamadas já recebem o novo. O arquivo é consultado
+    (stat) no máximo a cada `check_interval` segundos, e só uma thread recarrega
+    enquanto as outras seguem com o snapshot vigente. Um pacote inválido é
+    registrado no log e o anterior continua valendo; sem arquivo, valem as
+    regras embutidas (`CONTRACT_RULES`). Para publicar um pacote, grave-o em
+    outro arquivo e renomeie-o sobre o antigo.
+    """
+
+    BUILTIN_SOURCE = "embutidas"
+
+    def __init__(self, path: Optional[str] = AppConfig.RULE_PACK_PATH,
+                 artifacts: Optional[RuleArtifactCache] = None,
+                 fallback: List[ContractRule] = CONTRACT_RULES,
+                 check_interval: float = AppConfig.RULE_PACK_CHECK_INTERVAL):
+        self.path = path
+        self.artifacts = artifacts or RuleArtifactCache()
+        self.fallback = fallback
+        self.check_interval = check_interval
+        self.logger = logger
+        self._reload_lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._snapshot: Optional[RuleSetSnapshot] = None
+        self.reload()
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except (OSError, TypeError):
+            return None
+
+    def _build(self, rules: List[ContractRule], source: str) -> RuleSetSnapshot:
+        digest = SecurityUtils.ruleset_digest(rules)
+        compiled = self.artifacts.load(rules, digest)
+        if compiled is None:
+            # Artefatos só são gravados a partir de pacotes válidos: os padrões são verificados só aqui
+            errors = RulePack.pattern_errors(rules)
+            if errors:
+                raise RulePackError("; ".join(errors))
+            compiled = self.artifacts.compile(rules, digest)
+        return RuleSetSnapshot(rules, compiled, digest, source)
+
+    def reload(self) -> bool:
+        """Relê o pacote se o arquivo mudou; retorna True se o conjunto de regras foi trocado"""
+        with self._reload_lock:
+            self._checked_at = time.time()
+            signature = self._file_signature()
+            if self._snapshot is not None and signature == self._signature:
+                return False
+            self._signature = signature
+
+            if signature is None:
+                if self._snapshot is not None and self._snapshot.source == self.BUILTIN_SOURCE:
+                    return False
+                if self.path and self._snapshot is not None:
+                    self.logger.warning(f"Pacote de regras {self.path} removido; usando as regras embutidas")
+                snapshot = self._build(self.fallback, self.BUILTIN_SOURCE)
+            else:
+                try:
+                    snapshot = self._build(RulePack.load(self.path, check_patterns=False), self.path)
+                except RulePackError as e:
+                    self.logger.error(f"Pacote de regras inválido em {self.path}: {str(e)}")
+                    if self._snapshot is not None:
+                        return False
+                    snapshot = self._build(self.fallback, self.BUILTIN_SOURCE)
+
+            changed = self._snapshot is None or snapshot.digest != self._snapshot.digest
+            if changed:
+                self.logger.info(f"Regras carregadas de {snapshot.source}: {len(snapshot.rules)} regras "
+                                 f"({snapshot.digest})")
+            self._snapshot = snapshot
+            return changed
+
+    def current(self) -> RuleSetSnapshot:
+        if time.time() - self._checked_at >= self.check_interval and not self._reload_lock.locked():
+            self.reload()
+        return self._snapshot
+
+class ContractAnalysisEngine(ContractAnalyzer):
+    def __init__(self, rules: List[ContractRule], nlp_model=None,
+                 context_window: int = AppConfig.CONTEXT_WINDOW_SENTENCES,
+                 ner_scope: NerScope = AppConfig.NER_SCOPE,
+                 ner_batch_size: int = AppConfig.NER_BATCH_SIZE,
+                 ner_processes: int = AppConfig.NER_PROCESSES,
+                 compiled_rules: Optional[CompiledRuleSet] = None,
+                 profiler: Optional[SlowAnalysisSampler] = None):
+        self.rules = rules
+        self.nlp_model = nlp_model
+        self.context_window = context_window
+        self.ner_scope = ner_scope
+        self.ner_batch_size = ner_batch_size
+        self.ner_processes = ner_processes
+        self.logger = logger
+        self.compiled_rules = compiled_rules or CompiledRuleSet(rules)
+        self.ruleset_digest = SecurityUtils.ruleset_digest(rules)
+        self.profiler = profiler or SlowAnalysisSampler.from_config()
+
+    def analyze(self, text: str, progress: Optional[ProgressCallback] = None
+                ) -> Tuple[List[AnalysisResult], ContractMetadata]:
+        """Executa a análise completa do contrato"""
+        if self.profiler is None:
+            return self._analyze(text, progress)
+        with self.profiler.watch(f"analyze ({len(text)} caracteres)"):
+            return self._analyze(text, progress)
+
+    def _analyze(self, text: str, progress: Optional[ProgressCallback] = None
+                 ) -> Tuple[List[AnalysisResult], ContractMetadata]:
+        start_time = time.time()
+        results = []
+        timer = StageTimer()
+        with timer.stage("hashing"):
+            contract_hash = SecurityUtils.content_fingerprint(text)
+        report = progress or (lambda stage, fraction: None)
+        
+        try:
+            # Pré-processamento do texto
+            report("Preparando o texto", 0.0)
+            with timer.stage("cleaning"):
+                cleaned_text = TextUtils.clean_text(text)
+            with timer.stage("tokenization"):
+                sentence_index = SentenceIndex.split(cleaned_text)
+                total_words = WordCounter.count(cleaned_text)
+            total_sentences = len(sentence_index)
+            
+            # Aplicação das regras de análise (varredura única do texto)
+            report("Avaliando as cláusulas", 0.3)
+            pattern_times: Dict[int, float] = {}
+            truncated: Dict[int, int] = {}
+            with timer.stage("rules"):
+                rule_matches = self.compiled_rules.scan(cleaned_text, pattern_times,
+                                                        sentence_ends=sentence_index.ends, truncated=truncated)
+            with timer.stage("results"):
+                for rule, matches in zip(self.rules, rule_matches):
+                    results.extend(self._apply_rule(rule, cleaned_text, sentence_index, matches))
+            
+            # Se nenhum problema encontrado
+            if not results:
+                results.append(self._create_no_issues_result())
+            
+            # Pós-processamento (opcional com NLP)
+            entities = None
+            if self.nlp_model:
+                report("Identificando entidades", 0.7)
+                positions = [r.match_position for r in results if r.rule_id != "none"]
+                with timer.stage("ner"):
+                    entities = self._extract_entities(cleaned_text, sentence_index, positions)
+            
+            metadata = ContractMetadata(
+                contract_hash=contract_hash,
+                total_words=total_words,
+                total_sentences=total_sentences,
+                entities=entities,
+                processing_time=time.time() - start_time,
+                analyzed_at=datetime.now(),
+                ruleset_digest=self.ruleset_digest,
+                stage_timings=timer.timings,
+                rule_stats=self._rule_stats([len(matches) for matches in rule_matches], pattern_times, truncated)
+            )
+            self._log_timings(metadata)
+            
+            return results, metadata
+            
+        except Exception as e:
+            self.logger.error(f"Erro na análise do contrato: {str(e)}")
+            raise
+    
+    def _rule_stats(self, match_counts: List[int], pattern_times: Dict[int, float],
+                    truncated: Dict[int, int]) -> Dict[str, Dict[str, float]]:
+        """Padrões com match, tempo nos regex e matches truncados de cada regra, a partir dos dados por padrão"""
+        seconds = [0.0] * len(self.rules)
+        cut = [0] * len(self.rules)
+        for index, elapsed in pattern_times.items():
+            seconds[self.compiled_rules.patterns[index].rule_index] += elapsed
+        for index, count in truncated.items():
+            cut[self.compiled_rules.patterns[index].rule_index] += count
+        return {rule.id: {"matches": count, "seconds": elapsed, "truncated": dropped}
+                for rule, count, elapsed, dropped in zip(self.rules, match_counts, seconds, cut)}
+    
+    def _log_timings(self, metadata: ContractMetadata):
+        """Registro estruturado dos tempos (evento "analysis_timings", campos em `extra`)"""
+        stages = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in metadata.stage_timings.items())
+        self.logger.bind(
+            event="analysis_timings",
+            contract_hash=metadata.contract_hash,
+            total_words=metadata.total_words,
+            processing_time=metadata.processing_time,
+            stage_timings=metadata.stage_timings,
+            rule_stats=metadata.rule_stats,
+        ).debug(f"Análise de {metadata.total_words} palavras em {metadata.processing_time:.3f}s ({stages})")
+    
+    def _apply_rule(self, rule: ContractRule, text: str, sentence_index: SentenceIndex,
+                    matches: List[Tuple[str, re.Match]]) -> List[AnalysisResult]:
+        """Converte os matches de uma regra em resultados (um por padrão)"""
+        results = []
+        for pattern, match in matches:
+            try:
+                results.append(self._build_result(rule, pattern, match, text, sentence_index))
+            except Exception as e:
+                self.logger.error(f"Erro ao aplicar regra {rule.id}: {str(e)}")
+        return results
+    
+    def _build_result(self, rule: ContractRule, pattern: str, match: re.Match, text: str,
+                      sentence_index: SentenceIndex, offset: int = 0) -> AnalysisResult:
+        """Monta o resultado de um match; `offset` converte a posição para o documento"""
+        return AnalysisResult(
+            rule_id=rule.id,
+            clause=rule.name,
+            score=rule.score,
+            risk_level=rule.risk_level.value,
+            explanation=rule.explanation,
+            solution=rule.solution,
+            legal_references=rule.legal_references,
+            tags=rule.tags,
+            excerpt=TextUtils.extract_excerpt(text, pattern, match),
+            match_position=offset + match.start(),
+            context=sentence_index.context(match.start(), self.context_window)
+        )
+    
+    def open_stream(self, overlap: int = AppConfig.STREAM_OVERLAP_CHARS,
+                    window_size: int = AppConfig.STREAM_WINDOW_CHARS) -> "StreamingAnalysis":
+        """Inicia uma análise incremental (ver `StreamingAnalysis`)"""
+        return StreamingAnalysis(self, overlap=overlap, window_size=window_size)
+    
+    def analyze_chunks(self, chunks: Iterable[str]) -> Tuple[List[AnalysisResult], ContractMetadata]:
+        """Analisa um documento entregue em partes (páginas, parágrafos) com memória limitada"""
+        stream = self.open_stream()
+        results = []
+        for chunk in chunks:
+            results.extend(stream.feed(chunk))
+        metadata = stream.close()
+        return results or [self._create_no_issues_result()], metadata
+    
+    def config_tag(self) -> str:
+        """Identifica a configuração do motor que afeta o resultado (modelo NLP, contexto)"""
+        tag = f"ctx{self.context_window}"
+        if self.nlp_model is not None:
+            meta = getattr(self.nlp_model, "meta", {}) or {}
+            tag += f"-{meta.get('name', 'nlp')}-{meta.get('version', '')}-{self.ner_scope.value}"
+        return tag
+    
+    def _create_no_issues_result(self) -> AnalysisResult:
+        """Cria um resultado padrão quando nenhum problema é encontrado"""
+        return AnalysisResult(
+            rule_id="none",
+            clause="Nenhuma irregularidade grave detectada",
+            score=0,
+            risk_level=RiskLevel.LOW.value,
+            explanation="Não foram encontradas cláusulas abusivas no contrato.",
+            solution="",
+            legal_references=[],
+            tags=[],
+            excerpt="",
+            match_position=0,
+            context=""
+        )
+    
+    def _extract_entities(self, text: str, sentence_index: SentenceIndex,
+                          positions: Optional[List[int]] = None) -> List[Tuple[str, str]]:
+        """Extrai entidades nomeadas usando o modelo NLP"""
+        return [(text[start:end], label) for start, end, label in
+                self._entity_spans(text, sentence_index, positions)]
+    
+    def _entity_spans(self, text: str, sentence_index: SentenceIndex,
+                      positions: Optional[List[int]] = None) -> List[Tuple[int, int, str]]:
+        """Entidades (início, fim, rótulo) em coordenadas de `text`.
+
+        O texto é dividido em trechos alinhados às sentenças e processado com
+        `nlp.pipe` em lotes (e processos, se `ner_processes` > 1), o que também
+        evita o limite `max_length` do spaCy. Com `NerScope.MATCHES`, só os
+        contextos das posições em `positions` são processados.
+        """
+        if self.ner_scope == NerScope.MATCHES:
+            spans = []
+            for start, end in sorted(sentence_index.context_span(p, self.context_window) for p in positions or []):
+                if spans and start <= spans[-1][1]:
+                    spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+                elif end > start:
+                    spans.append((start, end))
+        else:
+            spans = sentence_index.chunk_spans(AppConfig.NER_CHUNK_CHARS)
+        if not spans:
+            return []
+
+        try:
+            found = set()
+            docs = self.nlp_model.pipe((text[start:end] for start, end in spans),
+                                       batch_size=self.ner_batch_size, n_process=self.ner_processes)
+            for (offset, _), doc in zip(spans, docs):
+                for ent in doc.ents:
+                    found.add((offset + ent.start_char, offset + ent.end_char, ent.label_))
+            return sorted(found)
+        except Exception as e:
+            self.logger.error(f"Erro ao extrair entidades: {str(e)}")
+            return []
+
+class StreamingAnalysis:
+    """Análise incremental de um contrato recebido em partes.
+
+    Cada parte é limpa e avaliada junto com os últimos `overlap` caracteres da
+    anterior, de modo que cláusulas que atravessam a fronteira entre páginas
+    ainda são encontradas (com regras em modo limitado, `overlap` deve ser
+    maior que `max_span`). Só a janela atual fica em memória; os resultados são
+    emitidos assim que encontrados, com posições nas coordenadas do texto
+    limpo completo, e cada padrão gera no máximo um resultado, como em `analyze`.
+    """
+
+    def __init__(self, engine: "ContractAnalysisEngine", overlap: int, window_size: int):
+        self.engine = engine
+        self.overlap = overlap
+        self.window_size = max(window_size, overlap + 1)
+        self.start_time = time.time()
+        self.tail = ""
+        self.tail_offset = 0
+        self.consumed = 0  # Caracteres do texto limpo já processados
+        self.found: set = set()
+        self.word_counter = WordCounter()
+        self.total_sentences = 0
+        self.entities: Optional[List[Tuple[str, str]]] = [] if engine.nlp_model else None
+        self._entity_offsets: set = set()  # (início, fim) no documento, para não repetir na sobreposição
+        self._fingerprint = hashlib.blake2b(
+            digest_size=32, person=f"clara-doc-v{SecurityUtils.FINGERPRINT_VERSION}".encode())
+        self._timer = StageTimer()  # Tempos acumulados de todas as partes
+        self._pattern_times: Dict[int, float] = {}
+        self._truncated: Dict[int, int] = {}
+        self._closed = False
+
+    def feed(self, chunk: str) -> List[AnalysisResult]:
+        """Processa mais uma parte do documento e retorna os novos resultados"""
+        if self._closed:
+            raise ValueError("Análise incremental já encerrada")
+
+        with self._timer.stage("cleaning"):
+            cleaned = TextUtils.clean_text(chunk)
+        if not cleaned:
+            return []
+
+        results = []
+        # Partes muito grandes são divididas em janelas (no espaço mais próximo)
+        while cleaned:
+            piece = cleaned[:self.window_size]
+            if len(cleaned) > self.window_size:
+                cut = piece.rfind(" ")
+                if cut > 0:
+                    piece = piece[:cut]
+            cleaned = cleaned[len(piece):].lstrip()
+            results.extend(self._process(piece))
+        return results
+
+    def _process(self, piece: str) -> List[AnalysisResult]:
+        separator = " " if self.consumed else ""
+        timer = self._timer
+        with timer.stage("hashing"):
+            self._fingerprint.update(unicodedata.normalize('NFC', separator + piece).encode('utf-8'))
+        with timer.stage("tokenization"):
+            piece_index = SentenceIndex.split(piece)
+            self.word_counter.feed(separator + piece)
+        self.total_sentences += len(piece_index)
+        piece_offset = self.consumed + len(separator)
+        if self.entities is not None and self.engine.ner_scope == NerScope.DOCUMENT:
+            with timer.stage("ner"):
+                self._add_entities(piece, piece_index, piece_offset)
+
+        # Sem cauda (overlap=0), a janela é só a parte, que começa depois do separador
+        window = f"{self.tail}{separator}{piece}" if self.tail else piece
+        window_offset = self.tail_offset if self.tail else piece_offset
+        self.consumed += len(separator) + len(piece)
+
+        results = []
+        with timer.stage("rules"):
+            matches = self.engine.compiled_rules.scan_indexed(window, skip=self.found,
+                                                              pattern_times=self._pattern_times,
+                                                              truncated=self._truncated)
+        if matches:
+            with timer.stage("tokenization"):
+                sentence_index = SentenceIndex.split(window)
+            if self.entities is not None and self.engine.ner_scope == NerScope.MATCHES:
+                positions = [match.start() for match in matches.values()]
+                with timer.stage("ner"):
+                    self._add_entities(window, sentence_index, window_offset, positions)
+            with timer.stage("results"):
+                for index in sorted(matches):
+                    compiled = self.engine.compiled_rules.patterns[index]
+                    rule = self.engine.rules[compiled.rule_index]
+                    try:
+                        results.append(self.engine._build_result(
+                            rule, compiled.pattern, matches[index], window, sentence_index, window_offset))
+                        self.found.add(index)
+                    except Exception as e:
+                        self.engine.logger.error(f"Erro ao aplicar regra {rule.id}: {str(e)}")
+
+        self.tail = window[-self.overlap:] if self.overlap else ""
+        self.tail_offset = self.consumed - len(self.tail)
+        return results
+
+    def _add_entities(self, text: str, sentence_index: SentenceIndex, offset: int,
+                      positions: Optional[List[int]] = None):
+        for start, end, label in self.engine._entity_spans(text, sentence_index, positions):
+            if (offset + start, offset + end) not in self._entity_offsets:
+                self._entity_offsets.add((offset + start, offset + end))
+                self.entities.append((text[start:end], label))
+
+    def close(self) -> ContractMetadata:
+        """Encerra a análise e retorna os metadados do documento inteiro"""
+        self._closed = True
+        self.tail = ""
+        match_counts = [0] * len(self.engine.rules)
+        for index in self.found:
+            match_counts[self.engine.compiled_rules.patterns[index].rule_index] += 1
+        metadata = ContractMetadata(
+            contract_hash=self._fingerprint.hexdigest(),
+            total_words=self.word_counter.total,
+            total_sentences=self.total_sentences,
+            entities=self.entities,
+            processing_time=time.time() - self.start_time,
+            analyzed_at=datetime.now(),
+            ruleset_digest=self.engine.ruleset_digest,
+            stage_timings=self._timer.timings,
+            rule_stats=self.engine._rule_stats(match_counts, self._pattern_times, self._truncated)
+        )
+        self.engine._log_timings(metadata)
+        return metadata
+
+#################################################################
+# 7. GERENCIAMENTO DE DADOS E INTEGRAÇÕES
+#################################################################
+class AnalysisCache:
+    """Cache de análises em dois níveis: LRU em memória e SQLite persistente.
+
+    A chave combina a impressão digital do contrato com o digest do conjunto de
+    regras (e a configuração do motor), de modo que qualquer mudança em
+    `CONTRACT_RULES` invalida as entradas antigas automaticamente; entradas de
+    outros conjuntos de regras são removidas do SQLite ao abrir o cache.
+    """
+
+    def __init__(self, db_path: str = AppConfig.ANALYTICS_DB_PATH,
+                 max_memory_entries: int = AppConfig.ANALYSIS_CACHE_MEMORY_ENTRIES,
+                 max_persistent_entries: int = AppConfig.ANALYSIS_CACHE_PERSISTENT_ENTRIES,
+                 ruleset_digest: Optional[str] = None):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_persistent_entries = max_persistent_entries
+        self.logger = logger
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "persistent_evictions": 0,
+            "invalidated": 0,
+        }
+        self._init_db(ruleset_digest)
+
+    @contextmanager
+    def _connect(self):
+        """Abre uma conexão com transação (commit/rollback) e a fecha ao final"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self, ruleset_digest: Optional[str]):
+        """Cria a tabela do cache e descarta entradas de outros conjuntos de regras"""
+        try:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS analysis_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        contract_hash TEXT NOT NULL,
+                        ruleset_digest TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_hit_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                if ruleset_digest:
+                    cursor = conn.execute(
+                        "DELETE FROM analysis_cache WHERE ruleset_digest != ?", (ruleset_digest,))
+                    self._stats["invalidated"] += cursor.rowcount
+        except sqlite3.Error as e:
+            self.logger.error(f"Erro ao inicializar cache de análises: {str(e)}")
+
+    @staticmethod
+    def make_key(contract_hash: str, ruleset_digest: str, config_tag: str = "") -> str:
+        return f"{ruleset_digest}:{config_tag}:{contract_hash}"
+
+    @staticmethod
+    def _serialize(results: List[AnalysisResult], metadata: ContractMetadata) -> str:
+        meta = asdict(metadata)
+        meta["analyzed_at"] = metadata.analyzed_at.isoformat()
+        return json.dumps({"results": [asdict(r) for r in results], "metadata": meta}, ensure_ascii=False)
+
+    @staticmethod
+    def _deserialize(payload: str) -> Tuple[List[AnalysisResult], ContractMetadata]:
+        data = json.loads(payload)
+        meta = data["metadata"]
+        meta["analyzed_at"] = datetime.fromisoformat(meta["analyzed_at"])
+        if meta.get("entities") is not None:
+            meta["entities"] = [tuple(entity) for entity in meta["entities"]]
+        return [AnalysisResult(**r) for r in data["results"]], ContractMetadata(**meta)
+
+    def get(self, key: str) -> Optional[Tuple[List[AnalysisResult], ContractMetadata]]:
+        """Busca uma análise no cache (memória primeiro, depois SQLite)"""
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._deserialize(payload)
+
+        payload = None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload FROM analysis_cache WHERE cache_key = ?", (key,)).fetchone()
+                if row:
+                    payload = row[0]
+                    conn.execute(
+                        "UPDATE analysis_cache SET last_hit_at = CURRENT_TIMESTAMP WHERE cache_key = ?", (key,))
+        except sqlite3.Error as e:
+            self.logger.error(f"Erro ao consultar cache de análises: {str(e)}")
+
+        with self._lock:
+            if payload is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["persistent_hits"] += 1
+            self._remember(key, payload)
+        return self._deserialize(payload)
+
+    def put(self, key: str, results: List[AnalysisResult], metadata: ContractMetadata):
+        """Armazena uma análise nos dois níveis do cache"""
+        payload = self._serialize(results, metadata)
+        with self._lock:
+            self._remember(key, payload)
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (cache_key, contract_hash, ruleset_digest, payload) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, metadata.contract_hash, metadata.ruleset_digest or "", payload)
+                )
+                cursor = conn.execute("""
+                    DELETE FROM analysis_cache WHERE cache_key IN (
+                        SELECT cache_key FROM analysis_cache ORDER BY last_hit_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_persistent_entries,))
+                if cursor.rowcount > 0:
+                    with self._lock:
+                        self._stats["persistent_evictions"] += cursor.rowcount
+        except sqlite3.Error as e:
+            self.logger.error(f"Erro ao gravar cache de análises: {str(e)}")
+
+    def _remember(self, key: str, payload: str):
+        """Insere no LRU em memória (chamar com o lock adquirido)"""
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna contadores de acertos, falhas e remoções do cache"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["persistent_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["persistent_hits"]) / lookups if lookups else 0.0
+        return stats
+
+class ExtractionCache:
+    """Cache em memória do texto extraído, compartilhado entre sessões.
+
+    O Streamlit reexecuta o script a cada interação, e `show_contract_upload`
+    extrairia o mesmo arquivo de novo a cada vez. A chave é o hash BLAKE2b dos
+    bytes enviados mais o tipo do arquivo e `FileUtils.EXTRACTOR_VERSION`; o
+    limite é o tamanho total do texto guardado, removendo primeiro as entradas
+    usadas há mais tempo. Extrações parciais não são guardadas.
+    """
+
+    def __init__(self, max_bytes: int = AppConfig.EXTRACTION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, ExtractionResult]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(data: bytes, file_type: str) -> str:
+        digest = hashlib.blake2b(data, digest_size=32, person=b"clara-file-v1").hexdigest()
+        return f"v{FileUtils.EXTRACTOR_VERSION}:{file_type}:{digest}"
+
+    @staticmethod
+    def _entry_size(extraction: ExtractionResult) -> int:
+        return len(extraction.text.encode("utf-8"))
+
+    def get(self, key: str) -> Optional[ExtractionResult]:
+        with self._lock:
+            extraction = self._entries.get(key)
+            if extraction is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return extraction
+
+    def put(self, key: str, extraction: ExtractionResult):
+        size = self._entry_size(extraction)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= self._entry_size(previous)
+            self._entries[key] = extraction
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= self._entry_size(evicted)
+                self._stats["evictions"] += 1
+
+    def extract(self, file: BytesIO) -> Optional[ExtractionResult]:
+        """Retorna o texto já extraído deste arquivo ou extrai e guarda"""
+        data = file.getvalue() if hasattr(file, "getvalue") else file.read()
+        key = self.make_key(data, file.type)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        file.seek(0)
+        extraction = FileUtils.extract_with_metadata(file)
+        if extraction is not None and not extraction.partial:
+            self.put(key, extraction)
+        return extraction
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna contadores de acertos, falhas e remoções do cache"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._size
+        return stats
+
+class CachedAnalysisEngine(ContractAnalyzer):
+    """Fachada de `ContractAnalysisEngine` que consulta o `AnalysisCache` antes de analisar"""
+
+    def __init__(self, engine: "ContractAnalysisEngine", cache: AnalysisCache):
+        self.engine = engine
+        self.cache = cache
+        self.logger = logger
+
+    def analyze(self, text: str, progress: Optional[ProgressCallback] = None
+                ) -> Tuple[List[AnalysisResult], ContractMetadata]:
+        key = AnalysisCache.make_key(
+            SecurityUtils.content_fingerprint(text), self.engine.ruleset_digest, self.engine.config_tag())
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.logger.debug(f"Análise recuperada do cache: {self.cache.stats()}")
+            return cached
+
+        results, metadata = self.engine.analyze(text, progress)
+        self.cache.put(key, results, metadata)
+        return results, metadata
+
+class LeadsSheet:
+    """Planilha de leads com conexão persistente e índice e-mail → linha.
+
+    A conexão (credenciais, autorização e `open_by_key`) é feita uma vez e
+    reaproveitada; as credenciais do google-auth renovam o token sozinhas, e
+    qualquer falha numa gravação descarta a conexão e tenta de novo uma vez,
+    reautenticando. A coluna de e-mails é lida só ao conectar (e a cada
+    `index_ttl` segundos, para enxergar linhas gravadas por outros processos);
+    inserções atualizam o índice na hora. Assim cada gravação custa uma única
+    chamada à API, qualquer que seja o tamanho da planilha. Leads sem e-mail
+    (análises anônimas) ficam fora do índice e sempre viram linhas novas.
+
+    `worksheet_factory` permite usar uma planilha falsa local nos testes: basta
+    um objeto com `col_values`, `update` e `append_row`.
+    """
+
+    EMAIL_COLUMN = 2
+    LAST_COLUMN = "I"
+
+    def __init__(self, worksheet_factory: Optional[Callable[[], Any]] = None,
+                 index_ttl: float = AppConfig.SHEETS_INDEX_TTL):
+        self.worksheet_factory = worksheet_factory or self.open_google_worksheet
+        self.index_ttl = index_ttl
+        self.logger = logger
+        self._worksheet = None
+        self._email_rows: Dict[str, int] = {}
+        self._row_count = 0
+        self._indexed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def open_google_worksheet() -> "gspread.Worksheet":
+        """Autoriza com a conta de serviço e abre a aba de leads"""
+        import gspread
+
+        scope = [
+            "https://spreadsheets.google.com/feeds",
+            "https://www.googleapis.com/auth/drive"
+        ]
+        client = gspread.service_account_from_dict(json.loads(st.secrets["google_credentials"]), scopes=scope)
+        return client.open_by_key(AppConfig.GOOGLE_SHEET_KEY).worksheet(AppConfig.SHEET_NAME)
+
+    def worksheet(self):
+        """Retorna a planilha conectada (conectando e indexando se preciso)"""
+        with self._lock:
+            self._ensure_ready()
+            return self._worksheet
+
+    def reset(self):
+        """Descarta a conexão e o índice; a próxima chamada reconecta"""
+        with self._lock:
+            self._worksheet = None
+            self._indexed_at = None
+
+    def _ensure_ready(self):
+        if self._worksheet is None:
+            self._worksheet = self.worksheet_factory()
+        if self._indexed_at is None or time.time() - self._indexed_at > self.index_ttl:
+            emails = self._worksheet.col_values(self.EMAIL_COLUMN)
+            self._email_rows = {}
+            for row, email in enumerate(emails, start=1):
+                if email:
+                    self._email_rows.setdefault(email, row)  # Como o `index()` da lista: primeira ocorrência
+            self._row_count = len(emails)
+            self._indexed_at = time.time()
+
+    def upsert(self, email: str, record: List[str]):
+        """Atualiza a linha do e-mail ou acrescenta uma nova; reconecta e repete uma vez em caso de falha"""
+        try:
+            self._upsert(email, record)
+        except Exception as e:
+            self.logger.warning(f"Falha ao gravar no Google Sheets, reconectando: {str(e)}")
+            self.reset()
+            self._upsert(email, record)
+
+    def _upsert(self, email: str, record: List[str]):
+        with self._lock:
+            self._ensure_ready()
+            row = self._email_rows.get(email) if email else None
+            if row is not None:
+                self._worksheet.update(values=[record], range_name=f"A{row}:{self.LAST_COLUMN}{row}")
+                return
+
+            response = self._worksheet.append_row(record)
+            row = self._appended_row(response) or self._row_count + 1
+            if email:
+                self._email_rows[email] = row
+            self._row_count = max(self._row_count, row)
+
+    @staticmethod
+    def _appended_row(response) -> Optional[int]:
+        """Linha gravada pelo append, lida de `updates.updatedRange` (ex.: "Leads!A12:I12")"""
+        try:
+            updated_range = response["updates"]["updatedRange"]
+            return int(re.search(r"[A-Z]+(\d+)", updated_range.split("!")[-1]).group(1))
+        except (KeyError, TypeError, AttributeError, ValueError):
+            return None
+
+    def write_batch(self, items: List[Tuple[str, List[str]]]):
+        """Grava vários leads com um `batch_update` (e-mails já indexados) e um `append_rows` (novos)"""
+        with self._lock:
+            self._ensure_ready()
+            updates, appends = [], []
+            for email, record in items:
+                row = self._email_rows.get(email) if email else None
+                if row is not None:
+                    updates.append({"range": f"A{row}:{self.LAST_COLUMN}{row}", "values": [record]})
+                else:
+                    appends.append((email, record))
+
+            if updates:
+                self._worksheet.batch_update(updates)
+            if appends:
+                response = self._worksheet.append_rows([record for _, record in appends])
+                first_row = self._appended_row(response) or self._row_count + 1
+                for offset, (email, _) in enumerate(appends):
+                    if email:
+                        self._email_rows.setdefault(email, first_row + offset)
+                self._row_count = max(self._row_count, first_row + len(appends) - 1)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._email_rows)
+
+class LeadSpool:
+    """Fila durável de leads a gravar (tabela `lead_spool` no clara.db).
+
+    Há no máximo uma entrada por e-mail: uma nova gravação do mesmo lead
+    substitui a anterior ainda não enviada. Leads sem e-mail (análises
+    anônimas) recebem cada um uma chave própria e nunca se substituem.
+    """
+
+    ANONYMOUS_PREFIX = "anon:"
+
+    def __init__(self, db_path: str = AppConfig.LEADS_SPOOL_PATH):
+        self.db_path = db_path
+        self.logger = logger
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS lead_spool (
+                    email TEXT PRIMARY KEY,
+                    record TEXT NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Abre uma conexão com transação (commit/rollback) e a fecha ao final"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def put(self, email: str, record: List[str]):
+        key = email or f"{self.ANONYMOUS_PREFIX}{uuid.uuid4().hex}"
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO lead_spool (email, record, enqueued_at, attempts, next_attempt_at) "
+                "VALUES (?, ?, ?, 0, 0)",
+                (key, json.dumps(record, ensure_ascii=False), time.time())
+            )
+
+    @classmethod
+    def email_of(cls, key: str) -> str:
+        """E-mail do lead a partir da chave da fila ('' para leads anônimos)"""
+        return "" if key.startswith(cls.ANONYMOUS_PREFIX) else key
+
+    def due(self, limit: int) -> List[Tuple[str, List[str], float, int]]:
+        """Leads prontos para envio: (chave, registro, enfileirado_em, tentativas)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT email, record, enqueued_at, attempts FROM lead_spool "
+                "WHERE next_attempt_at <= ? ORDER BY enqueued_at LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        return [(email, json.loads(record), enqueued_at, attempts) for email, record, enqueued_at, attempts in rows]
+
+    def done(self, entries: List[Tuple[str, float]]):
+        """Remove os leads enviados, a menos que tenham sido substituídos durante o envio"""
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM lead_spool WHERE email = ? AND enqueued_at = ?", entries)
+
+    def retry_later(self, entries: List[Tuple[str, float]], delay: float):
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE lead_spool SET attempts = attempts + 1, next_attempt_at = ? "
+                "WHERE email = ? AND enqueued_at = ?",
+                [(time.time() + delay, email, enqueued_at) for email, enqueued_at in entries]
+            )
+
+    def stats(self) -> Dict[str, float]:
+        with self._connect() as conn:
+            depth, oldest = conn.execute("SELECT COUNT(*), MIN(enqueued_at) FROM lead_spool").fetchone()
+        return {"depth": depth, "oldest_age": time.time() - oldest if oldest else 0.0}
+
+class LeadWriter:
+    """Grava os leads no Google Sheets em segundo plano, a partir do `LeadSpool`.
+
+    `enqueue` só grava no SQLite local e retorna; uma thread esvazia a fila em
+    lotes (`LeadsSheet.write_batch`) a cada `LEADS_FLUSH_INTERVAL` segundos ou
+    logo após um novo lead. Se a gravação falhar, o lote volta para a fila com
+    espera exponencial (com jitter); em erros que não são de cota, a conexão
+    também é refeita. Nada se perde se o processo cair: a fila é retomada no
+    próximo início.
+    """
+
+    def __init__(self, sheet: LeadsSheet, spool: LeadSpool,
+                 flush_interval: float = AppConfig.LEADS_FLUSH_INTERVAL,
+                 batch_size: int = AppConfig.LEADS_BATCH_SIZE):
+        self.sheet = sheet
+        self.spool = spool
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.logger = logger
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "flushed": 0,
+            "batches": 0,
+            "failures": 0,
+            "last_flush_latency": 0.0,
+            "max_flush_latency": 0.0,
+            "last_error": None,
+        }
+
+    def enqueue(self, email: str, record: List[str]):
+        self.spool.put(email, record)
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="clara-leads", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                while self.flush() == self.batch_size:
+                    pass  # Fila com mais de um lote: continua sem esperar
+            except Exception as e:
+                self.logger.error(f"Erro no envio de leads: {str(e)}")
+
+    def flush(self) -> int:
+        """Envia um lote de leads pendentes; retorna quantos foram gravados"""
+        batch = self.spool.due(self.batch_size)
+        if not batch:
+            return 0
+        entries = [(key, enqueued_at) for key, _, enqueued_at, _ in batch]
+        start_time = time.time()
         try:
-            if file.type == "application/pdf":
-                return FileUtils._extract_from_pdf(file)
-            elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                return FileUtils._extract_from_docx(file)
-            else:
-                logger.error(f"Formato de arquivo não suportado: {file.type}")
-                return None
+            self.sheet.write_batch([(LeadSpool.email_of(key), record) for key, record, _, _ in batch])
         except Exception as e:
-            logger.error(f"Erro ao extrair texto: {str(e)}")
-            return None
-    
+            attempts = max(attempts for _, _, _, attempts in batch)
+            delay = min(AppConfig.LEADS_BACKOFF_BASE * 2 ** attempts, AppConfig.LEADS_BACKOFF_MAX)
+            delay *= random.uniform(0.5, 1.0)
+            self.spool.retry_later(entries, delay)
+            if not self._is_quota_error(e):
+                self.sheet.reset()
+            with self._metrics_lock:
+                self._metrics["failures"] += 1
+                self._metrics["last_error"] = str(e)
+            self.logger.warning(f"Falha ao gravar {len(batch)} leads; nova tentativa em {delay:.1f}s: {str(e)}")
+            return 0
+
+        self.spool.done(entries)
+        latency = time.time() - start_time
+        with self._metrics_lock:
+            self._metrics["flushed"] += len(batch)
+            self._metrics["batches"] += 1
+            self._metrics["last_flush_latency"] = latency
+            self._metrics["max_flush_latency"] = max(self._metrics["max_flush_latency"], latency)
+        return len(batch)
+
     @staticmethod
-    def _extract_from_pdf(file: BytesIO) -> Optional[str]:
-        """Extrai texto de arquivos PDF"""
-        try:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = "\n".join([page.extract_text() or "" for page in pdf_reader.pages])
-            return TextUtils.clean_text(text)
-        except PyPDF2.PdfReadError as e:
-            logger.error(f"Erro ao ler PDF: {str(e)}")
-            return None
-    
+    def _is_quota_error(error: Exception) -> bool:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        return status == 429 or "RESOURCE_EXHAUSTED" in str(error) or "Quota exceeded" in str(error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Profundidade da fila, idade do lead mais antigo e latência dos envios"""
+        with self._metrics_lock:
+            stats = dict(self._metrics)
+        stats.update(self.spool.stats())
+        return stats
+
+class AnalysisRepository:
+    """Histórico das análises nas tabelas `users`, `contracts` e `clauses` do clara_analytics.db.
+
+    Cada análise é gravada numa única transação (usuário, contrato e todas as
+    cláusulas). O banco fica em modo WAL, de modo que as leituras não bloqueiam
+    as gravações e várias sessões gravam ao mesmo tempo; cada thread mantém a
+    sua própria conexão aberta em vez de abrir uma por operação.
+
+    Na mesma transação são atualizados os agregados diários
+    (`rollup_rule_daily`: dia × regra × nível de risco; `rollup_contract_daily`:
+    dia × faixa de risco, com contratos e pagos), que respondem às consultas
+    de `top_rules`, `risk_by_week` e `conversion_by_risk` lendo só as linhas
+    do período pedido, qualquer que seja o tamanho do histórico.
+    `rebuild_rollups` os recalcula a partir das tabelas brutas.
+    """
+
+    # Colunas acrescentadas ao esquema original (bancos antigos são migrados ao abrir)
+    CONTRACT_COLUMNS = {
+        "session_id": "TEXT",
+        "contract_hash": "TEXT",
+        "ruleset_digest": "TEXT",
+        "total_words": "INTEGER",
+        "processing_time": "REAL",
+    }
+    CLAUSE_COLUMNS = {
+        "risk_level": "TEXT",
+        "match_position": "INTEGER",
+    }
+
+    # Faixas da maior pontuação do contrato, com os mesmos limites da tela de resultados
+    NO_RISK_BUCKET = "Nenhum"
+    RISK_BUCKET_SQL = (f"CASE WHEN risk_score >= 8 THEN '{RiskLevel.HIGH.value}' "
+                       f"WHEN risk_score >= 5 THEN '{RiskLevel.MEDIUM.value}' "
+                       f"WHEN risk_score > 0 THEN '{RiskLevel.LOW.value}' ELSE '{NO_RISK_BUCKET}' END")
+
+    def __init__(self, db_path: str = AppConfig.ANALYTICS_DB_PATH):
+        self.db_path = db_path
+        self.logger = logger
+        self._local = threading.local()
+        self._init_db()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Com WAL, ainda resiste a uma queda do processo
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _connect(self):
+        """Conexão da thread atual com transação (commit/rollback); a conexão continua aberta"""
+        conn = self._connection()
+        with conn:
+            yield conn
+
+    def close(self):
+        """Fecha a conexão da thread atual (as das outras threads fecham quando elas terminam)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _init_db(self):
+        """Cria as tabelas, acrescenta as colunas que faltarem e os índices"""
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nome TEXT NOT NULL,
+                    email TEXT NOT NULL UNIQUE,
+                    telefone TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS contracts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER,
+                    filename TEXT NOT NULL,
+                    file_type TEXT NOT NULL,
+                    risk_score INTEGER,
+                    analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    payment_status BOOLEAN DEFAULT 0,
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS clauses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    contract_id INTEGER,
+                    clause_type TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    explanation TEXT NOT NULL,
+                    recommendation TEXT,
+                    context TEXT NOT NULL,
+                    FOREIGN KEY (contract_id) REFERENCES contracts (id)
+                )
+            """)
+            for table, columns in (("contracts", self.CONTRACT_COLUMNS), ("clauses", self.CLAUSE_COLUMNS)):
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                for name, column_type in columns.items():
+                    if name not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+            # `users.email` já é indexado pela restrição UNIQUE
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_contracts_user ON contracts (user_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_contracts_hash ON contracts (contract_hash)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_contracts_date ON contracts (analysis_date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_contracts_session ON contracts (session_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_clauses_contract ON clauses (contract_id)")
+
+            has_rollups = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollup_contract_daily'").fetchone()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_rule_daily (
+                    day TEXT NOT NULL,
+                    rule_id TEXT NOT NULL,
+                    risk_level TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, rule_id, risk_level)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_contract_daily (
+                    day TEXT NOT NULL,
+                    risk_bucket TEXT NOT NULL,
+                    contracts INTEGER NOT NULL DEFAULT 0,
+                    paid INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, risk_bucket)
+                ) WITHOUT ROWID
+            """)
+            if not has_rollups:
+                self._rebuild_rollups(conn)  # Banco com histórico anterior aos agregados
+
+    @classmethod
+    def risk_bucket(cls, risk_score: int) -> str:
+        """Faixa de risco do contrato (mesma regra de `RISK_BUCKET_SQL`)"""
+        if risk_score >= 8:
+            return RiskLevel.HIGH.value
+        if risk_score >= 5:
+            return RiskLevel.MEDIUM.value
+        if risk_score > 0:
+            return RiskLevel.LOW.value
+        return cls.NO_RISK_BUCKET
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM rollup_rule_daily")
+        conn.execute("DELETE FROM rollup_contract_daily")
+        conn.execute("""
+            INSERT INTO rollup_rule_daily (day, rule_id, risk_level, hits)
+            SELECT date(c.analysis_date), cl.clause_type, COALESCE(cl.risk_level, ''), COUNT(*)
+            FROM clauses cl JOIN contracts c ON c.id = cl.contract_id
+            GROUP BY 1, 2, 3
+        """)
+        conn.execute(f"""
+            INSERT INTO rollup_contract_daily (day, risk_bucket, contracts, paid)
+            SELECT date(analysis_date), {self.RISK_BUCKET_SQL}, COUNT(*), SUM(payment_status != 0)
+            FROM contracts
+            GROUP BY 1, 2
+        """)
+
+    def rebuild_rollups(self):
+        """Recalcula os agregados a partir de `contracts` e `clauses` (reparo ou compactação)"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._rebuild_rollups(conn)
+
     @staticmethod
-    def _extract_from_docx(file: BytesIO) -> Optional[str]:
-        """Extrai texto de arquivos DOCX"""
+    def _upsert_user(conn: sqlite3.Connection, user_data: Dict) -> Optional[int]:
+        email = user_data.get('email')
+        if not email:
+            return None
+        conn.execute(
+            "INSERT INTO users (nome, email, telefone) VALUES (?, ?, ?) "
+            "ON CONFLICT(email) DO UPDATE SET nome = excluded.nome, telefone = excluded.telefone",
+            (user_data.get('name', ''), email, user_data.get('phone', ''))
+        )
+        return conn.execute("SELECT id FROM users WHERE email = ?", (email,)).fetchone()[0]
+
+    def save(self, results: List[AnalysisResult], metadata: ContractMetadata, user_data: Dict,
+             filename: str, file_type: str) -> Optional[int]:
+        """Grava o usuário, o contrato e as cláusulas numa transação; retorna o id do contrato.
+
+        A data registrada é a da gravação, não `metadata.analyzed_at`: uma
+        análise vinda do cache traz a data da primeira análise do contrato.
+        """
+        saved_at = self._utc_now()
         try:
-            doc = Document(file)
-            return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-        except Exception as e:
-            logger.error(f"Erro ao ler DOCX: {str(e)}")
+            with self._connect() as conn:
+                user_id = self._upsert_user(conn, user_data)
+                risk_score = max((r.score for r in results), default=0)
+                paid = bool(user_data.get('paid', False))
+                cursor = conn.execute(
+                    "INSERT INTO contracts (user_id, filename, file_type, risk_score, analysis_date, "
+                    "payment_status, session_id, contract_hash, ruleset_digest, total_words, processing_time) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, filename, file_type, risk_score, saved_at, paid, user_data.get('session_id'), metadata.contract_hash,
+                     metadata.ruleset_digest, metadata.total_words, metadata.processing_time)
+                )
+                contract_id = cursor.lastrowid
+                clauses = [r for r in results if r.rule_id != "none"]  # "none" = nenhuma cláusula encontrada
+                conn.executemany(
+                    "INSERT INTO clauses (contract_id, clause_type, message, score, explanation, "
+                    "recommendation, context, risk_level, match_position) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(contract_id, r.rule_id, r.clause, r.score, r.explanation, r.solution, r.context,
+                      r.risk_level, r.match_position) for r in clauses]
+                )
+
+                day = saved_at[:10]
+                hits = Counter((r.rule_id, r.risk_level) for r in clauses)
+                conn.executemany(
+                    "INSERT INTO rollup_rule_daily (day, rule_id, risk_level, hits) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(day, rule_id, risk_level) DO UPDATE SET hits = hits + excluded.hits",
+                    [(day, rule_id, risk_level, count) for (rule_id, risk_level), count in hits.items()]
+                )
+                conn.execute(
+                    "INSERT INTO rollup_contract_daily (day, risk_bucket, contracts, paid) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT(day, risk_bucket) DO UPDATE SET contracts = contracts + 1, paid = paid + excluded.paid",
+                    (day, self.risk_bucket(risk_score), int(paid))
+                )
+            return contract_id
+        except sqlite3.Error as e:
+            self.logger.error(f"Erro ao gravar análise no histórico: {str(e)}")
             return None
 
-#################################################################
-# 6. CORE DA APLICAÇÃO - ANÁLISE E PROCESSAMENTO
-#################################################################
-class ContractAnalysisEngine(ContractAnalyzer):
-    def __init__(self, rules: List[ContractRule], nlp_model=None):
-        self.rules = rules
-        self.nlp_model = nlp_model
-        self.logger = logger
-    
-    def analyze(self, text: str) -> Tuple[List[AnalysisResult], ContractMetadata]:
-        """Executa a análise completa do contrato"""
-        start_time = time.time()
-        results = []
-        contract_hash = SecurityUtils.generate_secure_hash(text)
-        
+    def mark_paid(self, session_id: str) -> int:
+        """Marca como pagas as análises da sessão; retorna quantos contratos foram atualizados"""
         try:
-            # Pré-processamento do texto
-            cleaned_text = TextUtils.clean_text(text)
-            sentences = sent_tokenize(cleaned_text)
-            total_words = len(word_tokenize(cleaned_text))
-            total_sentences = len(sentences)
-            
-            # Aplicação das regras de análise
-            for rule in self.rules:
-                results.extend(self._apply_rule(rule, cleaned_text, sentences))
-            
-            # Se nenhum problema encontrado
-            if not results:
-                results.append(self._create_no_issues_result())
-            
-            # Pós-processamento (opcional com NLP)
-            entities = self._extract_entities(cleaned_text) if self.nlp_model else None
-            
-            metadata = ContractMetadata(
-                contract_hash=contract_hash,
-                total_words=total_words,
-                total_sentences=total_sentences,
-                entities=entities,
-                processing_time=time.time() - start_time,
-                analyzed_at=datetime.now()
-            )
-            
-            return results, metadata
-            
-        except Exception as e:
-            self.logger.error(f"Erro na análise do contrato: {str(e)}")
-            raise
-    
-    def _apply_rule(self, rule: ContractRule, text: str, sentences: List[str]) -> List[AnalysisResult]:
-        """Aplica uma regra específica ao texto"""
-        results = []
-        for pattern in rule.patterns:
+            with self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")  # Lê e atualiza sem que outro pagamento conte o mesmo contrato
+                rows = conn.execute(
+                    "SELECT date(analysis_date), risk_score FROM contracts "
+                    "WHERE session_id = ? AND payment_status = 0", (session_id,)).fetchall()
+                conn.executemany(
+                    "UPDATE rollup_contract_daily SET paid = paid + 1 WHERE day = ? AND risk_bucket = ?",
+                    [(day, self.risk_bucket(risk_score or 0)) for day, risk_score in rows]
+                )
+                conn.execute(
+                    "UPDATE contracts SET payment_status = 1 WHERE session_id = ? AND payment_status = 0",
+                    (session_id,))
+                return len(rows)
+        except sqlite3.Error as e:
+            self.logger.error(f"Erro ao registrar pagamento no histórico: {str(e)}")
+            return 0
+
+    def find_by_hash(self, contract_hash: str) -> List[Dict]:
+        """Análises já gravadas de um contrato, da mais recente para a mais antiga"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
             try:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    results.append(AnalysisResult(
-                        rule_id=rule.id,
-                        clause=rule.name,
-                        score=rule.score,
-                        risk_level=rule.risk_level.value,
-                        explanation=rule.explanation,
-                        solution=rule.solution,
-                        legal_references=rule.legal_references,
-                        tags=rule.tags,
-                        excerpt=TextUtils.extract_excerpt(text, pattern, match),
-                        match_position=match.start(),
-                        context=TextUtils.get_context(sentences, match.group())
-                    ))
-                    break  # Evita múltiplos matches para a mesma regra
-            except Exception as e:
-                self.logger.error(f"Erro ao aplicar regra {rule.id}: {str(e)}")
-        return results
-    
-    def _create_no_issues_result(self) -> AnalysisResult:
-        """Cria um resultado padrão quando nenhum problema é encontrado"""
-        return AnalysisResult(
-            rule_id="none",
-            clause="Nenhuma irregularidade grave detectada",
-            score=0,
-            risk_level=RiskLevel.LOW.value,
-            explanation="Não foram encontradas cláusulas abusivas no contrato.",
-            solution="",
-            legal_references=[],
-            tags=[],
-            excerpt="",
-            match_position=0,
-            context=""
-        )
-    
-    def _extract_entities(self, text: str) -> List[Tuple[str, str]]:
-        """Extrai entidades nomeadas usando o modelo NLP"""
-        try:
-            doc = self.nlp_model(text)
-            return [(ent.text, ent.label_) for ent in doc.ents]
-        except Exception as e:
-            self.logger.error(f"Erro ao extrair entidades: {str(e)}")
-            return []
+                rows = conn.execute(
+                    "SELECT * FROM contracts WHERE contract_hash = ? ORDER BY analysis_date DESC",
+                    (contract_hash,)).fetchall()
+            finally:
+                conn.row_factory = None
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _utc_now() -> str:
+        """Data e hora UTC no formato do `CURRENT_TIMESTAMP` do SQLite (o mesmo relógio dos padrões das tabelas)"""
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def _since(days: Optional[int]) -> str:
+        """Primeiro dia (UTC) da janela dos últimos `days` dias (todo o histórico se None)"""
+        if days is None:
+            return ""
+        return (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+
+    def top_rules(self, days: Optional[int] = 30, limit: int = 10) -> List[Dict]:
+        """Regras mais encontradas no período, com o total por nível de risco"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT rule_id, risk_level, SUM(hits) FROM rollup_rule_daily WHERE day >= ? "
+                "GROUP BY rule_id, risk_level", (self._since(days),)).fetchall()
+        totals: Dict[str, Dict] = {}
+        for rule_id, risk_level, hits in rows:
+            entry = totals.setdefault(rule_id, {"rule_id": rule_id, "hits": 0, "by_risk_level": {}})
+            entry["hits"] += hits
+            entry["by_risk_level"][risk_level] = hits
+        return sorted(totals.values(), key=lambda entry: entry["hits"], reverse=True)[:limit]
+
+    def risk_by_week(self, weeks: int = 12) -> List[Dict]:
+        """Contratos por semana (início na segunda-feira) e faixa de risco"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT date(day, '-6 days', 'weekday 1') AS week, risk_bucket, SUM(contracts) "
+                "FROM rollup_contract_daily WHERE day >= ? GROUP BY week, risk_bucket ORDER BY week",
+                (self._since(weeks * 7),)).fetchall()
+        return [{"week": week, "risk_bucket": bucket, "contracts": contracts} for week, bucket, contracts in rows]
+
+    def conversion_by_risk(self, days: Optional[int] = None) -> Dict[str, Dict]:
+        """Contratos analisados, pagos e taxa de conversão por faixa de risco"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT risk_bucket, SUM(contracts), SUM(paid) FROM rollup_contract_daily "
+                "WHERE day >= ? GROUP BY risk_bucket", (self._since(days),)).fetchall()
+        return {bucket: {"contracts": contracts, "paid": paid, "conversion": paid / contracts if contracts else 0.0}
+                for bucket, contracts, paid in rows}
 
-#################################################################
-# 7. GERENCIAMENTO DE DADOS E INTEGRAÇÕES
-#################################################################
 class DataManager:
-    def __init__(self):
+    def __init__(self, leads_sheet: Optional[LeadsSheet] = None, lead_writer: Optional[LeadWriter] = None,
+                 hash_key: Optional[bytes] = None):
         self.logger = logger
+        self.leads_sheet = leads_sheet or get_leads_sheet()
+        self.lead_writer = lead_writer or get_lead_writer()
+        self.hash_key = hash_key if hash_key is not None else get_lead_hash_key()
+
+    def _sheet_fingerprint(self, fingerprint: Optional[str]) -> str:
+        """Impressão digital gravada na planilha externa: HMAC com a chave do servidor, se houver"""
+        if not fingerprint:
+            return ''
+        if self.hash_key:
+            return SecurityUtils.keyed_fingerprint(fingerprint, self.hash_key)[:50]
+        return fingerprint[:50]
     
-    def connect_to_google_sheets(self) -> Optional[gspread.Worksheet]:
-        """Estabelece conexão com o Google Sheets"""
+    def connect_to_google_sheets(self) -> Optional["gspread.Worksheet"]:
+        """Estabelece conexão com o Google Sheets (reaproveitada entre chamadas)"""
         try:
-            scope = [
-                "https://spreadsheets.google.com/feeds",
-                "https://www.googleapis.com/auth/drive"
-            ]
-            creds = ServiceAccountCredentials.from_json_keyfile_dict(
-                json.loads(st.secrets["google_credentials"]), scope)
-            client = gspread.authorize(creds)
-            return client.open_by_key(AppConfig.GOOGLE_SHEET_KEY).worksheet(AppConfig.SHEET_NAME)
+            return self.leads_sheet.worksheet()
         except Exception as e:
             self.logger.error(f"Erro ao conectar ao Google Sheets: {str(e)}")
             return None
     
     def save_to_google_sheets(self, data: Dict) -> bool:
-        """Salva dados no Google Sheets com tratamento de erros"""
+        """Enfileira os dados para o Google Sheets (gravação em segundo plano pelo `LeadWriter`)"""
         try:
-            worksheet = self.connect_to_google_sheets()
-            if not worksheet:
-                return False
-            
-            # Verificar se o e-mail já existe
-            existing_emails = worksheet.col_values(2)  # Coluna de e-mails
-            
             # Preparar dados para inserção/atualização
             record = [
                 data.get('name', ''),
@@ -426,70 +2716,314 @@ class DataManager:
                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 str(data.get('analysis_results', {}).get('total_issues', 0)),
                 str(data.get('analysis_results', {}).get('high_risk', 0)),
-                data.get('contract_hash', '')[:50]  # Armazena parte do hash
+                self._sheet_fingerprint(data.get('contract_hash'))
             ]
             
-            if data.get('email', '') in existing_emails:
-                # Atualizar registro existente
-                row_num = existing_emails.index(data['email']) + 1
-                worksheet.update(f"A{row_num}:I{row_num}", [record])
-            else:
-                # Adicionar novo registro
-                worksheet.append_row(record)
-            
+            self.lead_writer.enqueue(data.get('email', ''), record)
             return True
         except Exception as e:
             self.logger.error(f"Erro ao salvar dados: {str(e)}")
             return False
 
+class SMTPSession:
+    """Conexão SMTP autenticada reaproveitada entre mensagens.
+
+    Conecta (STARTTLS + login) no primeiro envio e mantém a conexão aberta;
+    reconecta após `max_messages_per_connection` mensagens, se a conexão ficou
+    ociosa e não responde ao NOOP, ou se o servidor a encerrou. O timeout é o
+    da própria conexão, sem `socket.setdefaulttimeout`.
+    """
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.logger = logger
+        self._server: Optional[smtplib.SMTP] = None
+        self._sent_on_connection = 0
+        self._last_used = 0.0
+
+    def _connect(self):
+        self.close()
+        server = smtplib.SMTP(self.config['smtp_server'], self.config['port'], timeout=self.config['timeout'])
+        try:
+            if self.config.get('use_tls', True):
+                server.starttls(context=ssl.create_default_context())
+            if self.config.get('password'):
+                server.login(self.config['sender'], self.config['password'])
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._sent_on_connection = 0
+
+    def _usable(self) -> bool:
+        if self._server is None:
+            return False
+        if self._sent_on_connection >= self.config.get('max_messages_per_connection', 100):
+            return False
+        if time.time() - self._last_used > self.config.get('idle_timeout', 60):
+            try:
+                return self._server.noop()[0] == 250
+            except (smtplib.SMTPException, OSError):
+                return False
+        return True
+
+    def send(self, message: MIMEMultipart):
+        if not self._usable():
+            self._connect()
+        try:
+            self._server.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self._connect()  # Servidor fechou a conexão ociosa: uma nova tentativa imediata
+            self._server.send_message(message)
+        self._sent_on_connection += 1
+        self._last_used = time.time()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                self._server.close()
+            self._server = None
+
+@dataclass
+class OutgoingEmail:
+    message: MIMEMultipart
+    attempts: int = 0
+    queued_at: float = field(default_factory=time.time)
+
+class EmailOutbox:
+    """Fila de e-mails enviada em segundo plano por um pool de sessões SMTP reaproveitadas.
+
+    Cada thread de envio (`outbox_workers`) mantém a sua própria `SMTPSession`.
+
+    Falhas temporárias (conexão, timeout, respostas 4xx) voltam para a fila com
+    espera exponencial, até `max_retries`; respostas 5xx são definitivas.
+    """
+
+    def __init__(self, config: Dict = AppConfig.EMAIL_CONFIG):
+        self.config = config
+        self.logger = logger
+        self.workers = max(1, config.get('outbox_workers', 1))
+        self._queue: "queue.Queue[Optional[OutgoingEmail]]" = queue.Queue()
+        self._pending = 0  # Na fila ou aguardando nova tentativa
+        self._idle = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._metrics_lock = threading.Lock()
+        self._metrics = {"sent": 0, "failed": 0, "retried": 0, "send_seconds": 0.0}
+
+    def start(self):
+        if not self._threads:
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"clara-outbox-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def enqueue(self, message: MIMEMultipart):
+        with self._idle:
+            self._pending += 1
+        self._queue.put(OutgoingEmail(message))
+
+    def wait_until_empty(self, timeout: Optional[float] = None) -> bool:
+        """Espera até que todos os e-mails tenham sido enviados ou descartados"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def _run(self):
+        session = SMTPSession(self.config)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                start_time = time.time()
+                try:
+                    session.send(item.message)
+                    self._finish(item, "sent", time.time() - start_time)
+                except smtplib.SMTPResponseException as e:
+                    session.close()
+                    if e.smtp_code >= 500:
+                        self.logger.error(f"Erro SMTP definitivo ao enviar e-mail: {e.smtp_code} {e.smtp_error!r}")
+                        self._finish(item, "failed")
+                    else:
+                        self._retry(item, e)
+                except (smtplib.SMTPException, OSError) as e:
+                    session.close()
+                    self._retry(item, e)
+                except Exception as e:
+                    # Mensagem malformada (cabeçalho, endereço, codificação): não adianta tentar de novo
+                    session.close()
+                    self.logger.error(f"Erro inesperado ao enviar e-mail: {type(e).__name__}: {str(e)}")
+                    self._finish(item, "failed")
+        finally:
+            session.close()
+
+    def _retry(self, item: OutgoingEmail, error: Exception):
+        item.attempts += 1
+        if item.attempts > self.config.get('max_retries', 3):
+            self.logger.error(f"E-mail descartado após {item.attempts} tentativas: {str(error)}")
+            self._finish(item, "failed")
+            return
+        delay = self.config.get('retry_backoff', 5) * 2 ** (item.attempts - 1)
+        self.logger.warning(f"Falha ao enviar e-mail, nova tentativa em {delay}s: {str(error)}")
+        with self._metrics_lock:
+            self._metrics["retried"] += 1
+        timer = threading.Timer(delay, self._queue.put, args=(item,))
+        timer.daemon = True
+        timer.start()
+
+    def _finish(self, item: OutgoingEmail, outcome: str, send_seconds: float = 0.0):
+        with self._metrics_lock:
+            self._metrics[outcome] += 1
+            self._metrics["send_seconds"] += send_seconds
+        with self._idle:
+            self._pending -= 1
+            self._idle.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """Enviados, falhas, novas tentativas, fila e vazão (mensagens/s somando as sessões)"""
+        with self._metrics_lock:
+            stats = dict(self._metrics)
+        stats["queue_depth"] = self._pending
+        busy = stats["send_seconds"] / self.workers
+        stats["throughput"] = stats["sent"] / busy if busy else 0.0
+        return stats
+
 class EmailService:
-    def __init__(self):
+    def __init__(self, outbox: Optional[EmailOutbox] = None):
         self.config = AppConfig.EMAIL_CONFIG
         self.logger = logger
+        self.outbox = outbox or get_email_outbox()
+    
+    def build_message(self, to_email: str, subject: str, body: str) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg['From'] = self.config['sender']
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'html'))
+        return msg
     
     def send_email(self, to_email: str, subject: str, body: str) -> bool:
-        """Envia e-mail com tratamento robusto de erros"""
+        """Valida e coloca o e-mail na fila de envio (o envio ocorre em segundo plano).
+
+        True significa que o e-mail foi enfileirado, não que foi entregue.
+        """
         if not SecurityUtils.validate_email(to_email):
             self.logger.error(f"E-mail inválido: {to_email}")
             return False
         
         try:
-            # Configuração da mensagem
-            msg = MIMEMultipart()
-            msg['From'] = self.config['sender']
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            msg.attach(MIMEText(body, 'html'))
-            
-            # Configuração de timeout
-            socket.setdefaulttimeout(self.config['timeout'])
-            
-            # Conexão segura com o servidor SMTP
-            context = ssl.create_default_context()
-            
-            with smtplib.SMTP(self.config['smtp_server'], self.config['port']) as server:
-                server.starttls(context=context)
-                server.login(self.config['sender'], self.config['password'])
-                server.send_message(msg)
-            
+            self.outbox.enqueue(self.build_message(to_email, subject, body))
             return True
-        except smtplib.SMTPException as e:
-            self.logger.error(f"Erro SMTP ao enviar e-mail: {str(e)}")
-        except socket.timeout:
-            self.logger.error("Timeout ao tentar enviar e-mail")
         except Exception as e:
-            self.logger.error(f"Erro inesperado ao enviar e-mail: {str(e)}")
-        
-        return False
+            self.logger.error(f"Erro inesperado ao enfileirar e-mail: {str(e)}")
+            return False
+
+class AnalysisJobQueue:
+    """Executa análises em segundo plano e guarda o progresso e o resultado.
+
+    `submit` retorna o id do job na hora; a análise, a gravação no histórico
+    (`AnalysisRepository`) e o registro no Google Sheets rodam num pool de threads, fora da thread do Streamlit, e a tela
+    consulta `get` para mostrar a etapa atual. Os jobs ficam indexados por
+    sessão e impressão digital do contrato: reenviar o mesmo contrato na mesma
+    sessão devolve o job existente em vez de analisar de novo.
+    """
+
+    def __init__(self, analyzer_factory: Callable[[], ContractAnalyzer], data_manager: "DataManager",
+                 repository: AnalysisRepository,
+                 max_workers: int = AppConfig.JOB_WORKERS, max_finished: int = AppConfig.JOB_MAX_FINISHED):
+        self.analyzer_factory = analyzer_factory
+        self.data_manager = data_manager
+        self.repository = repository
+        self.max_finished = max_finished
+        self.logger = logger
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clara-job")
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._by_content: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id: str, text: str, user_data: Dict,
+               source: Tuple[str, str] = ("texto colado", "text")) -> str:
+        """Agenda a análise de `text` (vinda de `source` = (nome do arquivo, tipo)) e retorna o id do job"""
+        contract_hash = SecurityUtils.content_fingerprint(text)
+        with self._lock:
+            existing = self._by_content.get((session_id, contract_hash))
+            if existing in self._jobs and self._jobs[existing].status != JobStatus.FAILED:
+                return existing
+
+            job = AnalysisJob(job_id=str(uuid.uuid4()), session_id=session_id, contract_hash=contract_hash)
+            self._jobs[job.job_id] = job
+            self._by_content[(session_id, contract_hash)] = job.job_id
+            self._evict_finished()
+
+        # Cópia: o estado da sessão pode mudar enquanto o job roda
+        self._executor.submit(self._run, job, text, dict(user_data), source)
+        return job.job_id
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, session_id: str, contract_hash: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(self._by_content.get((session_id, contract_hash), ""))
+
+    def _update(self, job: AnalysisJob, **changes):
+        with self._lock:
+            for name, value in changes.items():
+                setattr(job, name, value)
+
+    def _run(self, job: AnalysisJob, text: str, user_data: Dict, source: Tuple[str, str]):
+        self._update(job, status=JobStatus.RUNNING)
+        try:
+            # A análise ocupa 90% da barra; o registro no Google Sheets, o restante
+            results, metadata = self.analyzer_factory().analyze(
+                text, lambda stage, fraction: self._update(job, stage=stage, progress=0.9 * fraction))
+
+            self._update(job, stage="Registrando a análise", progress=0.9)
+            self.repository.save(results, metadata, user_data, *source)
+            self.data_manager.save_to_google_sheets({
+                **user_data,
+                "analysis_requested": True,
+                "contract_hash": metadata.contract_hash,
+                "analysis_results": {
+                    "total_issues": len([r for r in results if r.score > 0]),
+                    "high_risk": sum(1 for r in results if r.score >= 8)
+                }
+            })
+            self._update(job, status=JobStatus.DONE, stage="Concluído", progress=1.0,
+                         results=results, metadata=metadata, finished_at=time.time())
+        except Exception as e:
+            self.logger.error(f"Erro no job de análise {job.job_id}: {traceback.format_exc()}")
+            self._update(job, status=JobStatus.FAILED, stage="Erro", error=str(e), finished_at=time.time())
+
+    def _evict_finished(self):
+        """Remove os jobs concluídos mais antigos além do limite (chamar com o lock adquirido)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            job = self._jobs.pop(job_id)
+            if self._by_content.get((job.session_id, job.contract_hash)) == job_id:
+                del self._by_content[(job.session_id, job.contract_hash)]
 
 #################################################################
 # 8. VISUALIZAÇÕES E RELATÓRIOS
 #################################################################
 class VisualizationEngine:
     @staticmethod
-    def generate_wordcloud(text: str) -> Optional[plt.Figure]:
+    def generate_wordcloud(text: str) -> Optional["plt.Figure"]:
         """Gera uma nuvem de palavras do texto"""
         try:
+            import matplotlib.pyplot as plt
+            from nltk.corpus import stopwords
+            from wordcloud import WordCloud
+
             stopwords_pt = set(stopwords.words('portuguese'))
             wordcloud = WordCloud(
                 width=800,
@@ -510,8 +3044,11 @@ class VisualizationEngine:
             return None
     
     @staticmethod
-    def create_risk_chart(high_risk: int, medium_risk: int, low_risk: int) -> px.bar:
+    def create_risk_chart(high_risk: int, medium_risk: int, low_risk: int) -> "go.Figure":
         """Cria gráfico de barras para visualização de riscos"""
+        import pandas as pd
+        import plotly.express as px
+
         risk_data = pd.DataFrame({
             "Nível de Risco": ["Alto Risco", "Médio Risco", "Baixo Risco"],
             "Cláusulas": [high_risk, medium_risk, low_risk],
@@ -613,6 +3150,10 @@ class VisualizationEngine:
 #################################################################
 # 9. INTERFACE DO USUÁRIO - COMPONENTES
 #################################################################
+def rerun():
+    """Reexecuta o script: `st.rerun` (Streamlit >= 1.27) ou `st.experimental_rerun` nas versões antigas"""
+    (getattr(st, "rerun", None) or st.experimental_rerun)()
+
 class UIComponents:
     @staticmethod
     def setup_page_config():
@@ -659,10 +3200,13 @@ class UIComponents:
             },
             'analysis': None,
             'contract_text': "",
+            'contract_source': ("texto colado", "text"),  # (nome do arquivo, tipo) para o histórico
             'current_step': 1,
             'file_uploaded': False,
             'show_full_analysis': False,
-            'contract_metadata': None
+            'contract_metadata': None,
+            'analysis_job_id': None,
+            'analysis_notice': None  # (nível, mensagem) sobre o modelo de linguagem na análise atual
         }
         
         for key, value in defaults.items():
@@ -743,13 +3287,14 @@ class WelcomeScreen:
         if st.button("▶️ Começar Análise Agora", key="start_analysis", type="primary"):
             st.session_state.show_analysis = True
             st.session_state.current_step = 1
-            st.experimental_rerun()
+            rerun()
 
 class AnalysisInterface:
-    def __init__(self, nlp_model=None):
-        self.nlp_model = nlp_model
-        self.analyzer = ContractAnalysisEngine(CONTRACT_RULES, nlp_model)
+    def __init__(self, registry: "ModelRegistry"):
+        self.registry = registry
         self.data_manager = DataManager()
+        self.job_queue = get_job_queue()
+        self.repository = get_analysis_repository()
         self.email_service = EmailService()
     
     def show_user_data_section(self):
@@ -828,9 +3373,17 @@ class AnalysisInterface:
                 
                 st.session_state.file_uploaded = True
                 with st.spinner("Processando arquivo..."):
-                    text = FileUtils.extract_text(file)
+                    extraction = get_extraction_cache().extract(file)
+                    text = extraction.text if extraction else None
+                    if extraction and extraction.partial:
+                        st.warning(
+                            f"Não foi possível ler {len(extraction.skipped_pages)} página(s) do arquivo "
+                            f"({', '.join(map(str, extraction.skipped_pages[:20]))}). "
+                            "A análise considerará apenas o texto extraído."
+                        )
                     if text:
                         st.session_state.contract_text = text
+                        st.session_state.contract_source = (file.name, os.path.splitext(file.name)[1].lstrip(".").lower())
                         st.success("Arquivo processado com sucesso!")
                         
                         # Pré-visualização do texto
@@ -851,6 +3404,7 @@ class AnalysisInterface:
             if text_input:
                 st.session_state.file_uploaded = True
                 st.session_state.contract_text = text_input
+                st.session_state.contract_source = ("texto colado", "text")
 
         if st.session_state.file_uploaded:
             if st.button("🔍 Analisar Contrato", type="primary", use_container_width=True):
@@ -862,37 +3416,62 @@ class AnalysisInterface:
             st.warning("Por favor, envie um arquivo ou cole o texto do contrato")
             return
         
-        with st.spinner("Analisando contrato... Isso pode levar alguns segundos"):
-            try:
-                # Executa análise
-                analysis_results, metadata = self.analyzer.analyze(st.session_state.contract_text)
-                st.session_state.analysis = analysis_results
-                st.session_state.contract_metadata = metadata
-                
-                # Atualiza dados do usuário
-                st.session_state.user_data['analysis_requested'] = True
-                st.session_state.user_data['contract_hash'] = metadata.contract_hash
-                
-                # Calcula métricas para o Google Sheets
-                total_issues = len([r for r in analysis_results if r.score > 0])
-                high_risk = sum(1 for r in analysis_results if r.score >= 8)
-                
-                # Atualiza Google Sheets
-                update_data = {
-                    **st.session_state.user_data,
-                    "analysis_results": {
-                        "total_issues": total_issues,
-                        "high_risk": high_risk
-                    }
-                }
-                self.data_manager.save_to_google_sheets(update_data)
-                
-                st.session_state.current_step = 2
-                st.success("Análise concluída com sucesso!")
-                st.experimental_rerun()
-            except Exception as e:
-                st.error(f"Erro durante a análise: {str(e)}")
-                logger.error(f"Erro na análise: {traceback.format_exc()}")
+        # Guardado na sessão: um aviso mostrado aqui sumiria no `rerun()` logo abaixo
+        st.session_state.analysis_notice = None
+        if not self.registry.ready:
+            st.session_state.analysis_notice = (
+                "info", "O modelo de linguagem ainda está sendo carregado; a análise das cláusulas não é afetada.")
+        elif not self.registry.nlp_available:
+            st.session_state.analysis_notice = ("warning", """
+            ⚠️ Modelo de linguagem não carregado. Algumas análises avançadas estarão limitadas.
+            Recarregue a página ou tente novamente mais tarde.
+            """)
+        
+        # A análise roda em segundo plano; a tela acompanha o progresso em `_show_job_progress`
+        st.session_state.analysis_job_id = self.job_queue.submit(
+            st.session_state.user_data['session_id'],
+            st.session_state.contract_text,
+            st.session_state.user_data,
+            st.session_state.contract_source
+        )
+        rerun()
+    
+    def _show_job_progress(self) -> bool:
+        """Mostra o progresso da análise em andamento; retorna True enquanto ela não terminar"""
+        job_id = st.session_state.get('analysis_job_id')
+        job = self.job_queue.get(job_id) if job_id else None
+        if job is None:
+            return False
+        
+        if job.status == JobStatus.FAILED:
+            st.session_state.analysis_job_id = None
+            st.session_state.analysis_notice = None
+            st.error(f"Erro durante a análise: {job.error}")
+            return False
+        
+        if job.status == JobStatus.DONE:
+            st.session_state.analysis_job_id = None
+            st.session_state.analysis = job.results
+            st.session_state.contract_metadata = job.metadata
+            st.session_state.user_data['analysis_requested'] = True
+            st.session_state.user_data['contract_hash'] = job.metadata.contract_hash
+            st.session_state.current_step = 2
+            st.success("Análise concluída com sucesso!")
+            rerun()
+        
+        self._show_analysis_notice()
+        st.progress(job.progress, text=f"Analisando contrato: {job.stage}...")
+        time.sleep(AppConfig.JOB_POLL_INTERVAL)
+        rerun()
+        return True
+    
+    @staticmethod
+    def _show_analysis_notice():
+        """Mostra o aviso sobre o modelo de linguagem guardado por `_analyze_contract`"""
+        notice = st.session_state.get('analysis_notice')
+        if notice:
+            level, message = notice
+            (st.info if level == "info" else st.warning)(message)
     
     def show_analysis_results(self):
         """Exibe os resultados da análise"""
@@ -900,6 +3479,8 @@ class AnalysisInterface:
             st.warning("Nenhuma análise disponível. Por favor, envie um contrato primeiro.")
             return
 
+        self._show_analysis_notice()
+
         # Seção de prévia gratuita
         with st.container():
             st.markdown("""
@@ -963,11 +3544,13 @@ class AnalysisInterface:
                         st.pyplot(wordcloud_fig)
                     
                     # Top 10 termos
+                    from nltk.corpus import stopwords
                     words = re.findall(r'\b\w{4,}\b', st.session_state.contract_text.lower())
                     stopwords_pt = set(stopwords.words('portuguese'))
                     filtered_words = [w for w in words if w not in stopwords_pt and not w.isnumeric()]
                     word_freq = Counter(filtered_words)
 
+                    import pandas as pd
                     top_words = pd.DataFrame(
                         word_freq.most_common(10),
                         columns=['Termo', 'Frequência']
@@ -1087,6 +3670,7 @@ class AnalysisInterface:
                 "paid": True
             }
             self.data_manager.save_to_google_sheets(update_data)
+            self.repository.mark_paid(st.session_state.user_data['session_id'])
             
             # Envia e-mail de confirmação
             email_body = f"""
@@ -1102,13 +3686,13 @@ class AnalysisInterface:
             ):
                 st.markdown("""
                 <div class="email-confirmation">
-                    <h4>📨 Confirmação Recebida!</h4>
-                    <p>Você receberá a análise completa por e-mail em breve.</p>
+                    <h4>📨 Pagamento Confirmado!</h4>
+                    <p>O e-mail de confirmação foi colocado na fila de envio e deve chegar em alguns minutos.</p>
                     <p>Obrigado por utilizar nossos serviços!</p>
                 </div>
                 """, unsafe_allow_html=True)
             else:
-                st.error("Erro ao enviar confirmação por e-mail. Sua análise foi processada, mas você pode não receber o e-mail.")
+                st.error("Não foi possível agendar o e-mail de confirmação. Sua análise foi processada, mas você pode não receber o e-mail.")
     
     def show_full_analysis(self):
         """Exibe a análise completa (após pagamento)"""
@@ -1220,6 +3804,8 @@ class AnalysisInterface:
 
         # Fluxo principal
         if st.session_state.current_step == 1:
+            if self._show_job_progress():
+                return
             self.show_contract_upload()
         elif st.session_state.current_step == 2:
             self.show_analysis_results()
@@ -1229,31 +3815,183 @@ class AnalysisInterface:
 #################################################################
 # 11. CARREGAMENTO DE MODELOS E INICIALIZAÇÃO
 #################################################################
-def load_nlp_model() -> Optional[spacy.Language]:
-    """Carrega o modelo de NLP com tratamento robusto de erros"""
+NLTK_RESOURCES = {
+    'corpora/stopwords': 'stopwords',  # Nuvem de palavras e termos frequentes
+}
+
+def ensure_nltk_resources() -> bool:
+    """Verifica (e baixa, se faltarem) os recursos do NLTK.
+
+    Chamada no aquecimento (`ModelRegistry.warm_up`) ou na construção da
+    imagem, e não na importação do módulo.
+    """
+    import nltk
+
+    ok = True
+    for path, package in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            try:
+                if not nltk.download(package, quiet=True):
+                    raise RuntimeError(f"download de '{package}' falhou")
+            except Exception as e:
+                logger.error(f"Erro ao baixar recursos NLTK: {str(e)}")
+                ok = False
+    return ok
+
+def load_nlp_model() -> Optional["spacy.Language"]:
+    """Carrega o modelo de NLP só com os componentes usados pelo motor"""
+    import spacy
+
     try:
-        nlp = spacy.load("pt_core_news_sm")
+        nlp = spacy.load(AppConfig.NLP_MODEL_NAME, disable=AppConfig.NLP_DISABLED_COMPONENTS)
         logger.success("Modelo Spacy carregado com sucesso")
         return nlp
     except OSError:
         try:
             logger.info("Modelo Spacy não encontrado. Tentando download...")
             from spacy.cli import download
-            download("pt_core_news_sm")
-            nlp = spacy.load("pt_core_news_sm")
+            download(AppConfig.NLP_MODEL_NAME)
+            nlp = spacy.load(AppConfig.NLP_MODEL_NAME, disable=AppConfig.NLP_DISABLED_COMPONENTS)
             logger.success("Modelo Spacy baixado e carregado")
             return nlp
         except Exception as e:
             logger.error(f"Falha ao baixar modelo Spacy: {str(e)}")
     except Exception as e:
         logger.error(f"Erro inesperado ao carregar Spacy: {str(e)}")
-    
-    st.warning("""
-    ⚠️ Modelo de linguagem não carregado. Algumas análises avançadas estarão limitadas.
-    Recarregue a página ou tente novamente mais tarde.
-    """)
     return None
 
+class ModelRegistry:
+    """Modelo spaCy e motores de análise compartilhados por todo o processo.
+
+    O modelo é carregado (e baixado, se preciso) uma única vez, numa thread de
+    aquecimento, fora do caminho das interações. Enquanto `ready` for falso, a
+    análise usa um motor só com as regras, e passa a usar o motor com NLP assim
+    que o aquecimento termina. Os motores são recriados quando o
+    `RulePackWatcher` troca o conjunto de regras; análises em andamento
+    terminam com o motor que já tinham.
+    """
+
+    def __init__(self, rule_pack: Optional[RulePackWatcher] = None):
+        self.rule_pack = rule_pack or RulePackWatcher()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self.nlp_model: Optional["spacy.Language"] = None
+        self.nltk_ready = False
+        self._rules_engine: Optional[ContractAnalysisEngine] = None
+        self._nlp_engine: Optional[ContractAnalysisEngine] = None
+        self._engines_digest: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        """Indica se o aquecimento terminou (com ou sem modelo carregado)"""
+        return self._ready.is_set()
+
+    @property
+    def nlp_available(self) -> bool:
+        return self.ready and self.nlp_model is not None
+
+    def start_warm_up(self):
+        """Dispara o carregamento do modelo em segundo plano (só na primeira chamada)"""
+        with self._lock:
+            if self._warm_up_thread is None:
+                self._warm_up_thread = threading.Thread(target=self.warm_up, name="clara-warm-up", daemon=True)
+                self._warm_up_thread.start()
+
+    def warm_up(self):
+        """Carrega o modelo e cria o motor com NLP"""
+        if self.ready:
+            return
+        start_time = time.time()
+        self.nltk_ready = ensure_nltk_resources()
+        nlp_model = load_nlp_model()
+        with self._lock:
+            self.nlp_model = nlp_model
+        self.engine()  # Cria o motor com NLP antes de marcar como pronto
+        self._ready.set()
+        logger.info(f"Aquecimento concluído em {time.time() - start_time:.2f}s")
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def engine(self) -> ContractAnalysisEngine:
+        """Motor com NLP se o modelo já foi carregado; caso contrário, só com as regras"""
+        snapshot = self.rule_pack.current()
+        with self._lock:
+            if snapshot.digest != self._engines_digest:
+                self._rules_engine = self._nlp_engine = None
+                self._engines_digest = snapshot.digest
+
+            if self.nlp_model is not None:
+                if self._nlp_engine is None:
+                    self._nlp_engine = ContractAnalysisEngine(snapshot.rules, self.nlp_model,
+                                                              compiled_rules=snapshot.compiled)
+                return self._nlp_engine
+            if self._rules_engine is None:
+                self._rules_engine = ContractAnalysisEngine(snapshot.rules, compiled_rules=snapshot.compiled)
+            return self._rules_engine
+
+@st.cache_resource
+def get_model_registry() -> ModelRegistry:
+    """Registro de modelo e motores compartilhado entre sessões e reexecuções do script"""
+    registry = ModelRegistry()
+    registry.start_warm_up()
+    return registry
+
+@st.cache_resource
+def get_analysis_cache() -> AnalysisCache:
+    """Cache de análises compartilhado entre sessões e reexecuções do script"""
+    return AnalysisCache(ruleset_digest=get_model_registry().rule_pack.current().digest)
+
+@st.cache_resource
+def get_analysis_repository() -> AnalysisRepository:
+    """Histórico de análises no SQLite compartilhado entre sessões (uma conexão por thread)"""
+    return AnalysisRepository()
+
+@st.cache_resource
+def get_leads_sheet() -> LeadsSheet:
+    """Conexão com a planilha de leads compartilhada entre sessões"""
+    return LeadsSheet()
+
+@st.cache_resource
+def get_lead_writer() -> LeadWriter:
+    """Fila de leads e thread de envio compartilhadas entre sessões"""
+    writer = LeadWriter(get_leads_sheet(), LeadSpool())
+    writer.start()
+    return writer
+
+@st.cache_resource
+def get_lead_hash_key() -> Optional[bytes]:
+    """Chave do HMAC da impressão digital gravada na planilha (lida uma vez de st.secrets)"""
+    try:
+        return str(st.secrets[AppConfig.LEAD_HASH_SECRET]).encode('utf-8')
+    except Exception:
+        logger.warning(f"Segredo '{AppConfig.LEAD_HASH_SECRET}' não configurado; "
+                       f"a planilha recebe a impressão digital do contrato sem HMAC")
+        return None
+
+@st.cache_resource
+def get_email_outbox() -> EmailOutbox:
+    """Fila de e-mails e sessão SMTP compartilhadas entre sessões"""
+    outbox = EmailOutbox()
+    outbox.start()
+    return outbox
+
+@st.cache_resource
+def get_job_queue() -> AnalysisJobQueue:
+    """Fila de análises compartilhada entre sessões (o motor vem do registro, já aquecido ou não)"""
+    registry = get_model_registry()
+    cache = get_analysis_cache()
+    return AnalysisJobQueue(lambda: CachedAnalysisEngine(registry.engine(), cache), DataManager(),
+                            get_analysis_repository())
+
+@st.cache_resource
+def get_extraction_cache() -> ExtractionCache:
+    """Cache de texto extraído compartilhado entre sessões e reexecuções do script"""
+    return ExtractionCache()
+
 #################################################################
 # 12. CONTROLE PRINCIPAL DO APLICATIVO
 #################################################################
@@ -1266,14 +4004,14 @@ def main():
         UIComponents.init_session_state()
         UIComponents.check_session_timeout()
         
-        # Carrega modelo NLP
-        nlp_model = load_nlp_model()
+        # Modelo NLP e motor são carregados uma vez por processo, em segundo plano
+        registry = get_model_registry()
         
         # Fluxo principal
         if not st.session_state.show_analysis:
             WelcomeScreen.show()
         else:
-            analysis_interface = AnalysisInterface(nlp_model)
+            analysis_interface = AnalysisInterface(registry)
             analysis_interface.show_analysis_interface()
             
     except Exception as e:
@@ -0,0 +1,220 @@
+"""
+Análise em lote de contratos, sem a interface do Streamlit.
+
+Percorre um diretório (ou uma lista de arquivos) de PDFs e DOCX, extrai e
+analisa cada documento em paralelo, com um `ContractAnalysisEngine` por
+processo, e grava um registro JSONL por documento com os `AnalysisResult` e o
+`ContractMetadata`. Com `--resume`, arquivos cujo conteúdo (hash BLAKE2b dos
+bytes) já foi analisado com o mesmo conjunto de regras são pulados, então uma
+execução interrompida pode ser retomada e uma mudança nas regras reprocessa
+tudo.
+
+Uso:
+    python clara_batch.py CONTRATOS/ -o resultados.jsonl [--workers 8] [--resume] [--nlp]
+    python clara_batch.py --manifest lista.txt -o resultados.jsonl
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict
+from io import BytesIO
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from loguru import logger
+
+import clara10
+from clara10 import (AnalysisResult, AppConfig, ContractAnalysisEngine, ContractMetadata, ExtractionResult,
+                     FileUtils, RulePackWatcher)
+
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+class LocalFile(BytesIO):
+    """Arquivo local com os atributos que o `FileUtils` espera de um upload do Streamlit"""
+
+    def __init__(self, path: str, data: bytes):
+        super().__init__(data)
+        self.name = os.path.basename(path)
+        self.type = MIME_TYPES[os.path.splitext(path)[1].lower()]
+        self.size = len(data)
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=32, person=b"clara-file-v1").hexdigest()
+
+
+def iter_paths(directory: Optional[str], manifest: Optional[str]) -> Iterator[str]:
+    """Arquivos PDF/DOCX do diretório (recursivo) ou do manifesto (um caminho por linha)"""
+    if manifest:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, encoding="utf-8") as f:
+            for line in f:
+                path = line.strip()
+                if path and not path.startswith("#"):
+                    yield path if os.path.isabs(path) else os.path.join(base, path)
+    if directory:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in MIME_TYPES:
+                    yield os.path.join(root, name)
+
+
+def load_done(output: str, ruleset_digest: str) -> Set[str]:
+    """Hashes já analisados com sucesso com este conjunto de regras"""
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Última linha truncada por uma interrupção
+            if record.get("status") == "ok" and record.get("ruleset_digest") == ruleset_digest:
+                done.add(record["file_hash"])
+    return done
+
+
+_engine: Optional[ContractAnalysisEngine] = None
+_nlp_model = None
+_rule_pack: Optional[RulePackWatcher] = None
+
+
+def init_worker(use_nlp: bool):
+    """Carrega o modelo e as regras do processo; a extração de PDF usa um único processo auxiliar por worker"""
+    global _nlp_model, _rule_pack
+    AppConfig.PDF_WORKERS = 1
+    _nlp_model = clara10.load_nlp_model() if use_nlp else None
+    _rule_pack = RulePackWatcher()
+    worker_engine()
+
+
+def worker_engine() -> ContractAnalysisEngine:
+    """Motor deste processo, recriado quando o pacote de regras muda (entre uma tarefa e outra)"""
+    global _engine
+    snapshot = _rule_pack.current()
+    if _engine is None or _engine.ruleset_digest != snapshot.digest:
+        _engine = ContractAnalysisEngine(snapshot.rules, _nlp_model, compiled_rules=snapshot.compiled)
+    return _engine
+
+
+def serialize_analysis(results: List[AnalysisResult], metadata: ContractMetadata) -> Dict:
+    meta = asdict(metadata)
+    meta["analyzed_at"] = metadata.analyzed_at.isoformat()
+    return {"metadata": meta, "results": [asdict(r) for r in results]}
+
+
+def extraction_summary(extraction: ExtractionResult) -> Dict:
+    return {
+        "page_count": extraction.page_count,
+        "extraction_time": extraction.extraction_time,
+        "partial": extraction.partial,
+        "skipped_pages": extraction.skipped_pages,
+    }
+
+
+def analyze_file(path: str, digest: str) -> Dict:
+    """Extrai e analisa um arquivo; retorna o registro JSONL"""
+    start_time = time.time()
+    record = {"file": path, "file_hash": digest, "ruleset_digest": None}
+    try:
+        # Dentro do try: um erro no pacote de regras ou no motor vira registro de erro deste arquivo
+        engine = worker_engine()
+        record["ruleset_digest"] = engine.ruleset_digest
+        with open(path, "rb") as f:
+            extraction = FileUtils.extract_with_metadata(LocalFile(path, f.read()))
+        if extraction is None or not extraction.text.strip():
+            record.update(status="error", error="não foi possível extrair texto do arquivo")
+            return record
+
+        results, metadata = engine.analyze(extraction.text)
+        record.update(status="ok", extraction=extraction_summary(extraction),
+                      **serialize_analysis(results, metadata))
+    except Exception as e:
+        record.update(status="error", error=str(e))
+    record["elapsed"] = time.time() - start_time
+    return record
+
+
+def run(paths: List[str], output: str, workers: int, resume: bool, use_nlp: bool) -> Tuple[int, int, int]:
+    """Processa os arquivos e grava os registros à medida que terminam; retorna (ok, erros, pulados)"""
+    # Também compila e grava o artefato das regras, que os processos do pool só carregam
+    ruleset_digest = RulePackWatcher().current().digest
+    done = load_done(output, ruleset_digest) if resume else set()
+    ok = errors = skipped = 0
+
+    context = multiprocessing.get_context("spawn")
+    with open(output, "a" if resume else "w", encoding="utf-8") as out, \
+            ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                                initargs=(use_nlp,)) as pool:
+        pending = set()
+        for path in paths:
+            try:
+                with open(path, "rb") as f:
+                    digest = file_hash(f.read())
+            except OSError as e:
+                logger.error(f"Erro ao ler {path}: {str(e)}")
+                errors += 1
+                continue
+            if digest in done:
+                skipped += 1
+                continue
+            done.add(digest)  # Cópias do mesmo arquivo são analisadas uma vez
+
+            # Limita as tarefas em voo para não ler o acervo inteiro de uma vez
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                ok, errors = _write(out, finished, ok, errors)
+            pending.add(pool.submit(analyze_file, path, digest))
+
+        finished, _ = wait(pending)
+        ok, errors = _write(out, finished, ok, errors)
+    return ok, errors, skipped
+
+
+def _write(out, finished, ok: int, errors: int) -> Tuple[int, int]:
+    for future in finished:
+        record = future.result()
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if record["status"] == "ok":
+            ok += 1
+        else:
+            errors += 1
+            logger.warning(f"{record['file']}: {record['error']}")
+    out.flush()
+    logger.info(f"{ok} analisados, {errors} com erro")
+    return ok, errors
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", help="diretório com os contratos (PDF/DOCX)")
+    parser.add_argument("--manifest", help="arquivo com um caminho por linha")
+    parser.add_argument("-o", "--output", required=True, help="arquivo JSONL de saída")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--resume", action="store_true",
+                        help="acrescenta ao arquivo de saída, pulando documentos já analisados")
+    parser.add_argument("--nlp", action="store_true", help="extrai entidades com o modelo spaCy")
+    args = parser.parse_args(argv)
+    if not args.directory and not args.manifest:
+        parser.error("informe um diretório ou --manifest")
+
+    start_time = time.time()
+    ok, errors, skipped = run(list(iter_paths(args.directory, args.manifest)), args.output,
+                              max(1, args.workers), args.resume, args.nlp)
+    logger.info(f"Concluído em {time.time() - start_time:.1f}s: {ok} analisados, "
+                f"{errors} com erro, {skipped} já processados")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+Extração de texto de PDF executada em processos auxiliares.
+
+Fica fora de clara10.py para que os processos auxiliares (iniciados com
+"spawn") importem apenas o PyPDF2, e não o Streamlit, o spaCy e o restante
+do aplicativo.
+
+Cada página é extraída por um processo do `GuardedPagePool` sob um limite de
+tempo e de memória: se a página estourar o tempo, o processo é encerrado e
+substituído; se estourar a memória (RLIMIT_AS), a página falha sem derrubar o
+processo. Páginas que falham podem ser tentadas de novo com o pdfplumber e,
+se ainda assim falharem, são puladas e informadas ao chamador. O próprio PDF
+também é aberto (e suas páginas contadas) num processo auxiliar, sob
+`LOAD_TIMEOUT`: o processo do aplicativo nunca interpreta o arquivo.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+try:
+    import resource
+except ImportError:  # Windows: sem limite de memória por processo
+    resource = None
+
+PAGE_OK = "ok"
+PAGE_TIMEOUT = "timeout"
+PAGE_MEMORY = "memory"
+PAGE_ERROR = "error"
+
+STARTUP_TIMEOUT = 120  # segundos para um processo auxiliar ficar pronto
+LOAD_TIMEOUT = 60  # segundos para abrir o PDF, separado do limite por página
+
+
+@dataclass
+class PageOutcome:
+    index: int
+    text: str
+    status: str
+    elapsed: float
+    engine: str = "pypdf2"
+
+
+class PdfLoadError(Exception):
+    """O PDF não pôde ser aberto no processo auxiliar"""
+
+    def __init__(self, status: str, message: str = ""):
+        super().__init__(f"{status}: {message}" if message else status)
+        self.status = status
+
+
+def _extract_with_pdfplumber(data: bytes, index: int) -> str:
+    import pdfplumber
+
+    with pdfplumber.open(BytesIO(data)) as pdf:
+        return pdf.pages[index].extract_text() or ""
+
+
+def _worker_main(conn, memory_limit: Optional[int]):
+    """Laço do processo auxiliar: recebe o PDF uma vez e extrai páginas sob demanda"""
+    if memory_limit and resource is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+    conn.send(("ready",))
+
+    data, reader = None, None
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        command = message[0]
+        if command == "stop":
+            return
+        if command == "load":
+            data, reader = message[1], None
+            try:
+                reader = PyPDF2.PdfReader(BytesIO(data))
+                conn.send((PAGE_OK, len(reader.pages)))
+            except MemoryError:
+                conn.send((PAGE_MEMORY, "memória insuficiente ao abrir o PDF"))
+            except Exception as e:
+                conn.send((PAGE_ERROR, str(e)))
+            continue
+
+        index = message[1]
+        try:
+            if command == "pdfplumber":
+                text = _extract_with_pdfplumber(data, index)
+            else:
+                text = reader.pages[index].extract_text() or ""
+            conn.send((PAGE_OK, text))
+        except MemoryError:
+            conn.send((PAGE_MEMORY, ""))
+        except Exception as e:
+            conn.send((PAGE_ERROR, str(e)))
+
+
+class GuardedWorker:
+    """Processo auxiliar que pode ser encerrado e recriado se uma página travar"""
+
+    def __init__(self, context, memory_limit: Optional[int], wait: bool = True):
+        self.context = context
+        self.memory_limit = memory_limit
+        self.loaded: Optional[int] = None  # id() dos bytes carregados no processo
+        self.page_count: Optional[int] = None
+        self._launch()
+        if wait:
+            self.wait_ready()
+
+    def _launch(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main, args=(child_conn, self.memory_limit), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.loaded = None
+
+    def wait_ready(self):
+        """Aguarda o processo iniciar, para que a inicialização não conte no limite por página"""
+        if not self.conn.poll(STARTUP_TIMEOUT):
+            self.process.kill()
+            raise RuntimeError("Processo de extração de PDF não iniciou a tempo")
+        self.conn.recv()
+
+    def restart(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self._launch()
+        self.wait_ready()
+
+    def _call(self, message, timeout: Optional[float]):
+        if not self.process.is_alive():
+            self.restart()
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            self.restart()
+            return PAGE_TIMEOUT, ""
+        try:
+            return self.conn.recv()
+        except EOFError:  # Processo morreu (ex.: sinal do sistema por falta de memória)
+            self.restart()
+            return PAGE_MEMORY, ""
+
+    def load(self, data: bytes) -> Tuple[str, Any]:
+        """Abre o PDF no processo, se ainda não aberto: (status, nº de páginas ou mensagem de erro)"""
+        if self.loaded == id(data):
+            return PAGE_OK, self.page_count
+        status, payload = self._call(("load", data), LOAD_TIMEOUT)
+        self.loaded, self.page_count = (id(data), payload) if status == PAGE_OK else (None, None)
+        return status, payload
+
+    def extract(self, data: bytes, index: int, timeout: Optional[float], engine: str = "pypdf2") -> PageOutcome:
+        start = time.time()
+        status, _ = self.load(data)
+        if status != PAGE_OK:
+            return PageOutcome(index, "", status, time.time() - start, engine)
+        start = time.time()
+        status, payload = self._call((engine, index), timeout)
+        text = payload if status == PAGE_OK else ""
+        return PageOutcome(index, text, status, time.time() - start, engine)
+
+    def stop(self):
+        try:
+            self.conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class GuardedPagePool:
+    """Conjunto de processos auxiliares reutilizados entre documentos"""
+
+    def __init__(self, workers: int, memory_limit: Optional[int] = None):
+        self.context = multiprocessing.get_context("spawn")
+        self.memory_limit = memory_limit
+        self._idle: "queue.Queue[GuardedWorker]" = queue.Queue()
+        self.size = max(1, workers)
+        started = [GuardedWorker(self.context, memory_limit, wait=False) for _ in range(self.size)]
+        for worker in started:
+            worker.wait_ready()
+            self._idle.put(worker)
+
+    @contextmanager
+    def open(self, data: bytes) -> Iterator["GuardedDocument"]:
+        """Abre o PDF em um processo livre; os processos usados voltam ao pool ao sair do `with`.
+
+        Levanta `PdfLoadError` se o PDF não abrir dentro de `LOAD_TIMEOUT` e do
+        limite de memória.
+        """
+        document = GuardedDocument(self, data, self._idle.get())  # Espera ao menos um processo livre
+        try:
+            document.load()
+            yield document
+        finally:
+            for worker in document.workers:
+                worker.loaded = None
+                self._idle.put(worker)
+
+    def close(self):
+        for _ in range(self.size):
+            self._idle.get().stop()
+
+
+class GuardedDocument:
+    """PDF aberto por `GuardedPagePool.open`, com o número de páginas informado pelo processo auxiliar"""
+
+    def __init__(self, pool: GuardedPagePool, data: bytes, worker: GuardedWorker):
+        self.pool = pool
+        self.data = data
+        self.workers = [worker]
+        self.page_count = 0
+
+    def load(self):
+        try:
+            status, payload = self.workers[0].load(self.data)
+        except Exception as e:  # Processo que não reiniciou ou canal quebrado
+            self.workers[0].loaded = None
+            status, payload = PAGE_ERROR, str(e)
+        if status != PAGE_OK:
+            raise PdfLoadError(status, payload or "")
+        self.page_count = payload
+
+    def _extract_page(self, worker: GuardedWorker, index: int, page_timeout: Optional[float],
+                      retry_with_pdfplumber: bool) -> PageOutcome:
+        start = time.time()
+        try:
+            outcome = worker.extract(self.data, index, page_timeout)
+            if outcome.status != PAGE_OK and retry_with_pdfplumber:
+                retry = worker.extract(self.data, index, page_timeout, engine="pdfplumber")
+                if retry.status == PAGE_OK:
+                    outcome = retry
+        except Exception:
+            # Processo que não reiniciou ou canal quebrado: a página é pulada e o
+            # processo é recriado na próxima chamada
+            worker.loaded = None
+            outcome = PageOutcome(index, "", PAGE_ERROR, time.time() - start)
+        return outcome
+
+    def iter_pages(self, page_timeout: Optional[float], retry_with_pdfplumber: bool = False) -> Iterator[PageOutcome]:
+        """Extrai as páginas uma a uma, em ordem, no processo que abriu o PDF"""
+        for index in range(self.page_count):
+            yield self._extract_page(self.workers[0], index, page_timeout, retry_with_pdfplumber)
+
+    def extract(self, parallelism: int, page_timeout: Optional[float],
+                retry_with_pdfplumber: bool = False) -> List[PageOutcome]:
+        """Extrai todas as páginas, em ordem, usando até `parallelism` processos"""
+        while len(self.workers) < min(parallelism, self.page_count):
+            try:
+                self.workers.append(self.pool._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        outcomes: List[Optional[PageOutcome]] = [None] * self.page_count
+        pending: "queue.Queue[int]" = queue.Queue()
+        for index in range(self.page_count):
+            pending.put(index)
+
+        def run(worker: GuardedWorker):
+            while True:
+                try:
+                    index = pending.get_nowait()
+                except queue.Empty:
+                    return
+                outcomes[index] = self._extract_page(worker, index, page_timeout, retry_with_pdfplumber)
+
+        threads = [threading.Thread(target=run, args=(worker,), daemon=True) for worker in self.workers[1:]]
+        for thread in threads:
+            thread.start()
+        run(self.workers[0])
+        for thread in threads:
+            thread.join()
+
+        # Garantia para quem consome o resultado: toda página tem um PageOutcome
+        return [outcome or PageOutcome(index, "", PAGE_ERROR, 0.0) for index, outcome in enumerate(outcomes)]
+
+
+_pool: Optional[GuardedPagePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_page_pool(workers: Optional[int] = None, memory_limit: Optional[int] = None) -> GuardedPagePool:
+    """Pool de processos compartilhado, criado no primeiro uso"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = GuardedPagePool(workers or os.cpu_count() or 1, memory_limit)
+        return _pool
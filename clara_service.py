@@ -0,0 +1,180 @@
+"""
+Serviço HTTP de análise de contratos (Flask servido pelo waitress).
+
+Expõe o `ContractAnalysisEngine` fora do Streamlit, para que a análise escale
+horizontalmente, separada da interface. Cada processo do pool carrega as
+regras (e, com `--nlp`, o modelo spaCy) uma única vez, no início; o pool é
+aquecido antes de o servidor aceitar conexões. O número de análises em
+andamento e na fila é limitado: acima disso o serviço responde 503 com
+`Retry-After`, em vez de acumular requisições. O waitress mantém as conexões
+HTTP/1.1 abertas (keep-alive) entre requisições.
+
+Rotas:
+    GET  /health    estado do pool (pronto, em andamento, capacidade)
+    POST /analyze   arquivo PDF/DOCX (multipart, campo "file"), JSON {"text": ...}
+                    ou texto puro (text/plain); responde os resultados em JSON
+
+Uso:
+    python clara_service.py [--host 0.0.0.0] [--port 8080] [--workers 4] [--queue-size 8] [--nlp]
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from typing import Dict, Optional
+
+from flask import Flask, jsonify, request
+from loguru import logger
+
+import clara_batch
+from clara10 import AppConfig, FileUtils, RulePackError, TextUtils
+
+REQUEST_TIMEOUT = 120  # segundos de espera por uma análise antes de responder 504
+RETRY_AFTER = 5  # segundos sugeridos ao cliente quando o serviço está cheio
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def analyze_text(text: str) -> Dict:
+    """Executado num processo do pool: analisa texto já extraído"""
+    results, metadata = clara_batch.worker_engine().analyze(text)
+    return clara_batch.serialize_analysis(results, metadata)
+
+
+def analyze_upload(filename: str, data: bytes) -> Dict:
+    """Executado num processo do pool: extrai e analisa um arquivo enviado"""
+    extraction = FileUtils.extract_with_metadata(clara_batch.LocalFile(filename, data))
+    if extraction is None or not extraction.text.strip():
+        raise ValueError("não foi possível extrair texto do arquivo")
+    response = analyze_text(extraction.text)
+    response["extraction"] = clara_batch.extraction_summary(extraction)
+    return response
+
+
+class AnalysisPool:
+    """Pool de processos aquecido, com limite de análises em andamento mais na fila"""
+
+    def __init__(self, workers: int, queue_size: int, use_nlp: bool = False):
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.executor = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=clara_batch.init_worker, initargs=(use_nlp,))
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.ready = False
+
+    def warm_up(self):
+        """Inicia todos os processos (e carrega os motores) antes da primeira requisição"""
+        start_time = time.time()
+        # Tarefas enviadas juntas, sem processo ocioso, fazem o executor criar um processo para cada
+        wait([self.executor.submit(_ping) for _ in range(self.workers)])
+        self.ready = True
+        logger.info(f"{self.workers} processos de análise prontos em {time.time() - start_time:.1f}s")
+
+    def submit(self, fn, *args) -> Optional[Future]:
+        """Envia uma análise; retorna None se o limite de andamento + fila foi atingido"""
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"ready": self.ready, "workers": self.workers,
+                    "in_flight": self._in_flight, "capacity": self.capacity}
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+def create_app(pool: AnalysisPool) -> Flask:
+    app = Flask(__name__)
+    app.config["MAX_CONTENT_LENGTH"] = AppConfig.MAX_FILE_SIZE + 1024 * 1024  # Arquivo + cabeçalhos multipart
+
+    @app.get("/health")
+    def health():
+        stats = pool.stats()
+        return jsonify(stats), 200 if stats["ready"] else 503
+
+    @app.post("/analyze")
+    def analyze():
+        upload = request.files.get("file")
+        if upload is not None:
+            if os.path.splitext(upload.filename or "")[1].lower() not in clara_batch.MIME_TYPES:
+                return jsonify(error="formato não suportado (envie PDF ou DOCX)"), 415
+            future = pool.submit(analyze_upload, upload.filename, upload.read())
+        else:
+            if request.is_json:
+                payload = request.get_json(silent=True)
+                if not isinstance(payload, dict):
+                    return jsonify(error="o corpo JSON deve ser um objeto com o campo 'text'"), 400
+                text = payload.get("text", "")
+            else:
+                text = request.get_data(as_text=True)
+            if not isinstance(text, str) or not TextUtils.clean_text(text):
+                return jsonify(error="envie um arquivo no campo 'file' ou o texto do contrato"), 400
+            future = pool.submit(analyze_text, text)
+
+        if future is None:
+            response = jsonify(error="serviço ocupado, tente novamente")
+            response.headers["Retry-After"] = str(RETRY_AFTER)
+            return response, 503
+
+        try:
+            return jsonify(future.result(timeout=REQUEST_TIMEOUT))
+        except FutureTimeoutError:
+            return jsonify(error="tempo de análise esgotado"), 504
+        except RulePackError as e:  # Subclasse de ValueError, mas é falha do servidor
+            logger.error(f"Erro nas regras de análise: {str(e)}")
+            return jsonify(error="erro interno na análise"), 500
+        except ValueError as e:
+            return jsonify(error=str(e)), 422
+        except Exception as e:
+            logger.error(f"Erro na análise: {str(e)}")
+            return jsonify(error="erro interno na análise"), 500
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos de análise")
+    parser.add_argument("--queue-size", type=int, default=8, help="análises aguardando além das em andamento")
+    parser.add_argument("--nlp", action="store_true", help="extrai entidades com o modelo spaCy")
+    args = parser.parse_args()
+
+    from waitress import serve
+
+    pool = AnalysisPool(args.workers, args.queue_size, args.nlp)
+    pool.warm_up()
+    try:
+        # Threads suficientes para as requisições aceitas mais as que recebem 503 rapidamente
+        serve(create_app(pool), host=args.host, port=args.port,
+              threads=pool.capacity + 4, channel_timeout=REQUEST_TIMEOUT + 10,
+              max_request_body_size=AppConfig.MAX_FILE_SIZE + 1024 * 1024)
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()